@@ -0,0 +1,143 @@
+"""
+This script benchmarks convert_kg2c_tsvs_to_jsonl.py on synthetic KG2c-shaped graphs (see make_synthetic_kg2c.py)
+at several scales, entirely offline (a stub BiolinkHelper stands in for the real one). Each conversion runs in a
+fresh process, so that its peak memory usage is measured on its own. Results (rows/sec, seconds, peak RSS, output
+sizes, and the converter's per-stage timings) are written to a TSV and a JSON file in the output directory.
+
+Peak memory is reported three ways: peak_tree_rss_mb is the peak of the summed RSS of the conversion process and all
+of its workers (sampled every SAMPLE_INTERVAL seconds over the whole run, i.e., both TSVs, so brief spikes can be
+missed); peak_main_rss_mb is the conversion process's own peak; and max_child_rss_mb is the peak of the single
+largest (finished) child process, e.g., one worker, as reported by getrusage.
+
+Usage: python benchmark_converter.py <output dir> [--scales 10000 100000] [--edges-per-node N] \
+                                     [--workers 1 4] [--json-encoder json|orjson] [--seed N] [--keep-outputs]
+"""
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from typing import List, Tuple
+
+import psutil
+
+from make_synthetic_kg2c import make_synthetic_kg2c
+
+SAMPLE_INTERVAL = 0.1  # Seconds between samples of the conversion's process tree RSS
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s %(levelname)s: %(message)s',
+                    handlers=[logging.StreamHandler()])
+
+
+def run_conversion(file_paths: dict, num_workers: int, json_encoder: str, result_queue: multiprocessing.Queue):
+    # Imported here so that the converter (and its logging setup) is only loaded in the benchmark process
+    from convert_kg2c_tsvs_to_jsonl import convert_tsv_to_jsonl, CategoryAncestorCache
+    from stub_biolink_helper import BiolinkHelper
+    bh = CategoryAncestorCache(BiolinkHelper())
+    reports = [convert_tsv_to_jsonl(file_paths[f"{kind}_tsv"], file_paths[f"{kind}_header_tsv"], bh,
+                                    num_workers=num_workers, json_encoder=json_encoder)
+               for kind in ["nodes", "edges"]]
+    result_queue.put(reports)
+
+
+def get_tree_rss_bytes(process: psutil.Process) -> int:
+    rss_bytes = 0
+    for tree_process in [process] + process.children(recursive=True):
+        try:
+            rss_bytes += tree_process.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return rss_bytes
+
+
+def benchmark_conversion(file_paths: dict, num_workers: int, json_encoder: str) -> Tuple[List[dict], int]:
+    """
+    Converts the given synthetic nodes/edges TSVs in a freshly spawned process and returns the converter's reports,
+    along with the peak RSS of the conversion's whole process tree (the process plus its workers).
+    """
+    spawn_context = multiprocessing.get_context("spawn")
+    result_queue = spawn_context.Queue()
+    process = spawn_context.Process(target=run_conversion, args=(file_paths, num_workers, json_encoder,
+                                                                  result_queue))
+    process.start()
+    peak_tree_rss_bytes = 0
+    while True:
+        try:
+            peak_tree_rss_bytes = max(peak_tree_rss_bytes, get_tree_rss_bytes(psutil.Process(process.pid)))
+        except psutil.NoSuchProcess:
+            pass
+        try:
+            reports = result_queue.get(timeout=SAMPLE_INTERVAL)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                raise RuntimeError(f"Benchmark conversion process exited with code {process.exitcode}")
+    process.join()
+    # Sampling can miss brief spikes, but the tree's RSS is never below the conversion process's own peak
+    return reports, max([peak_tree_rss_bytes] + [report["peak_rss_bytes"] for report in reports])
+
+
+def delete_outputs(output_dir: str):
+    for file_name in os.listdir(output_dir):
+        if not file_name.endswith(".tsv"):
+            os.remove(os.path.join(output_dir, file_name))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("output_dir", help="Directory to write the synthetic graphs and benchmark results to")
+    arg_parser.add_argument("--scales", type=int, nargs="+", default=[10000, 100000],
+                            help="Numbers of nodes in the synthetic graphs to benchmark on")
+    arg_parser.add_argument("--edges-per-node", type=float, default=5.0)
+    arg_parser.add_argument("--workers", type=int, nargs="+", default=[1],
+                            help="Numbers of converter workers to benchmark with")
+    arg_parser.add_argument("--json-encoder", choices=["json", "orjson"], default="json")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--keep-outputs", action="store_true", default=False,
+                            help="Leave the converter's outputs in place (by default they're deleted after each run)")
+    args = arg_parser.parse_args()
+
+    results = []
+    for num_nodes in args.scales:
+        graph_dir = f"{args.output_dir}/synthetic-kg2c-{num_nodes}"
+        file_paths = make_synthetic_kg2c(graph_dir, num_nodes, edges_per_node=args.edges_per_node, seed=args.seed)
+        for num_workers in args.workers:
+            logging.info(f"Benchmarking conversion of {graph_dir} with {num_workers} worker(s)..")
+            start = time.time()
+            reports, peak_tree_rss_bytes = benchmark_conversion(file_paths, num_workers, args.json_encoder)
+            for report in reports:
+                results.append({"num_nodes": num_nodes, "edges_per_node": args.edges_per_node,
+                                "num_workers": num_workers, "json_encoder": args.json_encoder,
+                                "file": os.path.basename(report["tsv_path"]), "num_rows": report["num_rows"],
+                                "seconds": report["total_seconds"], "rows_per_second": report["rows_per_second"],
+                                "peak_tree_rss_mb": round(peak_tree_rss_bytes / 1024 ** 2, 1),
+                                "peak_main_rss_mb": round(report["peak_rss_bytes"] / 1024 ** 2, 1),
+                                "max_child_rss_mb": round(report["peak_child_rss_bytes"] / 1024 ** 2, 1),
+                                "output_mb": round(sum(report["output_bytes"].values()) / 1024 ** 2, 1),
+                                "stage_seconds": report["stage_seconds"]})
+                logging.info(f"{results[-1]['file']}: {report['num_rows']} rows in {report['total_seconds']} "
+                             f"seconds ({report['rows_per_second']} rows/sec), peak RSS of "
+                             f"{results[-1]['peak_main_rss_mb']} MB (conversion process)")
+            logging.info(f"Peak RSS of the conversion's whole process tree (over both TSVs) was "
+                         f"{round(peak_tree_rss_bytes / 1024 ** 2, 1)} MB")
+            logging.info(f"Run took {round(time.time() - start, 1)} seconds in total")
+            if not args.keep_outputs:
+                delete_outputs(graph_dir)
+
+    results_path = f"{args.output_dir}/converter-benchmark-results"
+    with open(f"{results_path}.json", "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    with open(f"{results_path}.tsv", "w") as results_file:
+        column_names = [column_name for column_name in results[0] if column_name != "stage_seconds"]
+        tsv_writer = csv.DictWriter(results_file, fieldnames=column_names, delimiter="\t", extrasaction="ignore")
+        tsv_writer.writeheader()
+        tsv_writer.writerows(results)
+    logging.info(f"Wrote benchmark results to {results_path}.tsv (and .json, with per-stage timings)")
+
+
+if __name__ == "__main__":
+    main()
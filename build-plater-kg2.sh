@@ -24,15 +24,15 @@ if [create_jsonl_files]; then
   cd "$(dirname "$0")"  # This is the directory containing this script ('plater-plover')
   local_kg2c_tarball_name=kg${kg2_version}c-tsv.tar.gz
   scp rtxconfig@arax-databases.rtx.ai:/home/rtxconfig/KG${kg2_version}/extra_files/kg2c-tsv.tar.gz ${local_kg2c_tarball_name}
-  tar -xvzf ${local_kg2c_tarball_name}
 
-  # Convert the TSVs to JSON lines format
+  # Convert the TSVs to JSON lines format (streaming them straight out of the tarball, rather than extracting it)
   "${HOME}/.pyenv/versions/plater-ploverenv/bin/python" convert_kg2c_tsvs_to_jsonl.py \
                                                                     nodes_c.tsv \
                                                                     edges_c.tsv \
                                                                     nodes_c_header.tsv \
                                                                     edges_c_header.tsv \
-                                                                    ${biolink_version}
+                                                                    ${biolink_version} \
+                                                                    --tarball ${local_kg2c_tarball_name}
 
   # Move the JSON lines files into the ORION directory
   mkdir -p -m 777 ${orion_kg2_subdir_path}
@@ -3,23 +3,47 @@ This script converts the KG2c TSV files into KGX-compliant JSON lines files, rea
 
 Usage: python convert_kg2c_tsvs_to_jsonl.py <nodes TSV file path> <edges TSV file path> \
                                                 <nodes header TSV file path> <edges header TSV file path> \
-                                                <biolink version>
+                                                <biolink version> [--workers N] [--shard-outputs] \
+                                                [--flush-bytes N] [--json-encoder json|orjson] \
+                                                [--previous-dir <dir with previous version's outputs>] \
+                                                [--neo4j-csv] [--parquet] [--parquet-row-group-size N] \
+                                                [--tarball <KG2c tarball path>] [--compress gzip|zstd] \
+                                                [--report <report JSON path>] [--profile] [--profile-interval N] \
+                                                [--vectorized] [--plover-lite] \
+                                                [--kg2c-lite-json <kg2c_lite JSON path>]
 """
 import argparse
 import csv
+import gzip
+import hashlib
+import io
+import itertools
 import json
 import logging
+import multiprocessing
 import os
+import resource
+import shutil
 import statistics
+import struct
+import subprocess
 import sys
-from collections import defaultdict
-from typing import Optional, Set, Dict, List
+import tarfile
+import threading
+import time
+from collections import defaultdict, OrderedDict, Counter
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Optional, Set, Dict, List, Tuple, Iterable, Iterator, Callable, IO
 
-import jsonlines
+import numpy as np
 import pandas as pd
 
+from filter_kg2c_lite_json import StreamingJsonReader, open_text_file
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 ARRAY_DELIMITER = "ǂ"
+NEO4J_ARRAY_DELIMITER = ARRAY_DELIMITER  # Needs to be passed to neo4j-admin import via --array-delimiter
 ARRAY_COL_NAMES = {"all_names", "all_categories", "equivalent_curies", "publications", "kg2_ids"}
 PLATER_COL_NAME_REMAPPINGS = {
     "category": "preferred_category"
@@ -28,6 +52,14 @@ LITE_PROPERTIES = {"id", "name", "category", "all_categories",
                    "subject", "object", "predicate", "primary_knowledge_source",
                    "qualified_predicate", "qualified_object_aspect", "qualified_object_direction"}
 TRUSTED_SUBCLASS_SOURCES = {"infores:mondo", "infores:chebi"}  # These are the same as Plover uses for now
+DEFAULT_FLUSH_THRESHOLD = 8 * 1024 * 1024  # Bytes of encoded rows each output writer buffers before writing
+DEFAULT_PARQUET_ROW_GROUP_SIZE = 100000
+DEFAULT_ANCESTOR_CACHE_SIZE = 100000  # Distinct 'all_categories' combinations; KG2c only has a few hundred
+CHUNKS_PER_WORKER = 4  # More chunks than workers so that a slow chunk doesn't leave the other workers idle
+MANIFEST_DTYPE = np.dtype([("id_key", "<u8"), ("row_hash", "<u8"), ("in_plater", "u1")])
+MANIFEST_RECORD = struct.Struct("<QQB")  # Packed the same way as MANIFEST_DTYPE
+MANIFEST_BLOCK_SIZE = 50000  # Number of rows whose hashes are checked against the previous manifest at once
+DEFAULT_PROFILE_INTERVAL = 0.01  # Seconds between stack samples taken by the (optional) sampling profiler
 
 csv.field_size_limit(sys.maxsize)  # Required because some KG2c fields are massive
 logging.basicConfig(level=logging.INFO,
@@ -57,10 +89,619 @@ def should_filter_out(row_obj: dict) -> bool:
         return False
 
 
-def write_rows_to_jsonl_file(rows: list, jsonl_file_path: Optional[str]):
-    if rows and jsonl_file_path:
-        with jsonlines.open(jsonl_file_path, mode="a") as jsonl_writer:
-            jsonl_writer.write_all(rows)
+class CategoryAncestorCache:
+    """
+    Stands in for BiolinkHelper in convert_to_plater_format: the (mixin- and conflation-free) ancestors of every
+    category in the loaded Biolink version are precomputed up front, and the merged ancestor lists for each distinct
+    set of categories a node has are kept in a bounded LRU cache. KG2c has millions of nodes but only a few hundred
+    distinct 'all_categories' combinations, so nearly every call becomes a dictionary lookup.
+    """
+
+    def __init__(self, bh: any, max_size: int = DEFAULT_ANCESTOR_CACHE_SIZE):
+        self.bh = bh
+        self.max_size = max_size
+        self.num_hits = 0
+        self.num_misses = 0
+        self.cache = OrderedDict()
+        all_categories = bh.get_descendants("biolink:NamedThing", include_mixins=False, include_conflations=False)
+        self.category_closures = {category: set(bh.get_ancestors(category, include_mixins=False,
+                                                                 include_conflations=False))
+                                  for category in all_categories}
+        logging.info(f"Precomputed ancestors for {len(self.category_closures)} Biolink categories")
+
+    def get_ancestors(self, categories: List[str], include_mixins: bool = True,
+                      include_conflations: bool = True) -> List[str]:
+        if include_mixins or include_conflations:  # Only the plater conversion's flavor of lookup is cached
+            return self.bh.get_ancestors(categories, include_mixins=include_mixins,
+                                         include_conflations=include_conflations)
+        cache_key = tuple(sorted(set(categories)))
+        ancestors = self.cache.get(cache_key)
+        if ancestors is not None:
+            self.num_hits += 1
+            self.cache.move_to_end(cache_key)
+        else:
+            self.num_misses += 1
+            ancestors_set = set()
+            for category in cache_key:
+                if category not in self.category_closures:  # E.g., a category from a different Biolink version
+                    self.category_closures[category] = set(self.bh.get_ancestors(category, include_mixins=False,
+                                                                                 include_conflations=False))
+                ancestors_set.update(self.category_closures[category])
+            ancestors = sorted(ancestors_set)
+            self.cache[cache_key] = ancestors
+            if len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+        return ancestors
+
+    def pop_stats(self) -> Tuple[int, int]:
+        stats = (self.num_hits, self.num_misses)
+        self.num_hits, self.num_misses = 0, 0
+        return stats
+
+    def add_stats(self, num_hits: int, num_misses: int):
+        self.num_hits += num_hits
+        self.num_misses += num_misses
+
+    def log_stats(self):
+        num_lookups = self.num_hits + self.num_misses
+        hit_rate = round(100 * self.num_hits / num_lookups, 2) if num_lookups else 0
+        logging.info(f"Category ancestor cache: {self.num_hits} hits, {self.num_misses} misses ({hit_rate}% hit rate)")
+
+
+class StackSampler:
+    """
+    Minimal sampling profiler: a background thread periodically records the call stack of the thread that created
+    the sampler. Samples are kept as counts of 'collapsed' stacks (frames joined by ';', outermost first), which is
+    the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = DEFAULT_PROFILE_INTERVAL):
+        self.interval = interval
+        self.stack_counts = Counter()
+        self.target_thread_id = threading.get_ident()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            frames = []
+            while frame is not None:
+                frames.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:"
+                              f"{frame.f_code.co_firstlineno})")
+                frame = frame.f_back
+            if frames:
+                self.stack_counts[";".join(reversed(frames))] += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+    def pop_stack_counts(self) -> Counter:
+        stack_counts = self.stack_counts
+        self.stack_counts = Counter()
+        return stack_counts
+
+    def add_stack_counts(self, stack_counts: Dict[str, int]):
+        self.stack_counts.update(stack_counts)
+
+    def get_top_functions(self, num_functions: int = 25) -> List[dict]:
+        """
+        Returns the functions that were most often at the top of the sampled stacks (i.e., 'self' time).
+        """
+        num_samples = sum(self.stack_counts.values())
+        self_counts = Counter()
+        for stack, count in self.stack_counts.items():
+            self_counts[stack.rsplit(";", 1)[-1]] += count
+        return [{"function": function, "samples": count, "percent": round(100 * count / num_samples, 2)}
+                for function, count in self_counts.most_common(num_functions)]
+
+    def write_collapsed_stacks(self, file_path: str):
+        with open(file_path, "w") as collapsed_stacks_file:
+            for stack, count in self.stack_counts.most_common():
+                collapsed_stacks_file.write(f"{stack} {count}\n")
+
+
+def get_peak_rss_bytes(who: int = resource.RUSAGE_SELF) -> int:
+    """
+    Returns the peak resident set size of this process (or, for RUSAGE_CHILDREN, of its largest terminated child
+    process, e.g., a conversion worker).
+    """
+    max_rss = resource.getrusage(who).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024  # Linux reports this in kilobytes
+
+
+def add_stage_seconds(total_stage_seconds: Dict[str, float], stage_seconds: Dict[str, float]):
+    for stage, seconds in stage_seconds.items():
+        total_stage_seconds[stage] = total_stage_seconds.get(stage, 0) + seconds
+
+
+def hash_to_int(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class ManifestWriter:
+    """
+    Streams the row-hash manifest: one fixed-size binary record (see MANIFEST_DTYPE) per row, in the same order as
+    the rows in the full/lite output files, holding a hash of the row's id, a hash of the row's raw TSV content,
+    and whether the row made it into the plater output.
+    """
+
+    def __init__(self, file_path: str, flush_threshold: int = DEFAULT_FLUSH_THRESHOLD):
+        self.file_path = file_path
+        self.flush_threshold = flush_threshold
+        self.buffer = bytearray()
+        self.file = open(file_path, "wb")
+
+    def write(self, id_key: int, row_hash: int, in_plater: bool):
+        self.buffer += MANIFEST_RECORD.pack(id_key, row_hash, in_plater)
+        if len(self.buffer) >= self.flush_threshold:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.buffer = bytearray()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class PreviousManifest:
+    """
+    The manifest written by the conversion of the previous KG2c version, indexed by id hash so that blocks of new
+    rows can be checked for changes in a vectorized fashion.
+    """
+
+    def __init__(self, manifest_file_path: str):
+        self.records = np.fromfile(manifest_file_path, dtype=MANIFEST_DTYPE)
+        self.sort_order = np.argsort(self.records["id_key"], kind="stable")
+        self.sorted_id_keys = self.records["id_key"][self.sort_order]
+        logging.info(f"Loaded previous manifest {manifest_file_path} ({len(self.records)} rows)")
+
+    def find_unchanged(self, id_keys: np.ndarray, row_hashes: np.ndarray) -> np.ndarray:
+        """
+        Returns, for each of the given rows, the index of the identical row in the previous version's outputs,
+        or -1 if the row is new or has changed.
+        """
+        if not len(self.records):
+            return np.full(len(id_keys), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.sorted_id_keys, id_keys), len(self.records) - 1)
+        previous_indices = self.sort_order[positions]
+        is_unchanged = ((self.sorted_id_keys[positions] == id_keys) &
+                        (self.records["row_hash"][previous_indices] == row_hashes))
+        return np.where(is_unchanged, previous_indices, -1)
+
+
+def load_previous_manifest(tsv_path: str, previous_dir: str, manifest_metadata: dict) -> Optional[PreviousManifest]:
+    previous_tsv_path = os.path.join(previous_dir, os.path.basename(tsv_path))
+    previous_manifest_path = get_manifest_file_path(previous_tsv_path)
+    previous_metadata_path = previous_manifest_path.replace(".bin", ".json")
+    if not os.path.exists(previous_manifest_path) or not os.path.exists(previous_metadata_path):
+        logging.warning(f"No previous manifest found at {previous_manifest_path}; will do a full conversion")
+        return None
+    with open(previous_metadata_path, "r") as metadata_file:
+        previous_metadata = json.load(metadata_file)
+    # The previous outputs need to include every format we're producing now (but may include more)
+    has_needed_formats = set(manifest_metadata["extra_formats"]).issubset(previous_metadata.get("extra_formats", []))
+    other_settings = {key: value for key, value in manifest_metadata.items() if key != "extra_formats"}
+    previous_other_settings = {key: value for key, value in previous_metadata.items() if key != "extra_formats"}
+    if previous_other_settings != other_settings or not has_needed_formats:
+        logging.warning(f"Previous outputs were created with different settings ({previous_metadata} vs. "
+                        f"{manifest_metadata}); will do a full conversion")
+        return None
+    return PreviousManifest(previous_manifest_path)
+
+
+def iterate_in_blocks(items: Iterable[any], block_size: int) -> Iterator[List[any]]:
+    block = []
+    for item in items:
+        block.append(item)
+        if len(block) == block_size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+class CompressedOutputFile:
+    """
+    Write-only binary file whose contents are compressed on the fly by an external, multi-threaded compressor
+    process (pigz or zstd), so compression runs in parallel with conversion.
+    """
+
+    def __init__(self, file_path: str, compressor_command: List[str]):
+        self.file_path = file_path
+        self.output_file = open(file_path, "wb")
+        self.process = subprocess.Popen(compressor_command, stdin=subprocess.PIPE, stdout=self.output_file)
+
+    def write(self, data: bytes):
+        self.process.stdin.write(data)
+
+    def close(self):
+        self.process.stdin.close()
+        return_code = self.process.wait()
+        self.output_file.close()
+        if return_code:
+            raise RuntimeError(f"Compressor process for {self.file_path} exited with code {return_code}")
+
+
+def open_output_file(file_path: str, compression: Optional[str] = None) -> any:
+    """
+    Opens a binary file for writing, compressing its contents with gzip or zstd if requested. Compressed outputs are
+    made up of independent gzip members/zstd frames, so they can be concatenated just like uncompressed ones.
+    """
+    if compression == "gzip":
+        if shutil.which("pigz"):
+            return CompressedOutputFile(file_path, ["pigz", "-c", "-p", str(os.cpu_count())])
+        return gzip.open(file_path, "wb", compresslevel=6)  # Single-threaded fallback
+    elif compression == "zstd":
+        if shutil.which("zstd"):
+            return CompressedOutputFile(file_path, ["zstd", "-c", "-q", "-T0"])
+        raise ValueError("zstd compression was requested, but the zstd command-line tool is not installed")
+    elif compression:
+        raise ValueError(f"Unrecognized compression '{compression}'; options are: gzip, zstd")
+    else:
+        return open(file_path, "wb")
+
+
+@contextmanager
+def open_input_file(file_path: str) -> Iterator[any]:
+    """
+    Opens a (possibly gzip- or zstd-compressed, judging by its extension) file for reading in binary mode. External
+    decompressors are used where available, so that decompression happens in parallel with processing.
+    """
+    decompressor_command = None
+    if file_path.endswith(".gz"):
+        decompressor_command = ["pigz", "-dc", file_path] if shutil.which("pigz") else None
+    elif file_path.endswith(".zst"):
+        if not shutil.which("zstd"):
+            raise ValueError(f"Can't read {file_path}, since the zstd command-line tool is not installed")
+        decompressor_command = ["zstd", "-dc", "-q", file_path]
+
+    if decompressor_command:
+        process = subprocess.Popen(decompressor_command, stdout=subprocess.PIPE, bufsize=16 * 1024 * 1024)
+        try:
+            yield process.stdout
+        finally:
+            process.stdout.close()
+            process.wait()
+    elif file_path.endswith(".gz"):
+        with gzip.open(file_path, "rb") as input_file:
+            yield input_file
+    else:
+        with open(file_path, "rb") as input_file:
+            yield input_file
+
+
+@contextmanager
+def open_tarball_stream(tarball_path: str) -> Iterator[tarfile.TarFile]:
+    """
+    Opens the given (e.g., KG2c) tarball for streaming, sequential reading of its members, without extracting it
+    to disk. Where possible, decompression is done by an external process (pigz/gzip or zstd), so that it overlaps
+    with whatever is consuming the members.
+    """
+    if tarball_path.endswith((".tar.gz", ".tgz")):
+        decompressor = "pigz" if shutil.which("pigz") else "gzip"
+        decompressor_command = [decompressor, "-dc", tarball_path]
+    elif tarball_path.endswith((".tar.zst", ".tzst")) and shutil.which("zstd"):
+        decompressor_command = ["zstd", "-dc", "-q", tarball_path]
+    else:
+        decompressor_command = None
+
+    if decompressor_command:
+        process = subprocess.Popen(decompressor_command, stdout=subprocess.PIPE, bufsize=16 * 1024 * 1024)
+        try:
+            with tarfile.open(fileobj=process.stdout, mode="r|") as tar:
+                yield tar
+        finally:
+            process.stdout.close()
+            process.wait()
+    else:
+        with tarfile.open(tarball_path, mode="r|*") as tar:
+            yield tar
+
+
+def extract_tarball_headers(tarball_path: str, header_tsv_paths: List[str]):
+    """
+    Writes the (tiny) header TSV members of the tarball to the given paths, matching members by file name. Stops
+    reading the tarball as soon as all headers have been found.
+    """
+    remaining_headers = {os.path.basename(header_tsv_path): header_tsv_path for header_tsv_path in header_tsv_paths}
+    with open_tarball_stream(tarball_path) as tar:
+        for member in tar:
+            header_tsv_path = remaining_headers.pop(os.path.basename(member.name), None)
+            if header_tsv_path and member.isfile():
+                logging.info(f"Extracting {member.name} from {tarball_path} to {header_tsv_path}")
+                with tar.extractfile(member) as member_file, open(header_tsv_path, "wb") as header_file:
+                    shutil.copyfileobj(member_file, header_file)
+            if not remaining_headers:
+                break
+    if remaining_headers:
+        raise ValueError(f"Couldn't find header file(s) {list(remaining_headers)} in {tarball_path}")
+
+
+def get_compression_suffix(compression: Optional[str]) -> str:
+    return {"gzip": ".gz", "zstd": ".zst"}.get(compression, "")
+
+
+def get_json_encoder(json_encoder: str) -> Callable[[dict], bytes]:
+    if json_encoder == "orjson":
+        try:
+            import orjson
+        except ImportError:
+            raise ValueError("The 'orjson' JSON encoder was requested, but orjson is not installed "
+                             "(pip install orjson)")
+        return orjson.dumps  # Note: Output is compact (no spaces after separators), unlike the default encoder
+    elif json_encoder == "json":
+        # Matches the jsonlines library's default output, byte for byte
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        return lambda row: encode(row).encode("utf-8")
+    else:
+        raise ValueError(f"Unrecognized JSON encoder '{json_encoder}'; options are: json, orjson")
+
+
+class JsonlStreamWriter:
+    """
+    Keeps one handle open on a JSON lines output file for the whole run; rows are serialized as soon as they're
+    produced and the encoded bytes are flushed to disk whenever they exceed flush_threshold, so memory use stays
+    flat regardless of how big the input is.
+    """
+
+    def __init__(self, file_path: str, flush_threshold: int = DEFAULT_FLUSH_THRESHOLD, json_encoder: str = "json",
+                 compression: Optional[str] = None):
+        self.file_path = file_path
+        self.flush_threshold = flush_threshold
+        self.encode = get_json_encoder(json_encoder)
+        self.buffer = bytearray()
+        self.num_rows_written = 0
+        self.num_bytes_written = 0
+        self.file = open_output_file(file_path, compression)
+
+    def write(self, row: dict):
+        self.buffer += self.encode(row)
+        self.buffer += b"\n"
+        self.num_rows_written += 1
+        if len(self.buffer) >= self.flush_threshold:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.num_bytes_written += len(self.buffer)
+            self.buffer = bytearray()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Neo4jImportCsvWriter:
+    """
+    Writes plater-format rows as a neo4j-admin import CSV data file (the matching typed header goes in a separate
+    file, see write_neo4j_header_file(), so that chunk outputs can simply be concatenated or passed as shards).
+    Array values are joined with NEO4J_ARRAY_DELIMITER, which must be passed to neo4j-admin import.
+    """
+
+    def __init__(self, file_path: str, neo4j_columns: List[Tuple[str, str]],
+                 flush_threshold: int = DEFAULT_FLUSH_THRESHOLD, compression: Optional[str] = None):
+        self.file_path = file_path
+        self.flush_threshold = flush_threshold
+        self.property_names = [property_name for _, property_name in neo4j_columns]
+        self.num_rows_written = 0
+        self.num_bytes_written = 0
+        self.file = open_output_file(file_path, compression)
+        self.buffer = io.StringIO()
+        self.csv_writer = csv.writer(self.buffer)
+
+    def write(self, row: dict):
+        csv_row = []
+        for property_name in self.property_names:
+            value = row.get(property_name)
+            if value is None:
+                csv_row.append("")
+            elif isinstance(value, list):
+                csv_row.append(NEO4J_ARRAY_DELIMITER.join(value))
+            else:
+                csv_row.append(value)
+        self.csv_writer.writerow(csv_row)
+        self.num_rows_written += 1
+        if self.buffer.tell() >= self.flush_threshold:
+            self.flush()
+
+    def flush(self):
+        encoded_rows = self.buffer.getvalue().encode("utf-8")
+        if encoded_rows:
+            self.file.write(encoded_rows)
+            self.num_bytes_written += len(encoded_rows)
+            self.buffer = io.StringIO()
+            self.csv_writer = csv.writer(self.buffer)
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def get_plater_property_names(columns_to_keep: List[str]) -> List[str]:
+    # Mirrors the renaming/materializing convert_to_plater_format() does
+    plater_property_names = []
+    for col_name in columns_to_keep:
+        if col_name != "domain_range_exclusion":
+            plater_property_names.append(PLATER_COL_NAME_REMAPPINGS.get(col_name, col_name))
+            if col_name == "all_categories":
+                plater_property_names.append("category")
+    return plater_property_names
+
+
+def get_neo4j_columns(columns_to_keep: List[str]) -> List[Tuple[str, str]]:
+    """
+    Returns the (typed header field, plater property name) pairs making up the neo4j-admin import CSV columns.
+    Nodes are labeled with their materialized categories, and edges are typed by their predicate.
+    """
+    plater_property_names = get_plater_property_names(columns_to_keep)
+    array_property_names = ARRAY_COL_NAMES | {"category"}
+
+    if "subject" in plater_property_names:
+        neo4j_columns = [(":START_ID", "subject"), (":TYPE", "predicate"), (":END_ID", "object")]
+    else:
+        neo4j_columns = [(":LABEL", "category")]
+    for property_name in plater_property_names:
+        if property_name == "id" and "subject" not in plater_property_names:
+            header_field = "id:ID"
+        elif property_name in array_property_names:
+            header_field = f"{property_name}:string[]"
+        else:
+            header_field = property_name
+        neo4j_columns.append((header_field, property_name))
+    return neo4j_columns
+
+
+def write_neo4j_header_file(header_file_path: str, neo4j_columns: List[Tuple[str, str]]):
+    with open(header_file_path, "w", newline="", encoding="utf-8") as header_file:
+        csv.writer(header_file).writerow([header_field for header_field, _ in neo4j_columns])
+
+
+class ParquetStreamWriter:
+    """
+    Writes rows to a Parquet file one row group at a time: rows are accumulated column-wise until row_group_size of
+    them have been gathered, at which point they're written out as a row group. Columns in array_property_names are
+    list-typed; all others are strings.
+    """
+
+    def __init__(self, file_path: str, property_names: List[str], array_property_names: Set[str],
+                 row_group_size: int = DEFAULT_PARQUET_ROW_GROUP_SIZE):
+        pa, pq = import_pyarrow()
+        self.file_path = file_path
+        self.row_group_size = row_group_size
+        self.schema = get_parquet_schema(property_names, array_property_names)
+        self.columns = {property_name: [] for property_name in property_names}
+        self.num_buffered_rows = 0
+        self.num_rows_written = 0
+        self.writer = pq.ParquetWriter(file_path, self.schema, compression="zstd")
+
+    def write(self, row: dict):
+        for property_name, column_values in self.columns.items():
+            column_values.append(row.get(property_name))
+        self.num_buffered_rows += 1
+        if self.num_buffered_rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if self.num_buffered_rows:
+            pa, _ = import_pyarrow()
+            self.writer.write_table(pa.Table.from_pydict(self.columns, schema=self.schema))
+            self.num_rows_written += self.num_buffered_rows
+            self.columns = {property_name: [] for property_name in self.columns}
+            self.num_buffered_rows = 0
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Parquet output was requested, but pyarrow is not installed (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+
+def import_pyarrow_compute():
+    try:
+        import pyarrow
+        import pyarrow.compute
+    except ImportError:
+        raise ValueError("Vectorized conversion was requested, but pyarrow is not installed (pip install pyarrow)")
+    return pyarrow, pyarrow.compute
+
+
+def get_parquet_schema(property_names: List[str], array_property_names: Set[str]) -> any:
+    pa, _ = import_pyarrow()
+    # List items are named 'element' (as in the Parquet spec), so that the schema read back from a Parquet file (e.g.,
+    # when concatenating chunk outputs) is identical to the one it was written with
+    list_type = pa.list_(pa.field("element", pa.string()))
+    return pa.schema([(property_name, list_type if property_name in array_property_names else pa.string())
+                      for property_name in property_names])
+
+
+def get_parquet_columns(columns_to_keep: List[str]) -> Dict[str, Tuple[List[str], Set[str]]]:
+    """
+    Returns the property names and array-valued property names of each kind of Parquet output. Only the plater
+    output has the materialized (list-valued) 'category'; in the full and lite outputs it's the KG2c string column.
+    """
+    return {"full_parquet": (columns_to_keep, ARRAY_COL_NAMES),
+            "lite_parquet": ([col_name for col_name in columns_to_keep if col_name in LITE_PROPERTIES],
+                             ARRAY_COL_NAMES),
+            "plater_parquet": (get_plater_property_names(columns_to_keep), ARRAY_COL_NAMES | {"category"})}
+
+
+def concatenate_parquet_files(input_file_paths: List[str], output_file_path: str,
+                              row_masks: Optional[List[Optional[np.ndarray]]] = None,
+                              row_group_size: int = DEFAULT_PARQUET_ROW_GROUP_SIZE):
+    """
+    Copies the rows of the input Parquet files (all of which have the same schema) into one output file, regrouped
+    into row groups of row_group_size rows (so that the output is laid out exactly as if ParquetStreamWriter had
+    written all the rows itself). If row masks are given, only the rows of each input file whose mask value is True
+    are kept.
+    """
+    pa, pq = import_pyarrow()
+    row_masks = row_masks if row_masks else [None] * len(input_file_paths)
+    writer = None
+    buffered_row_groups = []
+    num_buffered_rows = 0
+    for input_file_path, row_mask in zip(input_file_paths, row_masks):
+        parquet_file = pq.ParquetFile(input_file_path)
+        if writer is None:
+            writer = pq.ParquetWriter(output_file_path, parquet_file.schema_arrow, compression="zstd")
+        row_offset = 0
+        for row_group_num in range(parquet_file.num_row_groups):
+            row_group = parquet_file.read_row_group(row_group_num)
+            num_rows = row_group.num_rows
+            if row_mask is not None:
+                row_group = row_group.filter(pa.array(row_mask[row_offset:row_offset + num_rows]))
+            row_offset += num_rows
+            buffered_row_groups.append(row_group)
+            num_buffered_rows += row_group.num_rows
+            while num_buffered_rows >= row_group_size:
+                rows = pa.concat_tables(buffered_row_groups)
+                writer.write_table(rows.slice(0, row_group_size).combine_chunks())
+                buffered_row_groups = [rows.slice(row_group_size)]
+                num_buffered_rows -= row_group_size
+    if writer:
+        if num_buffered_rows:
+            writer.write_table(pa.concat_tables(buffered_row_groups).combine_chunks())
+        writer.close()
+
+
+def open_output_writers(output_file_paths: Dict[str, str], writer_options: dict) -> Dict[str, any]:
+    writers = dict()
+    for output_kind, output_file_path in output_file_paths.items():
+        if output_kind == "neo4j":
+            writers[output_kind] = Neo4jImportCsvWriter(output_file_path, writer_options["neo4j_columns"],
+                                                        flush_threshold=writer_options["flush_threshold"],
+                                                        compression=writer_options["compression"])
+        elif output_kind.endswith("_parquet"):
+            property_names, array_property_names = writer_options["parquet_columns"][output_kind]
+            writers[output_kind] = ParquetStreamWriter(output_file_path, property_names, array_property_names,
+                                                       row_group_size=writer_options["parquet_row_group_size"])
+        else:
+            writers[output_kind] = JsonlStreamWriter(output_file_path,
+                                                     flush_threshold=writer_options["flush_threshold"],
+                                                     json_encoder=writer_options["json_encoder"],
+                                                     compression=writer_options["compression"])
+    return writers
 
 
 def convert_to_json_format(line: list,
@@ -74,9 +715,14 @@ def convert_to_json_format(line: list,
     return row_obj
 
 
-def convert_to_plater_format(row_obj: dict, bh: any) -> Optional[dict]:
+def convert_to_plater_format(row_obj: dict, bh: any,
+                             stage_seconds: Optional[Dict[str, float]] = None) -> Optional[dict]:
     # Exclude 'weak' edges (semmeddb edges with < 4 publications and domain_range_exclusion=True edges)
-    if should_filter_out(row_obj):
+    start = time.perf_counter()
+    is_filtered_out = should_filter_out(row_obj)
+    if stage_seconds is not None:
+        stage_seconds["filter"] += time.perf_counter() - start
+    if is_filtered_out:
         row_obj_for_plater = None
     else:
         # Go through and add each item in the original object to a copy for Plater, modifying as necessary
@@ -89,9 +735,12 @@ def convert_to_plater_format(row_obj: dict, bh: any) -> Optional[dict]:
 
                 # Pre-materialize category ancestors for Plater
                 if col_name == "all_categories":
+                    start = time.perf_counter()
                     row_obj_for_plater["category"] = bh.get_ancestors(parsed_value,
                                                                       include_mixins=False,
                                                                       include_conflations=False)
+                    if stage_seconds is not None:
+                        stage_seconds["ancestor_expansion"] += time.perf_counter() - start
 
         # Raise the predicate of subclass_of edges from sources we don't want used for subclass reasoning
         predicate = row_obj.get("predicate")  # Will be None if this is a Node object
@@ -102,81 +751,738 @@ def convert_to_plater_format(row_obj: dict, bh: any) -> Optional[dict]:
     return row_obj_for_plater
 
 
-def convert_tsv_to_jsonl(tsv_path: str, header_tsv_path: str, bh: any):
+def get_block_column(line_block: List[list], columns_to_keep: List[str], node_column_indeces: Dict[str, int],
+                     col_name: str) -> Optional[any]:
     """
-    This method assumes the input TSV file names are in KG2c format (e.g., like nodes_c.tsv and nodes_c_header.tsv)
+    Returns the raw values of the given column for a block of rows as a pyarrow string array (or None if the column
+    isn't converted, in which case the row-wise conversion would never see it either).
     """
-    logging.info(f"\n\n**** Starting to process file {tsv_path} (header file is: {header_tsv_path}) ****")
-    jsonl_output_file_path = tsv_path.replace('.tsv', '.jsonl')
-    jsonl_output_file_path_lite = tsv_path.replace('.tsv', '-lite.jsonl')
-    jsonl_output_file_path_plater = tsv_path.replace('.tsv', '-plater.jsonl')
-    logging.info(f"Output file path for full version will be: {jsonl_output_file_path}")
-    logging.info(f"Output file path for lite version will be: {jsonl_output_file_path_lite}")
-    logging.info(f"Output file path for plater version will be: {jsonl_output_file_path_plater}")
-
-    # First delete preexisting versions of these files (important since we write in append mode)
+    if col_name not in columns_to_keep:
+        return None
+    pa, _ = import_pyarrow_compute()
+    return pa.array(list(map(itemgetter(node_column_indeces[col_name]), line_block)), type=pa.string())
+
+
+def compute_plater_block_masks(line_block: List[list], columns_to_keep: List[str],
+                               node_column_indeces: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Columnar version of should_filter_out and the subclass_of predicate raising in convert_to_plater_format: works on
+    whole (raw, unparsed) columns of a block of rows at once, using pyarrow compute kernels. Returns a mask of the
+    rows to exclude from Plater and a mask of the rows whose predicate should be raised to
+    biolink:related_to_at_concept_level.
+    """
+    pa, pc = import_pyarrow_compute()
+    num_rows = len(line_block)
+    is_excluded = np.zeros(num_rows, dtype=bool)
+    primary_knowledge_sources = get_block_column(line_block, columns_to_keep, node_column_indeces,
+                                                 "primary_knowledge_source")
+    if primary_knowledge_sources is not None:
+        is_semmeddb = pc.equal(primary_knowledge_sources, "infores:semmeddb").to_numpy(zero_copy_only=False)
+        if "publications" in columns_to_keep:
+            # Only SemMedDB edges' publications matter, and those can be huge, so only they are looked at
+            publications = get_block_column(list(itertools.compress(line_block, is_semmeddb)), columns_to_keep,
+                                            node_column_indeces, "publications")
+            # Empty values aren't parsed into lists, so they count as no publications at all; otherwise, an anchored
+            # match for the third delimiter stops scanning as soon as there are enough publications
+            has_enough_publications = pc.and_(
+                pc.invert(pc.is_in(publications, value_set=pa.array(["", "{}", "[]"]))),
+                pc.match_substring_regex(publications, f"^(?:[^{ARRAY_DELIMITER}]*{ARRAY_DELIMITER}){{3}}"))
+            is_excluded[is_semmeddb] = ~has_enough_publications.to_numpy(zero_copy_only=False)
+        else:
+            is_excluded |= is_semmeddb
+    domain_range_exclusions = get_block_column(line_block, columns_to_keep, node_column_indeces,
+                                               "domain_range_exclusion")
+    if domain_range_exclusions is not None:
+        is_excluded |= pc.is_in(domain_range_exclusions,
+                                value_set=pa.array(["True", "true"])).to_numpy(zero_copy_only=False)
+
+    is_predicate_raised = np.zeros(num_rows, dtype=bool)
+    predicates = get_block_column(line_block, columns_to_keep, node_column_indeces, "predicate")
+    if predicates is not None:
+        is_predicate_raised = pc.equal(predicates, "biolink:subclass_of").to_numpy(zero_copy_only=False)
+        if primary_knowledge_sources is not None:
+            is_trusted = pc.is_in(primary_knowledge_sources, value_set=pa.array(sorted(TRUSTED_SUBCLASS_SOURCES)))
+            is_predicate_raised &= ~is_trusted.to_numpy(zero_copy_only=False)
+    return is_excluded, is_predicate_raised
+
+
+def get_block_ancestors(line_block: List[list], node_column_indeces: Dict[str, int], bh: any) -> Dict[str, List[str]]:
+    """
+    Expands each distinct (raw) 'all_categories' value in a block of rows to its Plater category ancestors just once.
+    """
+    raw_values = set(map(itemgetter(node_column_indeces["all_categories"]), line_block))
+    return {raw_value: bh.get_ancestors(parse_value(raw_value, "all_categories"),
+                                        include_mixins=False,
+                                        include_conflations=False)
+            for raw_value in raw_values if raw_value not in {"", "{}", "[]"}}
+
+
+def materialize_plater_row(row_obj: dict, ancestors: Optional[List[str]], raise_predicate: bool) -> dict:
+    """
+    Builds the Plater version of a (non-excluded) row whose exclusion, predicate raising, and ancestors were computed
+    for its whole block; produces exactly what convert_to_plater_format would.
+    """
+    if ancestors is None and PLATER_COL_NAME_REMAPPINGS.keys().isdisjoint(row_obj):
+        # Nothing to rename or add (e.g., this is an edge), so the key order can be kept by copying the whole row
+        row_obj_for_plater = row_obj.copy()
+        row_obj_for_plater.pop("domain_range_exclusion", None)
+    else:
+        row_obj_for_plater = dict()
+        for col_name, parsed_value in row_obj.items():
+            if col_name != "domain_range_exclusion":
+                row_obj_for_plater[PLATER_COL_NAME_REMAPPINGS.get(col_name, col_name)] = parsed_value
+                if col_name == "all_categories":
+                    row_obj_for_plater["category"] = ancestors
+    if raise_predicate:
+        row_obj_for_plater["predicate"] = "biolink:related_to_at_concept_level"
+    return row_obj_for_plater
+
+
+def get_output_file_paths(tsv_path: str, shard_num: Optional[int] = None, delta: bool = False,
+                          extra_formats: Iterable[str] = (), compression: Optional[str] = None) -> Dict[str, str]:
+    """
+    Returns the paths of the full, lite, and plater output files for the given TSV (or for one numbered shard of it),
+    plus those for any extra formats requested ('neo4j' for the neo4j-admin import CSV data file, 'parquet' for
+    Parquet versions of the full, lite, and plater files, 'plover_lite' for the lite rows that made it into Plater,
+    for assembling the lite graph Plover uses). If delta is True, these are the paths of the files
+    holding only the added/changed rows (incremental mode). If compression is specified, the JSON lines and CSV
+    paths get the corresponding extension (Parquet files are always compressed internally).
+    """
+    shard_suffix = f".{shard_num:05d}" if shard_num is not None else ""
+    delta_suffix = "-delta" if delta else ""
+    compression_suffix = get_compression_suffix(compression)
+    output_file_paths = {"full": tsv_path.replace('.tsv', f'{delta_suffix}{shard_suffix}.jsonl{compression_suffix}'),
+                         "lite": tsv_path.replace('.tsv', f'-lite{delta_suffix}{shard_suffix}.jsonl'
+                                                          f'{compression_suffix}'),
+                         "plater": tsv_path.replace('.tsv', f'-plater{delta_suffix}{shard_suffix}.jsonl'
+                                                            f'{compression_suffix}')}
+    if "neo4j" in extra_formats:
+        output_file_paths["neo4j"] = tsv_path.replace('.tsv', f'-neo4j{delta_suffix}{shard_suffix}.csv'
+                                                              f'{compression_suffix}')
+    if "parquet" in extra_formats:
+        output_file_paths["full_parquet"] = tsv_path.replace('.tsv', f'{delta_suffix}{shard_suffix}.parquet')
+        output_file_paths["lite_parquet"] = tsv_path.replace('.tsv', f'-lite{delta_suffix}{shard_suffix}.parquet')
+        output_file_paths["plater_parquet"] = tsv_path.replace('.tsv', f'-plater{delta_suffix}{shard_suffix}.parquet')
+    if "plover_lite" in extra_formats:
+        output_file_paths["lite_filtered"] = tsv_path.replace('.tsv', f'-lite-filtered{delta_suffix}{shard_suffix}'
+                                                                      f'.jsonl{compression_suffix}')
+    return output_file_paths
+
+
+def get_neo4j_header_file_path(tsv_path: str) -> str:
+    return tsv_path.replace('.tsv', '-neo4j-header.csv')
+
+
+def get_manifest_file_path(tsv_path: str, shard_num: Optional[int] = None, delta: bool = False) -> str:
+    shard_suffix = f".{shard_num:05d}" if shard_num is not None else ""
+    delta_suffix = "-delta" if delta else ""
+    return tsv_path.replace('.tsv', f'-manifest{delta_suffix}{shard_suffix}.bin')
+
+
+def get_edge_ids_file_path(tsv_path: str) -> str:
+    return tsv_path.replace('.tsv', '-plater-edge-ids.npz')
+
+
+def to_id_array(ids: List[str]) -> np.ndarray:
+    # KG2c edge ids are integers, which can be stored much more compactly than strings
+    try:
+        return np.array(ids, dtype=np.int64) if ids else np.array([], dtype=np.int64)
+    except ValueError:
+        return np.array(ids, dtype=str)
+
+
+def concatenate_id_arrays(id_arrays: List[np.ndarray]) -> np.ndarray:
+    if any(id_array.dtype.kind != "i" for id_array in id_arrays):
+        id_arrays = [id_array.astype(str) for id_array in id_arrays]
+    return np.unique(np.concatenate(id_arrays)) if id_arrays else np.array([], dtype=np.int64)
+
+
+def write_edge_ids_file(tsv_path: str, edge_ids: Dict[str, List[np.ndarray]], previous_dir: Optional[str] = None):
+    """
+    Writes the (sorted) ids of the edges kept in and excluded from Plater to a compact .npz sidecar file (with
+    'kept' and 'excluded' arrays). In incremental mode, the previous version's ids are carried over, minus those
+    of previous rows that were removed or changed.
+    """
+    kept_ids = concatenate_id_arrays(edge_ids["kept"])
+    excluded_ids = concatenate_id_arrays(edge_ids["excluded"])
+    if previous_dir:
+        with np.load(get_edge_ids_file_path(os.path.join(previous_dir, os.path.basename(tsv_path)))) as previous_ids:
+            with open(get_removed_ids_file_paths(tsv_path)["full"]) as removed_ids_file:
+                removed_ids = to_id_array([line.rstrip("\n") for line in removed_ids_file])
+            kept_ids = concatenate_id_arrays([np.setdiff1d(previous_ids["kept"], removed_ids), kept_ids])
+            excluded_ids = concatenate_id_arrays([np.setdiff1d(previous_ids["excluded"], removed_ids), excluded_ids])
+    np.savez(get_edge_ids_file_path(tsv_path), kept=kept_ids, excluded=excluded_ids)
+    logging.info(f"Wrote ids of {len(kept_ids)} kept and {len(excluded_ids)} excluded edges to "
+                 f"{get_edge_ids_file_path(tsv_path)}")
+
+
+def write_plover_lite_graph(nodes_tsv_path: str, edges_tsv_path: str, compression: Optional[str] = None,
+                            kg2c_lite_json_path: Optional[str] = None):
+    """
+    Assembles the filtered lite graph Plover uses (a JSON object with 'nodes' and 'edges' arrays) out of the lite
+    nodes file and the filtered lite edges file, without re-parsing any of their rows. If the KG2c release's
+    kg2c_lite JSON is given, its other top-level keys (e.g., build info) are carried over, in their original order,
+    so that the graph matches what filter_kg2c_lite_json.py would produce (its own nodes and edges are skipped).
+    """
+    jsonl_paths = {"nodes": get_output_file_paths(nodes_tsv_path, compression=compression)["lite"],
+                   "edges": get_output_file_paths(edges_tsv_path, extra_formats=["plover_lite"],
+                                                  compression=compression)["lite_filtered"]}
+    graph_file_path = get_plover_lite_graph_file_path(edges_tsv_path, compression)
+    graph_file = open_output_file(graph_file_path, compression)
+    graph_file.write(b"{")
+    num_keys = 0
+    if kg2c_lite_json_path:
+        with open_text_file(kg2c_lite_json_path, "r") as kg2c_lite_json_file:
+            reader = StreamingJsonReader(kg2c_lite_json_file)
+            for key in reader.iterate_object():
+                graph_file.write(f'{", " if num_keys else ""}{json.dumps(key)}: '.encode("utf-8"))
+                if key in jsonl_paths:
+                    for _ in reader.iterate_array():
+                        pass
+                    write_jsonl_as_array(graph_file, jsonl_paths.pop(key))
+                else:
+                    graph_file.write(json.dumps(reader.read_value()).encode("utf-8"))
+                num_keys += 1
+    for array_name, jsonl_path in jsonl_paths.items():
+        graph_file.write(f'{", " if num_keys else ""}"{array_name}": '.encode("utf-8"))
+        write_jsonl_as_array(graph_file, jsonl_path)
+        num_keys += 1
+    graph_file.write(b"}\n")
+    graph_file.close()
+    logging.info(f"Wrote the filtered lite graph for Plover to {graph_file_path}")
+
+
+def write_jsonl_as_array(output_file: IO[bytes], jsonl_path: str):
+    output_file.write(b"[")
+    with open_input_file(jsonl_path) as jsonl_file:
+        for line_num, line in enumerate(jsonl_file):
+            output_file.write(line.rstrip(b"\n") if line_num == 0 else b", " + line.rstrip(b"\n"))
+    output_file.write(b"]")
+
+
+def convert_to_plover_lite_format(row_obj_lite: dict) -> dict:
+    # Edge ids are integers in the kg2c_lite JSON (and so in the filtered lite graph Plover loads)
+    return dict(row_obj_lite, id=int(row_obj_lite["id"]))
+
+
+def get_plover_lite_graph_file_path(edges_tsv_path: str, compression: Optional[str] = None) -> str:
+    return os.path.join(os.path.dirname(edges_tsv_path),
+                        f"kg2c-lite-filtered.json{get_compression_suffix(compression)}")
+
+
+def get_removed_ids_file_paths(tsv_path: str) -> Dict[str, str]:
+    return {"full": tsv_path.replace('.tsv', '-delta-removed.txt'),
+            "plater": tsv_path.replace('.tsv', '-plater-delta-removed.txt')}
+
+
+def delete_files(file_paths: List[str]):
     try:  # Rather crude way of making 'sudo' not be used on my Mac, but still be used on ubuntu instances..
-        os.system(f"rm -f {jsonl_output_file_path}")
-        os.system(f"rm -f {jsonl_output_file_path_lite}")
-        os.system(f"rm -f {jsonl_output_file_path_plater}")
+        for file_path in file_paths:
+            os.system(f"rm -f {file_path}")
     except Exception:
-        os.system(f"sudo rm -f {jsonl_output_file_path}")
-        os.system(f"sudo rm -f {jsonl_output_file_path_lite}")
-        os.system(f"sudo rm -f {jsonl_output_file_path_plater}")
+        for file_path in file_paths:
+            os.system(f"sudo rm -f {file_path}")
 
-    # First load column names and remove the ':type' suffixes neo4j requires on column names
+
+def load_column_info(header_tsv_path: str) -> Tuple[List[str], Dict[str, int]]:
+    # Load column names and remove the ':type' suffixes neo4j requires on column names
     header_df = pd.read_table(header_tsv_path)
     column_names = [col_name.split(":")[0] if not col_name.startswith(":") else col_name
                     for col_name in header_df.columns]
     node_column_indeces = {col_name: index for index, col_name in enumerate(column_names)}
+    columns_to_keep = [col_name for col_name in column_names if not col_name.startswith(":")]
+    return columns_to_keep, node_column_indeces
+
+
+def convert_lines(tsv_reader: Iterable[list],
+                  columns_to_keep: List[str],
+                  node_column_indeces: Dict[str, int],
+                  bh: any,
+                  output_file_paths: Dict[str, str],
+                  writer_options: dict,
+                  manifest_file_path: str,
+                  previous_manifest: Optional[PreviousManifest] = None,
+                  log_progress: bool = True) -> Tuple[int, int, np.ndarray, Dict[str, float],
+                                                  Dict[str, List[np.ndarray]]]:
+    """
+    Converts the given (already split) TSV rows and streams them to the full, lite, and plater output files (and
+    to the manifest). Used by both the serial path and the per-chunk workers, so that both apply exactly the same
+    conversion/filtering. If a previous manifest is given, rows identical to ones in the previous version's outputs
+    are skipped. If writer_options['vectorized'] is True, Plater exclusion, predicate raising, and ancestor expansion
+    are computed for each block of rows at once, as columnar array operations (see compute_plater_block_masks), and
+    the row dicts are only built for serialization. Returns the number of rows processed, the number of rows
+    excluded from the plater output, the indices of previous rows that can be reused as-is, the seconds spent in
+    each stage of the conversion (stages don't overlap, so their times add up to nearly the total time taken), and,
+    if a Plover lite output is being written, the ids of the converted rows that were kept in/excluded from Plater
+    (as lists of arrays, one per block).
+    """
+    num_rows_processed = 0
+    num_edges_excluded = 0
+    reused_previous_indices = []
+    id_index = node_column_indeces["id"]
+    all_categories_index = node_column_indeces["all_categories"] if "all_categories" in columns_to_keep else None
+    is_vectorized = writer_options["vectorized"]
+    stage_seconds = defaultdict(float)
+    perf_counter = time.perf_counter
+    start = perf_counter()
+    writers = open_output_writers(output_file_paths, writer_options)
+    manifest_writer = ManifestWriter(manifest_file_path, flush_threshold=writer_options["flush_threshold"])
+    write_stage_names = {output_kind: f"write_{output_kind}" for output_kind in writers}
+    edge_ids = {"kept": [], "excluded": []} if "lite_filtered" in writers else dict()
+    stage_seconds["open_writers"] += perf_counter() - start
+    try:
+        start = perf_counter()
+        for line_block in iterate_in_blocks(tsv_reader, MANIFEST_BLOCK_SIZE):
+            stage_seconds["read_and_parse"] += perf_counter() - start
+            start = perf_counter()
+            id_keys = np.fromiter((hash_to_int(line[id_index]) for line in line_block),
+                                  dtype=np.uint64, count=len(line_block))
+            row_hashes = np.fromiter((hash_to_int("\t".join(line)) for line in line_block),
+                                     dtype=np.uint64, count=len(line_block))
+            if previous_manifest:
+                previous_indices = previous_manifest.find_unchanged(id_keys, row_hashes)
+                unchanged_indices = previous_indices[previous_indices >= 0]
+                reused_previous_indices.append(unchanged_indices)
+                previous_in_plater = previous_manifest.records["in_plater"][unchanged_indices]
+                num_edges_excluded += int(np.count_nonzero(previous_in_plater == 0))
+            else:
+                previous_indices = np.full(len(line_block), -1, dtype=np.int64)
+            stage_seconds["hash_rows"] += perf_counter() - start
+
+            if is_vectorized:
+                start = perf_counter()
+                is_excluded, is_predicate_raised = compute_plater_block_masks(line_block, columns_to_keep,
+                                                                              node_column_indeces)
+                end = perf_counter()
+                stage_seconds["filter"] += end - start
+                block_ancestors = get_block_ancestors(line_block, node_column_indeces, bh) \
+                    if all_categories_index is not None else dict()
+                stage_seconds["ancestor_expansion"] += perf_counter() - end
+                plater_flags = zip(is_excluded.tolist(), is_predicate_raised.tolist())
+            else:
+                plater_flags = itertools.repeat((None, None))
+            block_edge_ids = {"kept": [], "excluded": []}
+
+            for line, id_key, row_hash, previous_index, (is_row_excluded, is_row_predicate_raised) in \
+                    zip(line_block, id_keys.tolist(), row_hashes.tolist(), previous_indices.tolist(), plater_flags):
+                num_rows_processed += 1
+                if previous_index >= 0:
+                    continue  # This row is unchanged since the previous version, so its old output will be reused
+
+                # Convert this TSV row into a json object (both in regular format and in Plater format)
+                start = perf_counter()
+                row_obj = convert_to_json_format(line, columns_to_keep, node_column_indeces)
+                end = perf_counter()
+                stage_seconds["json_conversion"] += end - start
+                if not is_vectorized:
+                    row_obj_for_plater = convert_to_plater_format(row_obj, bh, stage_seconds)
+                elif is_row_excluded:
+                    row_obj_for_plater = None
+                else:
+                    row_ancestors = block_ancestors.get(line[all_categories_index]) \
+                        if all_categories_index is not None else None
+                    row_obj_for_plater = materialize_plater_row(row_obj, row_ancestors, is_row_predicate_raised)
+                start = perf_counter()
+                stage_seconds["plater_conversion"] += start - end
+                row_obj_lite = {property_name: value for property_name, value in row_obj.items()
+                                if property_name in LITE_PROPERTIES}
+                stage_seconds["lite_projection"] += perf_counter() - start
+
+                # Write the row as applicable; create both the 'lite', 'full', and 'plater' files at the same time
+                row_outputs = [("full", row_obj), ("lite", row_obj_lite),
+                               ("full_parquet", row_obj), ("lite_parquet", row_obj_lite)]
+                if row_obj_for_plater:
+                    row_outputs += [("plater", row_obj_for_plater), ("neo4j", row_obj_for_plater),
+                                    ("plater_parquet", row_obj_for_plater)]
+                    if edge_ids:
+                        row_outputs.append(("lite_filtered", convert_to_plover_lite_format(row_obj_lite)))
+                else:
+                    num_edges_excluded += 1
+                if edge_ids:
+                    block_edge_ids["kept" if row_obj_for_plater else "excluded"].append(line[id_index])
+                for output_kind, output_row in row_outputs:
+                    writer = writers.get(output_kind)
+                    if writer:
+                        start = perf_counter()
+                        writer.write(output_row)
+                        stage_seconds[write_stage_names[output_kind]] += perf_counter() - start
+                start = perf_counter()
+                manifest_writer.write(id_key, row_hash, bool(row_obj_for_plater))
+                stage_seconds["write_manifest"] += perf_counter() - start
+
+            for id_kind, ids in edge_ids.items():
+                ids.append(to_id_array(block_edge_ids[id_kind]))
+            if log_progress and num_rows_processed // 1000000 > (num_rows_processed - len(line_block)) // 1000000:
+                logging.info(f"Have processed {num_rows_processed} rows... ({num_edges_excluded} excluded)")
+            start = perf_counter()
+    finally:
+        for output_kind, writer in writers.items():
+            start = perf_counter()
+            writer.close()
+            stage_seconds[write_stage_names[output_kind]] += perf_counter() - start
+        start = perf_counter()
+        manifest_writer.close()
+        stage_seconds["write_manifest"] += perf_counter() - start
+    if not is_vectorized:
+        # Filtering and ancestor expansion happen within the plater conversion, but are reported as their own stages
+        stage_seconds["plater_conversion"] -= stage_seconds["filter"] + stage_seconds["ancestor_expansion"]
+    reused_previous_indices = np.concatenate(reused_previous_indices) if reused_previous_indices else \
+        np.array([], dtype=np.int64)
+    return num_rows_processed, num_edges_excluded, reused_previous_indices, dict(stage_seconds), edge_ids
+
+
+def merge_with_previous_outputs(tsv_path: str, previous_dir: str, previous_manifest: PreviousManifest,
+                                reused_previous_indices: np.ndarray, extra_formats: Iterable[str] = (),
+                                compression: Optional[str] = None,
+                                parquet_row_group_size: int = DEFAULT_PARQUET_ROW_GROUP_SIZE):
+    """
+    Builds the complete outputs for the new version out of the previous version's outputs (for unchanged rows)
+    plus the delta files (for added/changed rows), without re-parsing any JSON for the reused rows. Also writes
+    the ids of previous rows that were not carried over (i.e., were removed or changed) to the removed-ids files,
+    so that a loader can apply the deltas to the previous version instead.
+    """
+    previous_output_file_paths = get_output_file_paths(os.path.join(previous_dir, os.path.basename(tsv_path)),
+                                                       extra_formats=extra_formats, compression=compression)
+    delta_file_paths = get_output_file_paths(tsv_path, delta=True, extra_formats=extra_formats,
+                                             compression=compression)
+    output_file_paths = get_output_file_paths(tsv_path, extra_formats=extra_formats, compression=compression)
+    removed_ids_file_paths = get_removed_ids_file_paths(tsv_path)
+    is_reused = np.zeros(len(previous_manifest.records), dtype=bool)
+    is_reused[reused_previous_indices] = True
+    plater_previous_indices = np.flatnonzero(previous_manifest.records["in_plater"])
+
+    for output_kind, output_file_path in output_file_paths.items():
+        # Note: Each line of the previous full/lite files corresponds to the same row of the previous manifest,
+        # while lines in the previous plater/neo4j files correspond to the manifest rows that made it into plater
+        row_indices = plater_previous_indices if output_kind in {"plater", "neo4j", "plater_parquet",
+                                                                 "lite_filtered"} \
+            else np.arange(len(is_reused))
+        if output_kind.endswith("_parquet"):
+            concatenate_parquet_files([previous_output_file_paths[output_kind], delta_file_paths[output_kind]],
+                                      output_file_path, row_masks=[is_reused[row_indices], None],
+                                      row_group_size=parquet_row_group_size)
+            continue
+        removed_ids_file_path = removed_ids_file_paths.get(output_kind)
+        removed_ids_file = open(removed_ids_file_path, "w") if removed_ids_file_path else None
+        output_file = open_output_file(output_file_path, compression)
+        with open_input_file(previous_output_file_paths[output_kind]) as previous_file:
+            for row_index, line in zip(row_indices.tolist(), previous_file):
+                if is_reused[row_index]:
+                    output_file.write(line)
+                elif removed_ids_file:
+                    removed_ids_file.write(f"{json.loads(line)['id']}\n")
+        output_file.close()
+        if removed_ids_file:
+            removed_ids_file.close()
+        # The delta file can be appended as-is (even if compressed, since gzip members/zstd frames concatenate)
+        with open(output_file_path, "ab") as output_file, open(delta_file_paths[output_kind], "rb") as delta_file:
+            shutil.copyfileobj(delta_file, output_file, 16 * 1024 * 1024)
+
+    # The new manifest lines up with the new full/lite outputs: reused rows first, then the delta rows
+    with open(get_manifest_file_path(tsv_path), "wb") as manifest_file:
+        manifest_file.write(previous_manifest.records[is_reused].tobytes())
+        with open(get_manifest_file_path(tsv_path, delta=True), "rb") as delta_manifest_file:
+            shutil.copyfileobj(delta_manifest_file, manifest_file, 16 * 1024 * 1024)
+    logging.info(f"Reused {len(reused_previous_indices)} unchanged rows from the previous outputs in {previous_dir}; "
+                 f"{len(is_reused) - len(reused_previous_indices)} previous rows were removed or changed")
+
+
+def get_chunk_byte_ranges(tsv_path: str, num_chunks: int) -> List[Tuple[int, int]]:
+    """
+    Splits the TSV file into (roughly) equal byte ranges whose boundaries always fall right after a newline. Note
+    this assumes no field contains an embedded newline, which holds for the KG2c TSVs.
+    """
+    file_size = os.path.getsize(tsv_path)
+    boundaries = [0]
+    with open(tsv_path, "rb") as tsv_file:
+        for chunk_num in range(1, num_chunks):
+            tsv_file.seek(max(file_size * chunk_num // num_chunks, boundaries[-1]))
+            tsv_file.readline()  # Move to the start of the next line
+            boundaries.append(min(tsv_file.tell(), file_size))
+    boundaries.append(file_size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def read_tsv_chunk(tsv_path: str, start: int, end: int) -> Iterator[str]:
+    with open(tsv_path, "rb") as tsv_file:
+        tsv_file.seek(start)
+        position = start
+        while position < end:
+            raw_line = tsv_file.readline()
+            if not raw_line:
+                break
+            position += len(raw_line)
+            yield raw_line.decode("utf-8")
+
+
+def _init_chunk_worker(bh: any, columns_to_keep: List[str], node_column_indeces: Dict[str, int],
+                       writer_options: dict, previous_manifest: Optional[PreviousManifest],
+                       profile_interval: Optional[float]):
+    global _worker_state
+    stack_sampler = StackSampler(profile_interval) if profile_interval else None
+    if stack_sampler:
+        stack_sampler.start()  # Samples are handed back to the main process along with each chunk's results
+    _worker_state = {"bh": bh, "columns_to_keep": columns_to_keep, "node_column_indeces": node_column_indeces,
+                     "writer_options": writer_options, "previous_manifest": previous_manifest,
+                     "stack_sampler": stack_sampler}
+
+
+def convert_tsv_chunk(chunk_info: Tuple[str, int, int, int]) -> Tuple[int, int, int, np.ndarray, Tuple[int, int],
+                                                                       Dict[str, float], Dict[str, int],
+                                                                       Dict[str, List[np.ndarray]]]:
+    tsv_path, chunk_num, start, end = chunk_info
+    is_incremental = _worker_state["previous_manifest"] is not None
+    writer_options = _worker_state["writer_options"]
+    output_file_paths = get_output_file_paths(tsv_path, shard_num=chunk_num, delta=is_incremental,
+                                              extra_formats=writer_options["extra_formats"],
+                                              compression=writer_options["compression"])
+    manifest_file_path = get_manifest_file_path(tsv_path, shard_num=chunk_num, delta=is_incremental)
+    tsv_reader = csv.reader(read_tsv_chunk(tsv_path, start, end), delimiter="\t")
+    num_rows, num_excluded, reused_indices, stage_seconds, edge_ids = convert_lines(
+        tsv_reader, _worker_state["columns_to_keep"], _worker_state["node_column_indeces"], _worker_state["bh"],
+        output_file_paths, writer_options, manifest_file_path, previous_manifest=_worker_state["previous_manifest"],
+        log_progress=False)
+    bh = _worker_state["bh"]
+    cache_stats = bh.pop_stats() if isinstance(bh, CategoryAncestorCache) else (0, 0)
+    stack_sampler = _worker_state["stack_sampler"]
+    stack_counts = dict(stack_sampler.pop_stack_counts()) if stack_sampler else {}
+    return chunk_num, num_rows, num_excluded, reused_indices, cache_stats, stage_seconds, stack_counts, edge_ids
+
+
+def concatenate_files(input_file_paths: List[str], output_file_path: str):
+    with open(output_file_path, "wb") as output_file:
+        for input_file_path in input_file_paths:
+            if os.path.exists(input_file_path):
+                with open(input_file_path, "rb") as input_file:
+                    shutil.copyfileobj(input_file, output_file, 16 * 1024 * 1024)
+                os.remove(input_file_path)
+
+
+def convert_tsv_to_jsonl(tsv_path: str, header_tsv_path: str, bh: any,
+                         num_workers: int = 1, shard_outputs: bool = False,
+                         flush_threshold: int = DEFAULT_FLUSH_THRESHOLD, json_encoder: str = "json",
+                         previous_dir: Optional[str] = None, biolink_version: Optional[str] = None,
+                         neo4j_csv: bool = False, parquet: bool = False,
+                         parquet_row_group_size: int = DEFAULT_PARQUET_ROW_GROUP_SIZE,
+                         compression: Optional[str] = None, input_file: Optional[IO[bytes]] = None,
+                         stack_sampler: Optional[StackSampler] = None, vectorized: bool = False,
+                         plover_lite: bool = False) -> dict:
+    """
+    This method assumes the input TSV file names are in KG2c format (e.g., like nodes_c.tsv and nodes_c_header.tsv).
+    If num_workers > 1, the TSV is split into byte-range chunks that are converted in a process pool; outputs are
+    then either stitched back together in the original row order or left as numbered shards (if shard_outputs).
+    Rows are streamed to the output files; flush_threshold is how many encoded bytes each writer buffers
+    before writing to disk, and json_encoder is 'json' (default) or 'orjson' (faster, but compact output).
+    A row-hash manifest is always written next to the outputs; if previous_dir (holding the outputs and manifest
+    from converting a previous KG2c version) is given, only added/changed rows are converted (into delta files),
+    and the complete outputs are assembled from those plus the unchanged rows of the previous outputs.
+    If neo4j_csv is True, the plater rows are also written as neo4j-admin import CSVs (a typed header file plus
+    data file(s)), so that the graph can be bulk-imported into Neo4j directly. If parquet is True, the full, lite,
+    and plater rows are also written to Parquet files (see kg2c_parquet_reader.py for reading them). If
+    compression ('gzip' or 'zstd') is specified, the JSON lines/CSV outputs are compressed as they're written
+    (neo4j-admin only reads gzipped CSVs, so zstd can't be combined with neo4j_csv).
+    If input_file is given (e.g., a member of the KG2c tarball, being streamed), rows are read from it rather than
+    from tsv_path (which is still used to name the outputs); such streams are always converted serially.
+    Returns a report of how long each stage of the conversion took, throughput, and output sizes; if a (running)
+    stack_sampler is given, any conversion workers sample their stacks too, and their samples are added to it.
+    If vectorized is True, Plater filtering/remapping is computed a block of rows at once (the outputs are identical).
+    If plover_lite is True and this is an edges TSV, the lite rows of the edges kept in Plater are also written (see
+    write_plover_lite_graph), along with a sidecar file of the ids of the kept and excluded edges.
+    """
+    logging.info(f"\n\n**** Starting to process file {tsv_path} (header file is: {header_tsv_path}) ****")
+    if neo4j_csv and compression == "zstd":
+        raise ValueError("neo4j-admin import can't read zstd-compressed CSVs; use gzip compression (or none) "
+                         "together with neo4j CSV output")
+    start_time = time.time()
+    columns_to_keep, node_column_indeces = load_column_info(header_tsv_path)
+    is_edges_tsv = "predicate" in columns_to_keep  # Only edges are ever excluded from Plater
+    extra_formats = [extra_format for extra_format, requested in [("neo4j", neo4j_csv), ("parquet", parquet),
+                                                                  ("plover_lite", plover_lite and is_edges_tsv)]
+                     if requested]
+    output_file_paths = get_output_file_paths(tsv_path, extra_formats=extra_formats, compression=compression)
+    logging.info(f"Output file path for full version will be: {output_file_paths['full']}")
+    logging.info(f"Output file path for lite version will be: {output_file_paths['lite']}")
+    logging.info(f"Output file path for plater version will be: {output_file_paths['plater']}")
+    if neo4j_csv:
+        logging.info(f"Output file path for neo4j-admin import CSV will be: {output_file_paths['neo4j']}")
+    if parquet:
+        logging.info(f"Output file path for plater Parquet version will be: {output_file_paths['plater_parquet']}")
+
+    if "plover_lite" in extra_formats:
+        logging.info(f"Output file path for filtered lite version will be: {output_file_paths['lite_filtered']}")
+
+    # First delete preexisting versions of these files (e.g., shards or leftovers from an interrupted run)
+    delete_files(list(output_file_paths.values()))
+
     logging.info(f"Columns mapped to their indeces are:\n "
                  f"{json.dumps(node_column_indeces, indent=2)}")
-    columns_to_keep = [col_name for col_name in column_names if not col_name.startswith(":")]
     logging.info(f"We'll use this subset of ({len(columns_to_keep)}) columns:\n "
                  f"{json.dumps(columns_to_keep, indent=2)}")
 
+    # Reusing previous outputs is only safe if they were created in the same way
+    manifest_metadata = {"columns": list(node_column_indeces), "json_encoder": json_encoder,
+                         "biolink_version": biolink_version, "extra_formats": extra_formats,
+                         "compression": compression}
+    previous_manifest = load_previous_manifest(tsv_path, previous_dir, manifest_metadata) if previous_dir else None
+    if previous_manifest and shard_outputs:
+        raise ValueError("Incremental conversion (using a previous version's outputs) requires the outputs to be "
+                         "in a single file per kind, so it can't be combined with --shard-outputs")
+    is_incremental = previous_manifest is not None
+    conversion_file_paths = get_output_file_paths(tsv_path, delta=is_incremental, extra_formats=extra_formats,
+                                                  compression=compression)
+    manifest_file_path = get_manifest_file_path(tsv_path, delta=is_incremental)
+    neo4j_columns = get_neo4j_columns(columns_to_keep) if neo4j_csv else None
+    if neo4j_csv:
+        write_neo4j_header_file(get_neo4j_header_file_path(tsv_path), neo4j_columns)
+
     logging.info(f"Starting to convert rows in {tsv_path} to json lines..")
-    with open(tsv_path, "r") as input_tsv_file:
-        batch = []
-        batch_lite = []
-        batch_plater = []
+    writer_options = {"flush_threshold": flush_threshold, "json_encoder": json_encoder,
+                      "extra_formats": extra_formats, "neo4j_columns": neo4j_columns,
+                      "parquet_columns": get_parquet_columns(columns_to_keep) if parquet else None,
+                      "parquet_row_group_size": parquet_row_group_size, "compression": compression,
+                      "vectorized": vectorized}
+    if num_workers > 1 and input_file:
+        logging.warning(f"Input for {tsv_path} is a stream, which can't be split into chunks; converting serially")
+        num_workers = 1
+    if num_workers > 1:
+        chunk_ranges = get_chunk_byte_ranges(tsv_path, num_workers * CHUNKS_PER_WORKER)
+        logging.info(f"Split {tsv_path} into {len(chunk_ranges)} chunks to convert using {num_workers} workers")
+        chunk_infos = [(tsv_path, chunk_num, start, end) for chunk_num, (start, end) in enumerate(chunk_ranges)]
         num_rows_processed = 0
         num_edges_excluded = 0
-        tsv_reader = csv.reader(input_tsv_file, delimiter="\t")
-        for line in tsv_reader:
-            # Convert this TSV row into a json object (both in regular format and in Plater format)
-            row_obj = convert_to_json_format(line, columns_to_keep, node_column_indeces)
-            row_obj_for_plater = convert_to_plater_format(row_obj, bh)
-
-            # Save the row as applicable; create both the 'lite', 'full', and 'plater' files at the same time
-            batch.append(row_obj)
-            batch_lite.append({property_name: value for property_name, value in row_obj.items()
-                               if property_name in LITE_PROPERTIES})
-            if row_obj_for_plater:
-                batch_plater.append(row_obj_for_plater)
-            else:
-                num_edges_excluded += 1
-
-            # Write this batch of rows to the jsonl files if it's time
-            if len(batch) == 1000000:
-                write_rows_to_jsonl_file(batch, jsonl_output_file_path)
-                write_rows_to_jsonl_file(batch_lite, jsonl_output_file_path_lite)
-                write_rows_to_jsonl_file(batch_plater, jsonl_output_file_path_plater)
-                num_rows_processed += len(batch)
-                batch, batch_lite, batch_plater = [], [], []
-                logging.info(f"Have processed {num_rows_processed} rows... ({num_edges_excluded} excluded)")
+        reused_previous_indices = []
+        stage_seconds = dict()  # Summed over workers, so these are CPU-seconds rather than wall-clock seconds
+        edge_ids = dict()
+        with multiprocessing.Pool(num_workers,
+                                  initializer=_init_chunk_worker,
+                                  initargs=(bh, columns_to_keep, node_column_indeces, writer_options,
+                                            previous_manifest,
+                                            stack_sampler.interval if stack_sampler else None)) as pool:
+            for chunk_result in pool.imap_unordered(convert_tsv_chunk, chunk_infos):
+                chunk_num, num_rows, num_excluded, reused_indices, cache_stats, chunk_stage_seconds, \
+                    stack_counts, chunk_edge_ids = chunk_result
+                if isinstance(bh, CategoryAncestorCache):
+                    bh.add_stats(*cache_stats)
+                add_stage_seconds(stage_seconds, chunk_stage_seconds)
+                for id_kind, ids in chunk_edge_ids.items():
+                    edge_ids.setdefault(id_kind, []).extend(ids)
+                if stack_sampler:
+                    stack_sampler.add_stack_counts(stack_counts)
+                num_rows_processed += num_rows
+                num_edges_excluded += num_excluded
+                reused_previous_indices.append(reused_indices)
+                logging.info(f"Finished chunk {chunk_num}. Have processed {num_rows_processed} rows... "
+                             f"({num_edges_excluded} excluded)")
+        reused_previous_indices = np.concatenate(reused_previous_indices)
+
+        concatenation_start = time.perf_counter()
+        chunk_nums = [chunk_info[1] for chunk_info in chunk_infos]
+        concatenate_files([get_manifest_file_path(tsv_path, shard_num=chunk_num, delta=is_incremental)
+                           for chunk_num in chunk_nums], manifest_file_path)
+        shard_file_paths = [get_output_file_paths(tsv_path, shard_num=chunk_num, delta=is_incremental,
+                                                  extra_formats=extra_formats, compression=compression)
+                            for chunk_num in chunk_nums]
+        if shard_outputs:
+            output_file_paths = {output_kind: " ".join(shard_paths[output_kind] for shard_paths in shard_file_paths)
+                                 for output_kind in output_file_paths}  # Space-separated, for the 'wc' below
+        else:
+            logging.info(f"Concatenating chunk outputs in their original row order..")
+            for output_kind, conversion_file_path in conversion_file_paths.items():
+                output_shard_paths = [shard_paths[output_kind] for shard_paths in shard_file_paths]
+                if output_kind.endswith("_parquet"):
+                    concatenate_parquet_files(output_shard_paths, conversion_file_path,
+                                              row_group_size=parquet_row_group_size)
+                    delete_files(output_shard_paths)
+                else:
+                    concatenate_files(output_shard_paths, conversion_file_path)
+        stage_seconds["concatenate_chunks"] = time.perf_counter() - concatenation_start
+    else:
+        if input_file:
+            # Streamed tarball members aren't seekable (which io.TextIOWrapper needs), so decode line by line
+            tsv_reader = csv.reader((raw_line.decode("utf-8") for raw_line in input_file), delimiter="\t")
+            conversion_results = convert_lines(tsv_reader, columns_to_keep, node_column_indeces, bh,
+                                               conversion_file_paths, writer_options, manifest_file_path,
+                                               previous_manifest=previous_manifest)
+        else:
+            with open(tsv_path, "r") as input_tsv_file:
+                tsv_reader = csv.reader(input_tsv_file, delimiter="\t")
+                conversion_results = convert_lines(tsv_reader, columns_to_keep, node_column_indeces, bh,
+                                                   conversion_file_paths, writer_options, manifest_file_path,
+                                                   previous_manifest=previous_manifest)
+        num_rows_processed, num_edges_excluded, reused_previous_indices, stage_seconds, edge_ids = conversion_results
 
-        # Take care of writing the (potential) final partial batch
-        write_rows_to_jsonl_file(batch, jsonl_output_file_path)
-        write_rows_to_jsonl_file(batch_lite, jsonl_output_file_path_lite)
-        write_rows_to_jsonl_file(batch_plater, jsonl_output_file_path_plater)
-        logging.info(f"Done writing final partial batch.")
+    if is_incremental:
+        logging.info(f"Converted {num_rows_processed - len(reused_previous_indices)} added/changed rows (of "
+                     f"{num_rows_processed}); assembling complete outputs from those and the previous outputs..")
+        merge_start = time.perf_counter()
+        merge_with_previous_outputs(tsv_path, previous_dir, previous_manifest, reused_previous_indices,
+                                    extra_formats=extra_formats, compression=compression,
+                                    parquet_row_group_size=parquet_row_group_size)
+        stage_seconds["merge_with_previous"] = time.perf_counter() - merge_start
+    if "plover_lite" in extra_formats:
+        write_edge_ids_file(tsv_path, edge_ids, previous_dir=previous_dir if is_incremental else None)
+    with open(get_manifest_file_path(tsv_path).replace(".bin", ".json"), "w") as metadata_file:
+        json.dump(manifest_metadata, metadata_file)
 
     logging.info(f"Done converting rows in {tsv_path} to json lines. ({num_edges_excluded} rows excluded)")
+    total_seconds = time.time() - start_time
+    report = {"tsv_path": tsv_path, "num_workers": num_workers, "num_rows": num_rows_processed,
+              "num_rows_converted": num_rows_processed - len(reused_previous_indices),
+              "num_rows_excluded_from_plater": num_edges_excluded, "total_seconds": round(total_seconds, 3),
+              "rows_per_second": round(num_rows_processed / total_seconds, 1) if total_seconds else None,
+              "stage_seconds": {stage: round(seconds, 3) for stage, seconds in
+                                sorted(stage_seconds.items(), key=lambda item: item[1], reverse=True)},
+              "output_bytes": {output_kind: sum(os.path.getsize(path) for path in paths.split(" ")
+                                                if os.path.exists(path))
+                               for output_kind, paths in output_file_paths.items()},
+              "output_file_paths": {output_kind: paths.split(" ") for output_kind, paths in output_file_paths.items()},
+              "peak_rss_bytes": get_peak_rss_bytes(),
+              "peak_child_rss_bytes": get_peak_rss_bytes(resource.RUSAGE_CHILDREN)}  # E.g., workers, compressors
+    logging.info(f"Converted {num_rows_processed} rows in {report['total_seconds']} seconds "
+                 f"({report['rows_per_second']} rows/sec); seconds spent per stage: {report['stage_seconds']}")
+    if isinstance(bh, CategoryAncestorCache):
+        bh.log_stats()
+        report["ancestor_cache_hits"], report["ancestor_cache_misses"] = bh.pop_stats()  # Resets them per file
     logging.info(f"Line counts of output files:")
-    logging.info(os.system(f"wc -l {jsonl_output_file_path}"))
-    logging.info(os.system(f"wc -l {jsonl_output_file_path_lite}"))
-    logging.info(os.system(f"wc -l {jsonl_output_file_path_plater}"))
+    cat_command = {"gzip": "zcat", "zstd": "zstdcat"}.get(compression)
+    for output_kind in ["full", "lite", "plater", "neo4j", "lite_filtered"]:
+        if output_kind in output_file_paths:
+            if cat_command:
+                logging.info(os.system(f"{cat_command} {output_file_paths[output_kind]} | wc -l"))
+            else:
+                logging.info(os.system(f"wc -l {output_file_paths[output_kind]}"))
+    if parquet and not shard_outputs:
+        for output_kind in ["full_parquet", "lite_parquet", "plater_parquet"]:
+            num_rows = import_pyarrow()[1].ParquetFile(output_file_paths[output_kind]).metadata.num_rows
+            logging.info(f"{num_rows} {output_file_paths[output_kind]}")
+    return report
+
+
+def convert_tarball_tsvs(tarball_path: str, tsv_and_header_paths: List[Tuple[str, str]], bh: any,
+                         conversion_options: dict) -> List[dict]:
+    """
+    Converts the given TSVs straight out of the (e.g., KG2c) tarball, without extracting them to disk; members are
+    matched by file name, and the TSV/header paths determine where the headers and outputs are written. Returns
+    the conversion report for each TSV.
+    """
+    # Headers are needed before any rows can be converted, so grab those first (they're tiny)
+    extract_tarball_headers(tarball_path, [header_tsv_path for _, header_tsv_path in tsv_and_header_paths])
+    tsvs_to_convert = {os.path.basename(tsv_path): (tsv_path, header_tsv_path)
+                       for tsv_path, header_tsv_path in tsv_and_header_paths}
+    file_reports = []
+    with open_tarball_stream(tarball_path) as tar:
+        for member in tar:
+            tsv_and_header_path = tsvs_to_convert.pop(os.path.basename(member.name), None)
+            if tsv_and_header_path and member.isfile():
+                logging.info(f"Streaming {member.name} out of {tarball_path}")
+                with tar.extractfile(member) as member_file:
+                    file_reports.append(convert_tsv_to_jsonl(*tsv_and_header_path, bh, input_file=member_file,
+                                                             **conversion_options))
+            if not tsvs_to_convert:
+                break
+    if tsvs_to_convert:
+        raise ValueError(f"Couldn't find TSV file(s) {list(tsvs_to_convert)} in {tarball_path}")
+    return file_reports
 
 
 def main():
@@ -186,8 +1492,72 @@ def main():
     arg_parser.add_argument("nodes_header_tsv_path", help="Path to the header TSV file for your nodes file")
     arg_parser.add_argument("edges_header_tsv_path", help="Path to the header TSV file for your edges file")
     arg_parser.add_argument("biolink_version", help="Version of Biolink to use")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="Number of processes to convert chunks of each TSV with (default: 1, i.e., serial)")
+    arg_parser.add_argument("--shard-outputs", action="store_true", default=False,
+                            help="With --workers > 1, leave outputs as numbered shards (e.g., edges_c-plater.00003"
+                                 ".jsonl) instead of concatenating them in the original row order (can't be used "
+                                 "with --plover-lite)")
+    arg_parser.add_argument("--flush-bytes", type=int, default=DEFAULT_FLUSH_THRESHOLD,
+                            help="Number of encoded bytes each output writer buffers before writing them to disk")
+    arg_parser.add_argument("--json-encoder", choices=["json", "orjson"], default="json",
+                            help="JSON encoder to serialize rows with; 'orjson' is faster but writes compact JSON")
+    arg_parser.add_argument("--ancestor-cache-size", type=int, default=DEFAULT_ANCESTOR_CACHE_SIZE,
+                            help="Max number of distinct category combinations to cache ancestors for (0 disables "
+                                 "the cache, so BiolinkHelper is called for every node)")
+    arg_parser.add_argument("--neo4j-csv", action="store_true", default=False,
+                            help="Also write the plater rows as neo4j-admin import CSVs (e.g., edges_c-neo4j.csv, "
+                                 "with its typed header in edges_c-neo4j-header.csv)")
+    arg_parser.add_argument("--parquet", action="store_true", default=False,
+                            help="Also write the full, lite, and plater rows to Parquet files (e.g., "
+                                 "edges_c-plater.parquet), with list-typed columns for array properties")
+    arg_parser.add_argument("--parquet-row-group-size", type=int, default=DEFAULT_PARQUET_ROW_GROUP_SIZE,
+                            help="Number of rows per Parquet row group")
+    arg_parser.add_argument("--tarball",
+                            help="Path to a KG2c tarball (e.g., kg2c-tsv.tar.gz) to stream the TSVs out of, rather "
+                                 "than extracting it to disk first; the TSV/header paths are then matched to tarball "
+                                 "members by file name, and determine where the outputs/headers are written")
+    arg_parser.add_argument("--compress", choices=["gzip", "zstd"],
+                            help="Compress the JSON lines (and neo4j CSV) outputs as they're written, using a "
+                                 "multi-threaded compressor (pigz or zstd) where available; neo4j-admin can only "
+                                 "import gzipped CSVs, so zstd can't be combined with --neo4j-csv")
+    arg_parser.add_argument("--vectorized", action="store_true", default=False,
+                            help="Compute Plater edge exclusion, subclass_of predicate raising, and category "
+                                 "ancestors a block of rows at a time with pyarrow compute kernels, rather than row "
+                                 "by row (same outputs)")
+    arg_parser.add_argument("--plover-lite", action="store_true", default=False,
+                            help="Also write the filtered lite graph Plover uses (kg2c-lite-filtered.json, next to "
+                                 "the edges TSV), plus edges_c-plater-edge-ids.npz, which holds the ids of the "
+                                 "edges kept in/excluded from Plater; replaces running filter_kg2c_lite_json.py")
+    arg_parser.add_argument("--kg2c-lite-json",
+                            help="Path to the KG2c release's kg2c_lite JSON(.gz); its top-level keys other than "
+                                 "'nodes' and 'edges' (e.g., build info) are carried over into the --plover-lite "
+                                 "graph")
+    arg_parser.add_argument("--report",
+                            help="Path to write the JSON report of per-stage timings, throughput, output sizes, and "
+                                 "peak memory usage to (default: conversion-report.json next to the nodes TSV)")
+    arg_parser.add_argument("--profile", action="store_true", default=False,
+                            help="Also run a sampling profiler during the conversion (in each worker, if using "
+                                 "--workers); the hottest functions go in the report, and all sampled stacks are "
+                                 "written next to it in collapsed format (for flamegraph.pl or speedscope)")
+    arg_parser.add_argument("--profile-interval", type=float, default=DEFAULT_PROFILE_INTERVAL,
+                            help="Seconds between the sampling profiler's stack samples")
+    arg_parser.add_argument("--previous-dir",
+                            help="Directory holding the outputs (and manifests) from converting a previous KG2c "
+                                 "version; only rows that were added/changed since then will be converted")
     args = arg_parser.parse_args()
+    if args.plover_lite and args.shard_outputs:
+        arg_parser.error("--plover-lite assembles the lite graph from single (unsharded) output files, so it can't be "
+                         "combined with --shard-outputs")
+    if args.kg2c_lite_json and not args.plover_lite:
+        arg_parser.error("--kg2c-lite-json is only used with --plover-lite")
+    if args.neo4j_csv and args.compress == "zstd":
+        arg_parser.error("neo4j-admin import can't read zstd-compressed CSVs, so --compress zstd can't be combined "
+                         "with --neo4j-csv (use --compress gzip instead)")
     logging.info(f"Input args are:\n {args}")
+    start_time = time.time()
+    report_path = args.report if args.report else os.path.join(os.path.dirname(args.nodes_tsv_path),
+                                                                 "conversion-report.json")
 
     # First download BiolinkHelper
     bh_file_name = "biolink_helper.py"
@@ -197,10 +1567,53 @@ def main():
     os.system(f"curl -L {remote_path} -o {local_path}")
     from biolink_helper import BiolinkHelper
     bh = BiolinkHelper(biolink_version=args.biolink_version)
+    if args.ancestor_cache_size > 0:
+        bh = CategoryAncestorCache(bh, max_size=args.ancestor_cache_size)
 
     # Then actually create the JSON lines files
-    convert_tsv_to_jsonl(args.nodes_tsv_path, args.nodes_header_tsv_path, bh)
-    convert_tsv_to_jsonl(args.edges_tsv_path, args.edges_header_tsv_path, bh)
+    stack_sampler = StackSampler(args.profile_interval) if args.profile else None
+    if stack_sampler:
+        stack_sampler.start()
+    conversion_options = {"num_workers": args.workers, "shard_outputs": args.shard_outputs,
+                          "flush_threshold": args.flush_bytes, "json_encoder": args.json_encoder,
+                          "previous_dir": args.previous_dir, "biolink_version": args.biolink_version,
+                          "neo4j_csv": args.neo4j_csv, "parquet": args.parquet,
+                          "parquet_row_group_size": args.parquet_row_group_size, "compression": args.compress,
+                          "stack_sampler": stack_sampler, "vectorized": args.vectorized,
+                          "plover_lite": args.plover_lite}
+    file_reports = []
+    tsv_and_header_paths = [(args.nodes_tsv_path, args.nodes_header_tsv_path),
+                            (args.edges_tsv_path, args.edges_header_tsv_path)]
+    if args.tarball:
+        file_reports = convert_tarball_tsvs(args.tarball, tsv_and_header_paths, bh, conversion_options)
+    else:
+        for tsv_path, header_tsv_path in tsv_and_header_paths:
+            file_reports.append(convert_tsv_to_jsonl(tsv_path, header_tsv_path, bh, **conversion_options))
+    if args.plover_lite:
+        write_plover_lite_graph(args.nodes_tsv_path, args.edges_tsv_path, compression=args.compress,
+                                kg2c_lite_json_path=args.kg2c_lite_json)
+    if args.neo4j_csv:
+        # The data files actually written (several, if the outputs were left as shards), each after its header
+        neo4j_file_paths = {file_report["tsv_path"]: ",".join([get_neo4j_header_file_path(file_report["tsv_path"])] +
+                                                              file_report["output_file_paths"]["neo4j"])
+                            for file_report in file_reports}
+        logging.info(f"To load the neo4j-admin import CSVs into Neo4j, run:\n neo4j-admin import --database=neo4j "
+                     f"--array-delimiter={NEO4J_ARRAY_DELIMITER} --nodes={neo4j_file_paths[args.nodes_tsv_path]} "
+                     f"--relationships={neo4j_file_paths[args.edges_tsv_path]}")
+
+    # Record how the conversion went, so that slowdowns between builds can be pinned on a particular stage
+    report = {"args": vars(args), "start_time": start_time, "total_seconds": round(time.time() - start_time, 3),
+              "peak_rss_bytes": get_peak_rss_bytes(),
+              "peak_child_rss_bytes": get_peak_rss_bytes(resource.RUSAGE_CHILDREN), "files": file_reports}
+    if stack_sampler:
+        stack_sampler.stop()
+        collapsed_stacks_path = report_path.replace(".json", "") + "-stacks.txt"
+        stack_sampler.write_collapsed_stacks(collapsed_stacks_path)
+        report["profile"] = {"interval": stack_sampler.interval, "collapsed_stacks_path": collapsed_stacks_path,
+                             "top_functions": stack_sampler.get_top_functions()}
+    with open(report_path, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+    logging.info(f"Wrote conversion report to {report_path}")
 
     logging.info(f"\n\nDone converting KG2c nodes/edges TSVs to KGX JSON lines format.")
 
@@ -1,38 +1,211 @@
+"""
+This script filters a kg2c_lite JSON file (as used by Plover) down to the edges that were kept in the given
+already-filtered KG2c edges file (i.e., excludes semmeddb edges with fewer than 4 publications and
+domain_range_exclusion edges). The lite JSON (which may be gzipped) is streamed: its nodes and edges are parsed one
+at a time and written out as they pass the filter, so memory use doesn't grow with the size of the graph.
+
+Usage: python filter_kg2c_lite_json.py <kg2c lite json(.gz) path> <KG2c plater edges jsonl/Parquet/.npz path>
+
+Note: convert_kg2c_tsvs_to_jsonl.py --plover-lite (with --kg2c-lite-json) writes an equivalent filtered lite graph
+during conversion.
+"""
 import argparse
+import gzip
 import json
+from typing import Iterator, Optional, TextIO
+
+import numpy as np
+
+READ_CHUNK_SIZE = 4 * 1024 * 1024  # Characters of the lite JSON read at a time
+EDGE_BLOCK_SIZE = 100000  # Number of edges whose ids are checked against the kept ids at once
+
+
+class StreamingJsonReader:
+    """
+    Incrementally parses a JSON document from a text stream, one value at a time, so that the arrays in a huge
+    document can be iterated over without loading the whole document into memory.
+    """
+
+    def __init__(self, text_file: TextIO, chunk_size: int = READ_CHUNK_SIZE):
+        self.text_file = text_file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.at_eof = False
+
+    def _read_more(self, min_num_chars: int):
+        if self.position > self.chunk_size:  # Drop what's already been parsed
+            self.buffer = self.buffer[self.position:]
+            self.position = 0
+        new_text = self.text_file.read(max(self.chunk_size, min_num_chars))
+        if new_text:
+            self.buffer += new_text
+        else:
+            self.at_eof = True
+
+    def peek(self) -> Optional[str]:
+        """
+        Skips any whitespace and returns the next character (without consuming it), or None at the end of the file.
+        """
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in " \t\n\r":
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            elif self.at_eof:
+                return None
+            self._read_more(self.chunk_size)
+
+    def expect(self, character: str):
+        next_character = self.peek()
+        if next_character != character:
+            raise ValueError(f"Expected '{character}' in JSON, but got '{next_character}'")
+        self.position += 1
+
+    def read_value(self) -> any:
+        self.peek()
+        while True:
+            try:
+                value, end_position = self.decoder.raw_decode(self.buffer, self.position)
+                # A value ending right at the end of the buffer (e.g., a number) might continue in the next chunk
+                if end_position < len(self.buffer) or self.at_eof:
+                    self.position = end_position
+                    return value
+            except json.JSONDecodeError:
+                if self.at_eof:
+                    raise
+            self._read_more(len(self.buffer) - self.position)  # Doubles what's buffered, for huge values
+
+    def iterate_object(self) -> Iterator[str]:
+        """
+        Yields the keys of the object that's next in the stream; the caller must consume each key's value (e.g., with
+        read_value() or iterate_array()) before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.position += 1
+            else:
+                self.expect("}")
+                return
+
+    def iterate_array(self) -> Iterator[any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.read_value()
+            if self.peek() == ",":
+                self.position += 1
+            else:
+                self.expect("]")
+                return
 
-import jsonlines
+
+def open_text_file(file_path: str, mode: str) -> TextIO:
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, f"{mode}t", encoding="utf-8")
+    return open(file_path, mode, encoding="utf-8")
+
+
+def load_kept_edge_ids(kg2c_edges_path: str) -> np.ndarray:
+    """
+    Returns the sorted ids of the edges in the given (already-filtered) edges file, as a compact int64 array.
+    """
+    if kg2c_edges_path.endswith(".npz"):  # The converter's sidecar of kept/excluded edge ids (see --plover-lite)
+        with np.load(kg2c_edges_path) as edge_ids_file:
+            edge_ids = edge_ids_file["kept"].astype(np.int64)
+    elif kg2c_edges_path.endswith(".parquet"):  # Only the id column needs to be read
+        from kg2c_parquet_reader import read_columns
+        edge_ids = np.array(read_columns([kg2c_edges_path], ["id"])["id"], dtype=np.int64)
+    else:
+        with open_text_file(kg2c_edges_path, "r") as edges_file:
+            edge_ids = np.fromiter((int(json.loads(line)["id"]) for line in edges_file), dtype=np.int64)
+    return np.unique(edge_ids)
+
+
+def indent_json(value: any, indent_level: int) -> str:
+    # Matches how json.dump(..., indent=2) lays out a value nested indent_level levels deep
+    return json.dumps(value, indent=2).replace("\n", "\n" + "  " * indent_level)
+
+
+def write_filtered_array(output_file: TextIO, items: Iterator[any]) -> int:
+    num_written = 0
+    for item in items:
+        output_file.write(",\n    " if num_written else "[\n    ")
+        output_file.write(indent_json(item, 2))
+        num_written += 1
+    output_file.write("\n  ]" if num_written else "[]")
+    return num_written
+
+
+def iterate_kept_edges(edges: Iterator[dict], kept_edge_ids: np.ndarray) -> Iterator[dict]:
+    edge_block = []
+    for edge in edges:
+        edge_block.append(edge)
+        if len(edge_block) >= EDGE_BLOCK_SIZE:
+            yield from filter_edge_block(edge_block, kept_edge_ids)
+            edge_block = []
+    yield from filter_edge_block(edge_block, kept_edge_ids)
+
+
+def filter_edge_block(edge_block: list, kept_edge_ids: np.ndarray) -> Iterator[dict]:
+    if edge_block:
+        edge_ids = np.fromiter((int(edge["id"]) for edge in edge_block), dtype=np.int64, count=len(edge_block))
+        # kept_edge_ids is sorted, so membership can be checked with a binary search
+        positions = np.minimum(np.searchsorted(kept_edge_ids, edge_ids), max(len(kept_edge_ids) - 1, 0))
+        is_kept = kept_edge_ids[positions] == edge_ids if len(kept_edge_ids) else np.zeros(len(edge_ids), bool)
+        for edge, edge_is_kept in zip(edge_block, is_kept.tolist()):
+            if edge_is_kept:
+                yield edge
 
 
 def main():
     arg_parser = argparse.ArgumentParser()
-    arg_parser.add_argument("kg2c_lite_json_path", help="Path to the kg2c_lite_2.X.Y.json.gz file you want to filter")
-    arg_parser.add_argument("kg2c_edges_jsonl_path", help="Path to the already-filtered KG2c jsonl edges file")
+    arg_parser.add_argument("kg2c_lite_json_path", help="Path to the kg2c_lite_2.X.Y.json(.gz) file you want to "
+                                                        "filter")
+    arg_parser.add_argument("kg2c_edges_jsonl_path", help="Path to the already-filtered KG2c jsonl edges file (or "
+                                                         "its Parquet version, e.g., edges_c-plater.parquet, or "
+                                                         "the converter's edges_c-plater-edge-ids.npz)")
     args = arg_parser.parse_args()
 
     # Grab the IDs of the kept edges from the jsonl file
-    with jsonlines.open(args.kg2c_edges_jsonl_path) as reader:
-        jsonl_edge_ids = {int(edge_row["id"]) for edge_row in reader}
-    print(f"Edges jsonl file has {len(jsonl_edge_ids)} kept edge ids")
-
-    # Load the kg2c lite json file that we need to filter
-    with open(args.kg2c_lite_json_path, "r") as kg2c_lite_json_file:
-        kg2c_lite_json = json.load(kg2c_lite_json_file)
-    print(f"At start, kg2c lite json has {len(kg2c_lite_json['nodes'])} nodes "
-          f"and {len(kg2c_lite_json['edges'])} edges")
-
-    # Get rid of semmeddb edges with fewer than 4 publications and domain_range_exclusion edges
-    filtered_graph = {key: [] if key == "edges" else value
-                      for key, value in kg2c_lite_json.items()}
-    for edge in kg2c_lite_json['edges']:
-        if int(edge["id"]) in jsonl_edge_ids:
-            filtered_graph["edges"].append(edge)
-    print(f"The filtered kg2c lite graph has {len(filtered_graph['nodes'])} nodes and "
-          f"{len(filtered_graph['edges'])} edges")
-
-    # Save the filtered kg2c lite json
-    with open(f"{args.kg2c_lite_json_path}_filtered", "w+") as filtered_json_file:
-        json.dump(filtered_graph, filtered_json_file, indent=2)
+    kept_edge_ids = load_kept_edge_ids(args.kg2c_edges_jsonl_path)
+    print(f"Edges jsonl file has {len(kept_edge_ids)} kept edge ids")
+
+    # Stream the kg2c lite json through, getting rid of semmeddb edges with fewer than 4 publications and
+    # domain_range_exclusion edges (the output is laid out the same way as json.dump(..., indent=2) would)
+    if args.kg2c_lite_json_path.endswith(".gz"):
+        filtered_json_path = f"{args.kg2c_lite_json_path[:-len('.gz')]}_filtered.gz"
+    else:
+        filtered_json_path = f"{args.kg2c_lite_json_path}_filtered"
+    counts = dict()
+    with open_text_file(args.kg2c_lite_json_path, "r") as kg2c_lite_json_file, \
+            open_text_file(filtered_json_path, "w") as filtered_json_file:
+        reader = StreamingJsonReader(kg2c_lite_json_file)
+        filtered_json_file.write("{")
+        num_keys = 0
+        for key in reader.iterate_object():
+            filtered_json_file.write(f"{',' if num_keys else ''}\n  {json.dumps(key)}: ")
+            if reader.peek() == "[":
+                items = reader.iterate_array()
+                if key == "edges":
+                    items = iterate_kept_edges(items, kept_edge_ids)
+                counts[key] = write_filtered_array(filtered_json_file, items)
+            else:
+                filtered_json_file.write(indent_json(reader.read_value(), 1))
+            num_keys += 1
+        filtered_json_file.write("\n}" if num_keys else "}")
+    print(f"The filtered kg2c lite graph has {counts.get('nodes')} nodes and {counts.get('edges')} edges; "
+          f"saved it to {filtered_json_path}")
 
 
 if __name__ == "__main__":
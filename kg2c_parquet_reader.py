@@ -0,0 +1,60 @@
+"""
+Small reader API for the Parquet files written by convert_kg2c_tsvs_to_jsonl.py (when run with --parquet). Only the
+requested columns are read from disk, so things like grabbing all edge ids or counting rows don't require decoding
+multi-GB JSON lines files.
+
+Usage: python kg2c_parquet_reader.py <Parquet file path(s)> [--columns id subject predicate object] [--count]
+"""
+import argparse
+import json
+from typing import List, Optional, Iterator
+
+import pyarrow.parquet as pq
+
+
+def count_rows(parquet_paths: List[str]) -> int:
+    # Row counts are stored in the file footers, so no data needs to be read
+    return sum(pq.ParquetFile(parquet_path).metadata.num_rows for parquet_path in parquet_paths)
+
+
+def iter_rows(parquet_paths: List[str], columns: Optional[List[str]] = None,
+              batch_size: int = 100000) -> Iterator[dict]:
+    """
+    Yields the rows of the given Parquet file(s) (e.g., a set of shards, in order) as dictionaries, projected down
+    to the given columns. Memory use is bounded by the batch size.
+    """
+    for parquet_path in parquet_paths:
+        parquet_file = pq.ParquetFile(parquet_path)
+        for record_batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield from record_batch.to_pylist()
+
+
+def read_columns(parquet_paths: List[str], columns: List[str]) -> dict:
+    """
+    Loads entire columns of the given Parquet file(s) into memory, as a dictionary mapping column names to lists.
+    """
+    column_values = {column: [] for column in columns}
+    for parquet_path in parquet_paths:
+        table = pq.read_table(parquet_path, columns=columns)
+        for column in columns:
+            column_values[column] += table.column(column).to_pylist()
+    return column_values
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("parquet_paths", nargs="+", help="Path(s) to the Parquet file(s) (or shards) to read")
+    arg_parser.add_argument("--columns", nargs="+", help="Columns to read (default: all)")
+    arg_parser.add_argument("--count", action="store_true", default=False,
+                            help="Only print the number of rows")
+    args = arg_parser.parse_args()
+
+    if args.count:
+        print(count_rows(args.parquet_paths))
+    else:
+        for row in iter_rows(args.parquet_paths, columns=args.columns):
+            print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+"""
+This script compiles the Plater nodes/edges JSON lines files written by convert_kg2c_tsvs_to_jsonl.py (i.e.,
+nodes_c-plater.jsonl and edges_c-plater.jsonl) into a compact, memory-mapped graph snapshot, and answers one-hop TRAPI
+query graphs (like those in test/sample_*) against it, entirely offline. Node CURIEs are interned to ints (their rank
+in sorted order), adjacency is stored in CSR form in both directions, and per-edge predicate/knowledge source/qualifier
+codes and per-node category codes are kept in typed NumPy arrays. Loading a snapshot only maps its files into memory,
+so queries can be answered within seconds of starting up. Query results are recorded in a results TSV (which
+test/results_store.py can import alongside the live KPs' results), so they can be used as a reference for result
+counts.
+
+Usage: python kg2c_snapshot.py build <nodes_c-plater.jsonl(.gz)> <edges_c-plater.jsonl(.gz)> <snapshot dir>
+       python kg2c_snapshot.py query <snapshot dir> <path to query or directory of queries> [--biolink-version X] \
+                                     [--results-tsv path] [--save-responses] [--issettrue|--issetfalse|--issetunpinned]
+"""
+import argparse
+import bisect
+import csv
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from array import array
+from datetime import datetime
+from typing import List, Optional, TextIO, Tuple
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_FORMAT_VERSION = 1
+# Edge properties stored as codes into a vocabulary (code 0 means the edge has no value for the property)
+EDGE_CODE_PROPERTIES = ["predicate", "primary_knowledge_source", "qualified_predicate", "qualified_object_aspect",
+                        "qualified_object_direction"]
+QUALIFIER_TYPE_PROPERTIES = {"biolink:qualified_predicate": "qualified_predicate",
+                             "biolink:object_aspect_qualifier": "qualified_object_aspect",
+                             "biolink:object_direction_qualifier": "qualified_object_direction"}
+ROOT_CATEGORY = "biolink:NamedThing"
+ROOT_PREDICATE = "biolink:related_to"
+RESULTS_TSV_COLUMNS = ["query_id", "date_run", "duration_client", "duration_server", "duration_db",
+                       "response_status", "num_results", "num_nodes", "num_edges", "response_size"]
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s %(levelname)s: %(message)s',
+                    handlers=[logging.StreamHandler()])
+
+
+def open_text_file(file_path: str) -> TextIO:
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, "rt", encoding="utf-8")
+    return open(file_path, "r", encoding="utf-8")
+
+
+def encode_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Packs the given strings into one UTF-8 byte array plus an array of offsets (string i is at offsets[i:i + 2]).
+    """
+    encoded_strings = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded_strings) + 1, dtype=np.int64)
+    np.cumsum([len(encoded_string) for encoded_string in encoded_strings], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded_strings), dtype=np.uint8), offsets
+
+
+class PackedStrings:
+    """
+    A read-only sequence of strings backed by (memory-mapped) byte and offset arrays. If the strings were packed in
+    sorted order, they can be looked up with a binary search, without building a dictionary.
+    """
+
+    def __init__(self, string_bytes: np.ndarray, offsets: np.ndarray):
+        self.string_bytes = string_bytes
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.string_bytes[self.offsets[index]:self.offsets[index + 1]].tobytes().decode("utf-8")
+
+    def find(self, string: str) -> Optional[int]:
+        index = bisect.bisect_left(self, string)
+        return index if index < len(self) and self[index] == string else None
+
+
+def build_snapshot(nodes_jsonl_path: str, edges_jsonl_path: str, snapshot_dir: str):
+    """
+    Compiles the given Plater nodes/edges JSON lines files into a snapshot (a directory of .npy files plus a
+    metadata.json file holding the vocabularies that codes refer to).
+    """
+    start = time.time()
+    os.makedirs(snapshot_dir, exist_ok=True)
+    arrays = dict()
+
+    logging.info(f"Loading nodes from {nodes_jsonl_path}..")
+    nodes = []
+    with open_text_file(nodes_jsonl_path) as nodes_file:
+        for line in nodes_file:
+            node = json.loads(line)
+            nodes.append((node["id"], node.get("name") or "", node.get("preferred_category"),
+                          node.get("category") or []))
+    nodes.sort(key=lambda node_tuple: node_tuple[0])  # A node's int id is its rank in sorted CURIE order
+    node_keys = {node_tuple[0]: node_key for node_key, node_tuple in enumerate(nodes)}
+    categories = [None] + sorted({category for node_tuple in nodes for category in node_tuple[3]} |
+                                 {node_tuple[2] for node_tuple in nodes if node_tuple[2]})
+    category_codes = {category: code for code, category in enumerate(categories)}
+    arrays["node_curie_bytes"], arrays["node_curie_offsets"] = encode_strings([node_tuple[0] for node_tuple in nodes])
+    arrays["node_name_bytes"], arrays["node_name_offsets"] = encode_strings([node_tuple[1] for node_tuple in nodes])
+    arrays["node_preferred_category"] = np.array([category_codes[node_tuple[2]] for node_tuple in nodes],
+                                                 dtype=np.uint16)
+    arrays["node_category_indptr"] = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum([len(node_tuple[3]) for node_tuple in nodes], out=arrays["node_category_indptr"][1:])
+    arrays["node_category_codes"] = np.array([category_codes[category] for node_tuple in nodes
+                                              for category in node_tuple[3]], dtype=np.uint16)
+    num_nodes = len(nodes)
+    del nodes
+
+    logging.info(f"Loading edges from {edges_jsonl_path}..")
+    vocabularies = {property_name: [None] for property_name in EDGE_CODE_PROPERTIES}
+    vocabulary_codes = {property_name: {None: 0} for property_name in EDGE_CODE_PROPERTIES}
+    edge_columns = {"subject": array("i"), "object": array("i"), "id": array("q"),
+                    **{property_name: array("H") for property_name in EDGE_CODE_PROPERTIES}}
+    num_edges_skipped = 0
+    with open_text_file(edges_jsonl_path) as edges_file:
+        for line in edges_file:
+            edge = json.loads(line)
+            subject_key, object_key = node_keys.get(edge["subject"]), node_keys.get(edge["object"])
+            if subject_key is None or object_key is None:  # Plater can't return edges with missing nodes either
+                num_edges_skipped += 1
+                continue
+            edge_columns["subject"].append(subject_key)
+            edge_columns["object"].append(object_key)
+            edge_columns["id"].append(int(edge["id"]))
+            for property_name in EDGE_CODE_PROPERTIES:
+                value = edge.get(property_name) or None
+                codes = vocabulary_codes[property_name]
+                if value not in codes:
+                    codes[value] = len(vocabularies[property_name])
+                    vocabularies[property_name].append(value)
+                edge_columns[property_name].append(codes[value])
+    if num_edges_skipped:
+        logging.warning(f"Skipped {num_edges_skipped} edges whose subject or object isn't in the nodes file")
+    del node_keys
+
+    logging.info(f"Building CSR adjacency for {len(edge_columns['id'])} edges..")
+    edge_subjects = np.frombuffer(edge_columns["subject"], dtype=np.int32)
+    edge_objects = np.frombuffer(edge_columns["object"], dtype=np.int32)
+    # Edges are stored in (subject, object) order, so each node's outgoing edges are a contiguous range
+    edge_order = np.lexsort((edge_objects, edge_subjects))
+    for column_name, values in edge_columns.items():
+        dtype = {"i": np.int32, "q": np.int64, "H": np.uint16}[values.typecode]
+        arrays[f"edge_{column_name}"] = np.frombuffer(values, dtype=dtype)[edge_order]
+    arrays["out_indptr"] = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(arrays["edge_subject"], minlength=num_nodes), out=arrays["out_indptr"][1:])
+    # Incoming edges are a permutation of the (subject-ordered) edges, grouped by object
+    arrays["in_edges"] = np.lexsort((arrays["edge_subject"], arrays["edge_object"])).astype(np.int32)
+    arrays["in_indptr"] = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(arrays["edge_object"], minlength=num_nodes), out=arrays["in_indptr"][1:])
+
+    for array_name, values in arrays.items():
+        np.save(os.path.join(snapshot_dir, f"{array_name}.npy"), values)
+    metadata = {"format_version": SNAPSHOT_FORMAT_VERSION, "num_nodes": num_nodes,
+                "num_edges": len(arrays["edge_id"]), "nodes_jsonl_path": os.path.abspath(nodes_jsonl_path),
+                "edges_jsonl_path": os.path.abspath(edges_jsonl_path), "date_built": str(datetime.now()),
+                "categories": categories, **{f"{property_name}_vocabulary": vocabulary
+                                             for property_name, vocabulary in vocabularies.items()}}
+    with open(os.path.join(snapshot_dir, "metadata.json"), "w") as metadata_file:
+        json.dump(metadata, metadata_file, indent=2)
+    logging.info(f"Wrote snapshot of {num_nodes} nodes and {metadata['num_edges']} edges to {snapshot_dir} "
+                 f"in {round(time.time() - start, 1)} seconds")
+
+
+def gather_ranges(indptr: np.ndarray, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the positions covered by the CSR ranges of the given keys (concatenated), along with the index (into
+    keys) of the key each position belongs to.
+    """
+    starts = indptr[keys]
+    lengths = indptr[keys + 1] - starts
+    owners = np.repeat(np.arange(len(keys)), lengths)
+    range_starts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return range_starts + np.arange(len(owners)), owners
+
+
+class Kg2cSnapshot:
+    """
+    A memory-mapped snapshot of the Plater version of KG2c (see build_snapshot()) that can answer one-hop TRAPI
+    queries. Pass in a BiolinkHelper to have query predicates match their descendant predicates (and symmetric
+    predicates match edges in either direction); otherwise only 'biolink:related_to' is treated that way.
+    """
+
+    def __init__(self, snapshot_dir: str, bh: any = None):
+        with open(os.path.join(snapshot_dir, "metadata.json")) as metadata_file:
+            self.metadata = json.load(metadata_file)
+        if self.metadata["format_version"] != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Snapshot {snapshot_dir} has format version {self.metadata['format_version']}, but "
+                             f"this script reads version {SNAPSHOT_FORMAT_VERSION}; rebuild the snapshot")
+        self.arrays = {file_name[:-len(".npy")]: np.load(os.path.join(snapshot_dir, file_name), mmap_mode="r")
+                       for file_name in os.listdir(snapshot_dir) if file_name.endswith(".npy")}
+        self.node_curies = PackedStrings(self.arrays["node_curie_bytes"], self.arrays["node_curie_offsets"])
+        self.node_names = PackedStrings(self.arrays["node_name_bytes"], self.arrays["node_name_offsets"])
+        self.category_codes = {category: code for code, category in enumerate(self.metadata["categories"])}
+        self.vocabulary_codes = {property_name: {value: code for code, value in
+                                                 enumerate(self.metadata[f"{property_name}_vocabulary"])}
+                                 for property_name in EDGE_CODE_PROPERTIES}
+        self.bh = bh
+
+    def get_node_keys(self, curies: List[str]) -> np.ndarray:
+        node_keys = {self.node_curies.find(curie) for curie in curies}
+        return np.array(sorted(node_keys - {None}), dtype=np.int64)
+
+    def get_predicate_codes(self, predicates: List[str]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Returns the codes of the predicates edges may have to fulfill the given query predicates, split into those
+        that are directional and those that are symmetric (None means any predicate is fine).
+        """
+        if not predicates or ROOT_PREDICATE in predicates:
+            return None, None
+        predicate_codes = self.vocabulary_codes["predicate"]
+        if self.bh:
+            predicates = set(self.bh.get_descendants(predicates, include_mixins=True))
+        symmetric_predicates = {predicate for predicate in predicates if self.bh and self.bh.is_symmetric(predicate)}
+        return (np.array([predicate_codes[predicate] for predicate in set(predicates) - symmetric_predicates
+                          if predicate in predicate_codes], dtype=np.uint16),
+                np.array([predicate_codes[predicate] for predicate in symmetric_predicates
+                          if predicate in predicate_codes], dtype=np.uint16))
+
+    def get_category_mask(self, node_keys: np.ndarray, categories: List[str]) -> np.ndarray:
+        # Plater nodes' 'category' property already includes all ancestors of their categories
+        if not categories or ROOT_CATEGORY in categories:
+            return np.ones(len(node_keys), dtype=bool)
+        wanted_codes = [self.category_codes[category] for category in categories if category in self.category_codes]
+        positions, owners = gather_ranges(self.arrays["node_category_indptr"], node_keys)
+        has_category = np.isin(self.arrays["node_category_codes"][positions], wanted_codes)
+        return np.bincount(owners[has_category], minlength=len(node_keys)) > 0
+
+    def get_qualifier_mask(self, edge_positions: np.ndarray, qualifier_constraints: List[dict]) -> np.ndarray:
+        # Edges must satisfy all qualifiers in at least one of the qualifier sets
+        if not any(constraint.get("qualifier_set") for constraint in qualifier_constraints or []):
+            return np.ones(len(edge_positions), dtype=bool)
+        mask = np.zeros(len(edge_positions), dtype=bool)
+        for constraint in qualifier_constraints:
+            set_mask = np.ones(len(edge_positions), dtype=bool)
+            for qualifier in constraint.get("qualifier_set", []):
+                property_name = QUALIFIER_TYPE_PROPERTIES.get(qualifier["qualifier_type_id"])
+                value = qualifier["qualifier_value"]
+                code = self.vocabulary_codes[property_name].get(value) if property_name else None
+                if code is None:
+                    set_mask[:] = False
+                else:
+                    set_mask &= self.arrays[f"edge_{property_name}"][edge_positions] == code
+            mask |= set_mask
+        return mask
+
+    def find_edges(self, subject_keys: Optional[np.ndarray], object_keys: Optional[np.ndarray],
+                   predicate_codes: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Returns the positions of the edges going from any of the subject nodes to any of the object nodes (None
+        meaning any node) with any of the given predicates (None meaning any predicate).
+        """
+        if subject_keys is not None and (object_keys is None or len(subject_keys) <= len(object_keys)):
+            edge_positions, _ = gather_ranges(self.arrays["out_indptr"], subject_keys)
+        elif object_keys is not None:
+            positions, _ = gather_ranges(self.arrays["in_indptr"], object_keys)
+            edge_positions = self.arrays["in_edges"][positions].astype(np.int64)
+        else:
+            edge_positions = np.arange(self.metadata["num_edges"])
+        if predicate_codes is not None:
+            edge_positions = edge_positions[np.isin(self.arrays["edge_predicate"][edge_positions], predicate_codes)]
+        if subject_keys is not None:
+            edge_positions = edge_positions[np.isin(self.arrays["edge_subject"][edge_positions], subject_keys)]
+        if object_keys is not None:
+            edge_positions = edge_positions[np.isin(self.arrays["edge_object"][edge_positions], object_keys)]
+        return edge_positions
+
+    def answer_one_hop(self, trapi_qg: dict) -> dict:
+        """
+        Answers the given one-hop query graph, returning a TRAPI message (query graph, knowledge graph, and results).
+        Results are grouped by the nodes bound to the query's non-set qnodes, as Plater does.
+        """
+        if len(trapi_qg["edges"]) != 1 or len(trapi_qg["nodes"]) != 2:
+            raise ValueError(f"Only one-hop query graphs are supported; this one has {len(trapi_qg['nodes'])} "
+                             f"nodes and {len(trapi_qg['edges'])} edges")
+        qedge_key, qedge = next(iter(trapi_qg["edges"].items()))
+        qnode_keys = [qedge["subject"], qedge["object"]]
+        pinned_keys = [self.get_node_keys(trapi_qg["nodes"][qnode_key]["ids"])
+                       if trapi_qg["nodes"][qnode_key].get("ids") else None for qnode_key in qnode_keys]
+        directional_codes, symmetric_codes = self.get_predicate_codes(qedge.get("predicates"))
+
+        # Symmetric predicates can be fulfilled by edges pointing either way; those are reported as they're stored
+        matches = [(self.find_edges(pinned_keys[0], pinned_keys[1], directional_codes), False)]
+        if symmetric_codes is None or len(symmetric_codes):
+            matches.append((self.find_edges(pinned_keys[1], pinned_keys[0], symmetric_codes), True))
+        bindings = []  # (edge position, subject qnode's node key, object qnode's node key)
+        for edge_positions, is_reversed in matches:
+            edge_positions = edge_positions[self.get_qualifier_mask(edge_positions,
+                                                                    qedge.get("qualifier_constraints"))]
+            ends = [self.arrays["edge_subject"][edge_positions], self.arrays["edge_object"][edge_positions]]
+            if is_reversed:
+                ends.reverse()
+            mask = np.ones(len(edge_positions), dtype=bool)
+            for qnode_key, node_keys in zip(qnode_keys, ends):
+                mask &= self.get_category_mask(node_keys, trapi_qg["nodes"][qnode_key].get("categories"))
+            bindings += zip(edge_positions[mask].tolist(), ends[0][mask].tolist(), ends[1][mask].tolist())
+        bindings = sorted(set(bindings))
+        return self.make_trapi_message(trapi_qg, qedge_key, qnode_keys, bindings)
+
+    def make_trapi_message(self, trapi_qg: dict, qedge_key: str, qnode_keys: List[str],
+                           bindings: List[Tuple[int, int, int]]) -> dict:
+        categories = self.metadata["categories"]
+        vocabularies = {property_name: self.metadata[f"{property_name}_vocabulary"]
+                        for property_name in EDGE_CODE_PROPERTIES}
+        nodes, edges = dict(), dict()
+        results = dict()
+        for edge_position, subject_key, object_key in bindings:  # Node keys are those bound to each qnode
+            for node_key in (subject_key, object_key):
+                if node_key not in nodes:
+                    preferred_category = categories[self.arrays["node_preferred_category"][node_key]]
+                    nodes[node_key] = {"name": self.node_names[node_key],
+                                       "categories": [preferred_category] if preferred_category else []}
+            edge = {"subject": self.node_curies[self.arrays["edge_subject"][edge_position]],
+                    "object": self.node_curies[self.arrays["edge_object"][edge_position]], "sources": []}
+            for property_name in EDGE_CODE_PROPERTIES:
+                value = vocabularies[property_name][self.arrays[f"edge_{property_name}"][edge_position]]
+                if property_name == "primary_knowledge_source" and value:
+                    edge["sources"].append({"resource_id": value, "resource_role": "primary_knowledge_source"})
+                elif value:
+                    edge[property_name] = value
+            edge_id = str(self.arrays["edge_id"][edge_position])
+            edges[edge_id] = edge
+            # Results are keyed by the nodes bound to non-set qnodes (set qnodes get all their nodes in one result)
+            node_bindings = dict(zip(qnode_keys, (subject_key, object_key)))
+            result_key = tuple(node_key for qnode_key, node_key in node_bindings.items()
+                               if not trapi_qg["nodes"][qnode_key].get("is_set"))
+            result = results.setdefault(result_key, {"node_bindings": {qnode_key: set() for qnode_key in qnode_keys},
+                                                     "edge_ids": []})
+            for qnode_key, node_key in node_bindings.items():
+                result["node_bindings"][qnode_key].add(node_key)
+            result["edge_ids"].append(edge_id)
+        trapi_results = [{"node_bindings": {qnode_key: [{"id": self.node_curies[node_key]}
+                                                        for node_key in sorted(node_keys)]
+                                            for qnode_key, node_keys in result["node_bindings"].items()},
+                          "analyses": [{"edge_bindings": {qedge_key: [{"id": edge_id}
+                                                                      for edge_id in result["edge_ids"]]}}]}
+                         for result in results.values()]
+        return {"query_graph": trapi_qg,
+                "knowledge_graph": {"nodes": {self.node_curies[node_key]: node for node_key, node in nodes.items()},
+                                    "edges": edges},
+                "results": trapi_results}
+
+
+def load_query_graph(file_path: str, is_set_override: Optional[str] = None) -> Tuple[str, dict]:
+    """
+    Loads a query graph from a query JSON file, in the same way (and with the same query identifier) as the pytest
+    suite in test/test.py does.
+    """
+    with open(file_path, "r") as query_file:
+        query_obj = json.load(query_file)
+    if "input_query_canonicalized" in query_obj:
+        trapi_qg = query_obj["input_query_canonicalized"]["message"]["query_graph"]
+        for edge in trapi_qg["edges"].values():
+            edge.pop("exclude", None)
+    elif "nodes" in query_obj:
+        trapi_qg = query_obj
+    else:
+        trapi_qg = query_obj["message"]["query_graph"]
+    for qnode in trapi_qg["nodes"].values():
+        if is_set_override == "issettrue":
+            qnode["is_set"] = True
+        elif is_set_override == "issetfalse":
+            qnode["is_set"] = False
+        elif is_set_override == "issetunpinned" and not qnode.get("ids"):
+            qnode["is_set"] = True
+    query_name = ":".join(file_path.strip("/").split("/")[-2:])  # Includes immediate parent dir
+    return f"{is_set_override}--{query_name}" if is_set_override else query_name, trapi_qg
+
+
+def load_biolink_helper(biolink_version: str) -> any:
+    # Downloads BiolinkHelper from the RTX repo, the same way convert_kg2c_tsvs_to_jsonl.py does
+    bh_file_name = "biolink_helper.py"
+    logging.info(f"Downloading {bh_file_name} from RTX repo")
+    local_path = f"{SCRIPT_DIR}/{bh_file_name}"
+    remote_path = f"https://github.com/RTXteam/RTX/blob/master/code/ARAX/BiolinkHelper/{bh_file_name}?raw=true"
+    os.system(f"curl -L {remote_path} -o {local_path}")
+    sys.path.append(SCRIPT_DIR)
+    from biolink_helper import BiolinkHelper
+    return BiolinkHelper(biolink_version=biolink_version)
+
+
+def run_queries(snapshot: Kg2cSnapshot, query_path: str, results_tsv_path: str, is_set_override: Optional[str],
+                responses_dir: Optional[str] = None):
+    if os.path.isdir(query_path):
+        query_file_paths = sorted(f"{query_path}/{file_name}" for file_name in os.listdir(query_path)
+                                  if file_name.endswith(".json"))
+    else:
+        query_file_paths = [query_path]
+    if not os.path.exists(results_tsv_path):
+        with open(results_tsv_path, "w") as results_file:
+            csv.writer(results_file, delimiter="\t").writerow(RESULTS_TSV_COLUMNS)
+    for query_file_path in query_file_paths:
+        query_id, trapi_qg = load_query_graph(query_file_path, is_set_override)
+        start = time.time()
+        try:
+            message = snapshot.answer_one_hop(trapi_qg)
+            response_status = 200
+        except ValueError as error:
+            logging.warning(f"Couldn't answer query {query_id}: {error}")
+            message, response_status = {"knowledge_graph": {"nodes": {}, "edges": {}}, "results": []}, 400
+        duration = time.time() - start
+        response_size = None
+        if responses_dir and response_status == 200:
+            os.makedirs(responses_dir, exist_ok=True)
+            response_path = f"{responses_dir}/offline_{query_id}"
+            with open(response_path, "w") as response_file:
+                json.dump({"message": message}, response_file)
+            response_size = os.path.getsize(response_path)
+        num_results = len(message["results"])
+        num_nodes, num_edges = len(message["knowledge_graph"]["nodes"]), len(message["knowledge_graph"]["edges"])
+        logging.info(f"Query {query_id}: {num_results} results, {num_nodes} nodes, {num_edges} edges "
+                     f"({round(duration, 3)} seconds)")
+        with open(results_tsv_path, "a") as results_file:
+            csv.writer(results_file, delimiter="\t").writerow([query_id, datetime.now(), duration, duration, None,
+                                                               response_status, num_results, num_nodes, num_edges,
+                                                               response_size])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    subparsers = arg_parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Compile Plater JSON lines files into a snapshot")
+    build_parser.add_argument("nodes_jsonl_path", help="Path to nodes_c-plater.jsonl (may be gzipped)")
+    build_parser.add_argument("edges_jsonl_path", help="Path to edges_c-plater.jsonl (may be gzipped)")
+    build_parser.add_argument("snapshot_dir", help="Directory to write the snapshot to")
+    query_parser = subparsers.add_parser("query", help="Answer one-hop queries using a snapshot")
+    query_parser.add_argument("snapshot_dir", help="Directory holding a snapshot made with the 'build' command")
+    query_parser.add_argument("query_path", help="Path to a JSON query file or a directory of JSON queries")
+    query_parser.add_argument("--biolink-version",
+                              help="Biolink version to use for predicate reasoning (descendants/symmetry); if not "
+                                   "specified, predicates are matched exactly (except for biolink:related_to)")
+    query_parser.add_argument("--results-tsv", default=f"{SCRIPT_DIR}/test/offline.tsv",
+                              help="TSV to append per-query results to (importable with test/results_store.py)")
+    query_parser.add_argument("--save-responses", action="store_true", default=False,
+                              help="Save each TRAPI response to test/responses/offline_<query id>")
+    is_set_group = query_parser.add_mutually_exclusive_group()
+    for is_set_flag in ["issettrue", "issetfalse", "issetunpinned"]:
+        is_set_group.add_argument(f"--{is_set_flag}", action="store_const", dest="is_set_override",
+                                  const=is_set_flag)
+    args = arg_parser.parse_args()
+
+    if args.command == "build":
+        build_snapshot(args.nodes_jsonl_path, args.edges_jsonl_path, args.snapshot_dir)
+    else:
+        start = time.time()
+        bh = load_biolink_helper(args.biolink_version) if args.biolink_version else None
+        snapshot = Kg2cSnapshot(args.snapshot_dir, bh=bh)
+        logging.info(f"Loaded snapshot of {snapshot.metadata['num_nodes']} nodes and "
+                     f"{snapshot.metadata['num_edges']} edges in {round(time.time() - start, 2)} seconds")
+        responses_dir = f"{SCRIPT_DIR}/test/responses" if args.save_responses else None
+        run_queries(snapshot, args.query_path.rstrip("/"), args.results_tsv, args.is_set_override, responses_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+This script writes a synthetic, KG2c-shaped graph (nodes_c.tsv, edges_c.tsv, and their header TSVs) at whatever
+scale you want, so that convert_kg2c_tsvs_to_jsonl.py can be benchmarked/tested without downloading a KG2c release.
+Rows follow KG2c's formats and rough distributions: ǂ-delimited array columns, heavy-tailed publication lists (a few
+edges have tens of thousands), a large share of SemMedDB edges (many with < 4 publications), domain_range_exclusion
+flags, and subclass_of edges from a mix of trusted and untrusted sources. Output is deterministic for a given seed.
+
+Usage: python make_synthetic_kg2c.py <output dir> [--num-nodes N] [--edges-per-node N] [--seed N] \
+                                     [--semmeddb-fraction F] [--domain-range-exclusion-fraction F] \
+                                     [--subclass-fraction F] [--max-publications N]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+from typing import List, Tuple
+
+ARRAY_DELIMITER = "ǂ"
+NODE_HEADER = ["id:ID", "name", "all_names:string[]", "category", "all_categories:string[]", "iri", "description",
+               "equivalent_curies:string[]", "publications:string[]", ":LABEL"]
+EDGE_HEADER = ["subject:START_ID", "predicate", "object:END_ID", "primary_knowledge_source", "publications:string[]",
+               "publications_info", "kg2_ids:string[]", "domain_range_exclusion:boolean", "qualified_predicate",
+               "qualified_object_aspect", "qualified_object_direction", "id", ":TYPE"]
+# Preferred categories (with the CURIE prefix their nodes use), weighted roughly like KG2c's
+CATEGORY_WEIGHTS = [(("biolink:SmallMolecule", "CHEBI"), 20), (("biolink:Gene", "NCBIGene"), 12),
+                    (("biolink:Protein", "UniProtKB"), 12), (("biolink:Disease", "MONDO"), 5),
+                    (("biolink:PhenotypicFeature", "HP"), 4), (("biolink:Drug", "RXCUI"), 3),
+                    (("biolink:BiologicalProcess", "GO"), 5), (("biolink:Pathway", "REACT"), 2),
+                    (("biolink:AnatomicalEntity", "UBERON"), 4), (("biolink:Cell", "CL"), 1),
+                    (("biolink:OrganismTaxon", "NCBITaxon"), 8), (("biolink:Publication", "PMID"), 4),
+                    (("biolink:NamedThing", "UMLS"), 20)]
+PREDICATES = ["biolink:related_to", "biolink:interacts_with", "biolink:treats", "biolink:causes",
+              "biolink:affects", "biolink:has_part", "biolink:located_in", "biolink:physically_interacts_with",
+              "biolink:coexists_with", "biolink:has_phenotype", "biolink:associated_with"]
+NON_SEMMEDDB_SOURCES = ["infores:chembl", "infores:drugbank", "infores:uniprot", "infores:ncbi-gene",
+                        "infores:go", "infores:reactome", "infores:umls", "infores:mondo", "infores:chebi",
+                        "infores:hpo", "infores:ctd", "infores:rtx-kg2"]
+SUBCLASS_SOURCES = ["infores:mondo", "infores:chebi", "infores:umls", "infores:go", "infores:hpo",
+                    "infores:uberon", "infores:ncbi-taxon"]  # Only the first two are trusted for subclass reasoning
+QUALIFIED_PREDICATES = [("biolink:causes", "activity_or_abundance", "increased"),
+                        ("biolink:causes", "activity_or_abundance", "decreased"),
+                        ("biolink:causes", "expression", "increased"),
+                        ("biolink:causes", "expression", "decreased")]
+WORDS = ["acid", "receptor", "kinase", "syndrome", "protein", "factor", "alpha", "beta", "type", "disease", "cell",
+         "binding", "regulation", "activity", "complex", "family", "member", "human", "gene", "process"]
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s %(levelname)s: %(message)s',
+                    handlers=[logging.StreamHandler()])
+
+
+def get_num_publications(rng: random.Random, max_publications: int) -> int:
+    """
+    Samples a heavy-tailed number of publications: most rows have a handful (or none), but a few have thousands.
+    """
+    if rng.random() < 0.3:
+        return 0
+    return min(int(rng.paretovariate(0.9)), max_publications)
+
+
+def make_publications(rng: random.Random, num_publications: int) -> str:
+    first_pmid = rng.randrange(1, 40000000)
+    return ARRAY_DELIMITER.join(f"PMID:{first_pmid + index}" for index in range(num_publications))
+
+
+def make_text(rng: random.Random, min_words: int, max_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+
+
+def make_node_row(rng: random.Random, node_num: int, max_publications: int) -> Tuple[List[str], str]:
+    categories_with_prefixes, weights = zip(*CATEGORY_WEIGHTS)
+    category, prefix = rng.choices(categories_with_prefixes, weights=weights)[0]
+    node_id = f"{prefix}:{node_num}"
+    all_categories = [category]
+    if rng.random() < 0.25:  # Merged nodes often have a few categories
+        for extra_category, _ in rng.sample(categories_with_prefixes, rng.randint(1, 2)):
+            if extra_category not in all_categories:
+                all_categories.append(extra_category)
+    name = make_text(rng, 1, 4)
+    all_names = [name] + [make_text(rng, 1, 4) for _ in range(rng.randint(0, 4))]
+    equivalent_curies = [node_id] + [f"UMLS:C{rng.randrange(10000000):07d}" for _ in range(rng.randint(0, 9))]
+    description = make_text(rng, 5, 60) if rng.random() < 0.6 else ""
+    publications = make_publications(rng, get_num_publications(rng, max_publications) // 4)
+    row = [node_id, name, ARRAY_DELIMITER.join(all_names), category, ARRAY_DELIMITER.join(all_categories),
+           f"https://identifiers.org/{prefix.lower()}:{node_num}", description,
+           ARRAY_DELIMITER.join(equivalent_curies), publications, ARRAY_DELIMITER.join(all_categories)]
+    return row, node_id
+
+
+def make_edge_row(rng: random.Random, edge_num: int, node_ids: List[str], args: argparse.Namespace) -> List[str]:
+    # Pick endpoints with a skewed distribution, so that (as in KG2c) a few nodes have huge degrees
+    subject_id = node_ids[int(len(node_ids) * rng.random() ** 3)]
+    object_id = node_ids[int(len(node_ids) * rng.random() ** 2)]
+    qualified_predicate, qualified_object_aspect, qualified_object_direction = "", "", ""
+    publications_info = ""
+    domain_range_exclusion = "False"
+    if rng.random() < args.subclass_fraction:
+        predicate = "biolink:subclass_of"
+        primary_knowledge_source = rng.choice(SUBCLASS_SOURCES)
+        num_publications = 0
+    elif rng.random() < args.semmeddb_fraction / (1 - args.subclass_fraction):
+        predicate = rng.choice(PREDICATES)
+        primary_knowledge_source = "infores:semmeddb"
+        num_publications = max(1, get_num_publications(rng, args.max_publications))
+        if rng.random() < args.domain_range_exclusion_fraction:
+            domain_range_exclusion = "True"
+        # SemMedDB edges carry sentence-level info for (some of) their publications, which makes for huge values
+        publications_info = json.dumps({f"PMID:{rng.randrange(1, 40000000)}": {
+            "publication date": f"{rng.randint(1970, 2023)} Jan 1", "sentence": make_text(rng, 8, 30),
+            "subject score": rng.randint(500, 1000), "object score": rng.randint(500, 1000)}
+            for _ in range(min(num_publications, 10))})
+    else:
+        predicate = rng.choice(PREDICATES)
+        primary_knowledge_source = rng.choice(NON_SEMMEDDB_SOURCES)
+        num_publications = get_num_publications(rng, args.max_publications) // 2
+        if rng.random() < 0.05:
+            qualified_predicate, qualified_object_aspect, qualified_object_direction = \
+                rng.choice(QUALIFIED_PREDICATES)
+    kg2_ids = [f"{subject_id}---{predicate}---{object_id}---{primary_knowledge_source}"]
+    return [subject_id, predicate, object_id, primary_knowledge_source,
+            make_publications(rng, num_publications), publications_info, ARRAY_DELIMITER.join(kg2_ids),
+            domain_range_exclusion, qualified_predicate, qualified_object_aspect, qualified_object_direction,
+            str(edge_num), predicate]
+
+
+def write_header_file(header_tsv_path: str, header: List[str]):
+    with open(header_tsv_path, "w") as header_file:
+        header_file.write("\t".join(header) + "\n")
+
+
+def make_synthetic_kg2c(output_dir: str, num_nodes: int, edges_per_node: float = 5.0, seed: int = 0,
+                        semmeddb_fraction: float = 0.3, domain_range_exclusion_fraction: float = 0.05,
+                        subclass_fraction: float = 0.1, max_publications: int = 50000) -> dict:
+    """
+    Writes nodes_c.tsv, edges_c.tsv, nodes_c_header.tsv, and edges_c_header.tsv to output_dir and returns their
+    paths. Fractions are shares of all edges; domain_range_exclusion_fraction is the share of SemMedDB edges flagged.
+    """
+    args = argparse.Namespace(semmeddb_fraction=semmeddb_fraction, subclass_fraction=subclass_fraction,
+                              domain_range_exclusion_fraction=domain_range_exclusion_fraction,
+                              max_publications=max_publications)
+    os.makedirs(output_dir, exist_ok=True)
+    file_paths = {"nodes_tsv": f"{output_dir}/nodes_c.tsv", "edges_tsv": f"{output_dir}/edges_c.tsv",
+                  "nodes_header_tsv": f"{output_dir}/nodes_c_header.tsv",
+                  "edges_header_tsv": f"{output_dir}/edges_c_header.tsv"}
+    write_header_file(file_paths["nodes_header_tsv"], NODE_HEADER)
+    write_header_file(file_paths["edges_header_tsv"], EDGE_HEADER)
+    rng = random.Random(seed)
+
+    logging.info(f"Writing {num_nodes} synthetic nodes to {file_paths['nodes_tsv']}..")
+    node_ids = []
+    with open(file_paths["nodes_tsv"], "w", buffering=8 * 1024 * 1024) as nodes_file:
+        for node_num in range(num_nodes):
+            row, node_id = make_node_row(rng, node_num, max_publications)
+            node_ids.append(node_id)
+            nodes_file.write("\t".join(row) + "\n")
+
+    num_edges = int(num_nodes * edges_per_node)
+    logging.info(f"Writing {num_edges} synthetic edges to {file_paths['edges_tsv']}..")
+    with open(file_paths["edges_tsv"], "w", buffering=8 * 1024 * 1024) as edges_file:
+        for edge_num in range(num_edges):
+            edges_file.write("\t".join(make_edge_row(rng, edge_num, node_ids, args)) + "\n")
+    logging.info(f"Done writing synthetic KG2c TSVs to {output_dir}")
+    return file_paths
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("output_dir", help="Directory to write the synthetic KG2c TSVs to")
+    arg_parser.add_argument("--num-nodes", type=int, default=10000)
+    arg_parser.add_argument("--edges-per-node", type=float, default=5.0,
+                            help="Number of edges to make per node (KG2c has about 5)")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--semmeddb-fraction", type=float, default=0.3,
+                            help="Share of edges that come from SemMedDB")
+    arg_parser.add_argument("--domain-range-exclusion-fraction", type=float, default=0.05,
+                            help="Share of SemMedDB edges with domain_range_exclusion=True")
+    arg_parser.add_argument("--subclass-fraction", type=float, default=0.1,
+                            help="Share of edges that are biolink:subclass_of edges")
+    arg_parser.add_argument("--max-publications", type=int, default=50000,
+                            help="Cap on the number of publications a single row can have")
+    args = arg_parser.parse_args()
+    make_synthetic_kg2c(args.output_dir, args.num_nodes, edges_per_node=args.edges_per_node, seed=args.seed,
+                        semmeddb_fraction=args.semmeddb_fraction,
+                        domain_range_exclusion_fraction=args.domain_range_exclusion_fraction,
+                        subclass_fraction=args.subclass_fraction, max_publications=args.max_publications)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,37 @@
+"""
+Records memory usage over time to a TSV (in this script's directory). By default it samples system-wide memory use.
+Given target processes (--pid, with their descendants), process names (--process-name, e.g., 'java' for Neo4j), cgroups
+(--cgroup), or Docker containers (--container, sampled via their cgroups), it instead records, for each target and
+sample: RSS, CPU%, bytes read/written (during the interval), and open file descriptors, plus cgroup memory
+broken down into anonymous (e.g., JVM heap/off-heap) and file-backed (page cache) memory. Intervals can be sub-second.
+
+Each row's timestamp is written both as a UTC date/time and as epoch seconds (epoch_seconds, the last column).
+
+Samples go into a preallocated ring buffer that a background thread flushes to the TSV in bulk (every
+--flush-interval seconds), so sampling doesn't do any file I/O of its own.
+
+Usage: python monitor_mem.py <interval in seconds, e.g., 5 or 0.1> <output TSV file name> \
+                             [--pid PID ...] [--process-name name ...] [--cgroup path ...] [--container name ...]
+"""
 import argparse
 import csv
 import os
+import subprocess
+import threading
 import time
 from datetime import datetime
+from typing import Callable, Dict, List, Optional
 
+import numpy as np
 import psutil
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CGROUP_ROOT = "/sys/fs/cgroup"
+SYSTEM_COLUMNS = ["timestamp", "memory_used_gb", "percent_mem_used"]
+TARGET_COLUMNS = ["timestamp", "target", "num_processes", "rss_bytes", "cpu_percent", "read_bytes", "write_bytes",
+                  "num_fds", "cgroup_memory_bytes", "cgroup_anon_bytes", "cgroup_file_bytes"]
+EPOCH_COLUMN = "epoch_seconds"  # Written after the above columns (which are what the ring buffer holds)
+PROCESS_REFRESH_INTERVAL = 1.0  # Seconds between re-discoveries of targets' processes (children, cgroup members)
 
 
 def get_current_memory_usage():
@@ -17,31 +42,265 @@ def get_current_memory_usage():
     return round(memory_used_in_gb, 1), memory_percent_used
 
 
-def record_data(timestamp, memory_used, percent_used, file_path):
+class RingBuffer:
+    """
+    Preallocated buffer of numeric sample rows. One thread appends rows while another periodically takes the rows
+    appended since it last did; if the taker falls more than the buffer's capacity behind, the oldest rows are lost
+    (and counted in num_dropped).
+    """
+
+    def __init__(self, capacity: int, num_columns: int):
+        self.rows = np.full((capacity, num_columns), np.nan)
+        self.capacity = capacity
+        self.num_appended = 0
+        self.num_taken = 0
+        self.num_dropped = 0
+
+    def append(self, row: List[float]):
+        self.rows[self.num_appended % self.capacity] = row
+        self.num_appended += 1
+
+    def take(self) -> np.ndarray:
+        num_appended = self.num_appended  # Rows appended after this point are left for the next take
+        if num_appended - self.num_taken > self.capacity:
+            self.num_dropped += num_appended - self.num_taken - self.capacity
+            self.num_taken = num_appended - self.capacity
+        indexes = np.arange(self.num_taken, num_appended) % self.capacity
+        self.num_taken = num_appended
+        return self.rows[indexes]
+
+
+class CgroupReader:
+    """
+    Reads a cgroup's memory, CPU, and I/O counters, from cgroup v2 or (per-controller) cgroup v1 files.
+    """
+
+    def __init__(self, cgroup_path: str):
+        cgroup_path = cgroup_path[len(CGROUP_ROOT):] if cgroup_path.startswith(CGROUP_ROOT) else cgroup_path
+        self.is_v2 = os.path.exists(f"{CGROUP_ROOT}/cgroup.controllers")
+        if self.is_v2:
+            self.dirs = {controller: f"{CGROUP_ROOT}/{cgroup_path.strip('/')}"
+                         for controller in ["memory", "cpuacct", "blkio"]}
+        else:
+            self.dirs = {controller: f"{CGROUP_ROOT}/{controller}/{cgroup_path.strip('/')}"
+                         for controller in ["memory", "cpuacct", "blkio"]}
+        if not os.path.isdir(self.dirs["memory"]):
+            raise ValueError(f"No such cgroup: {self.dirs['memory']}")
+
+    def _read(self, controller: str, file_name: str) -> Optional[str]:
+        try:
+            with open(f"{self.dirs[controller]}/{file_name}", "r") as cgroup_file:
+                return cgroup_file.read()
+        except OSError:
+            return None
+
+    def get_pids(self) -> List[int]:
+        procs = self._read("memory", "cgroup.procs") or ""
+        return [int(pid) for pid in procs.split()]
+
+    def get_counters(self) -> Dict[str, float]:
+        memory_stat = dict(line.split() for line in (self._read("memory", "memory.stat") or "").splitlines())
+        if self.is_v2:
+            memory_bytes = self._read("memory", "memory.current")
+            anon_bytes, file_bytes = memory_stat.get("anon"), memory_stat.get("file")
+            cpu_stat = dict(line.split() for line in (self._read("cpuacct", "cpu.stat") or "").splitlines())
+            cpu_seconds = float(cpu_stat.get("usage_usec", "nan")) / 10 ** 6
+            io_stat = self._read("blkio", "io.stat")
+            io_fields = [field.split("=") for line in (io_stat or "").splitlines() for field in line.split()[1:]]
+            read_bytes = sum(int(value) for key, value in io_fields if key == "rbytes") if io_stat else "nan"
+            write_bytes = sum(int(value) for key, value in io_fields if key == "wbytes") if io_stat else "nan"
+        else:
+            memory_bytes = self._read("memory", "memory.usage_in_bytes")
+            anon_bytes, file_bytes = memory_stat.get("total_rss"), memory_stat.get("total_cache")
+            cpu_seconds = float(self._read("cpuacct", "cpuacct.usage") or "nan") / 10 ** 9
+            io_service_bytes = self._read("blkio", "blkio.throttle.io_service_bytes")
+            io_lines = [line.split() for line in (io_service_bytes or "").splitlines()]
+            read_bytes = sum(int(line[2]) for line in io_lines if len(line) == 3 and line[1] == "Read") \
+                if io_service_bytes else "nan"
+            write_bytes = sum(int(line[2]) for line in io_lines if len(line) == 3 and line[1] == "Write") \
+                if io_service_bytes else "nan"
+        return {"memory_bytes": float(memory_bytes or "nan"), "anon_bytes": float(anon_bytes or "nan"),
+                "file_bytes": float(file_bytes or "nan"), "cpu_seconds": cpu_seconds,
+                "read_bytes": float(read_bytes), "write_bytes": float(write_bytes)}
+
+
+def get_container_cgroup(container_name: str) -> str:
+    container_pid = subprocess.check_output(["docker", "inspect", "--format", "{{.State.Pid}}", container_name],
+                                            text=True).strip()
+    with open(f"/proc/{container_pid}/cgroup", "r") as cgroup_file:
+        cgroup_lines = [line.strip().split(":", 2) for line in cgroup_file]
+    # The cgroup v2 (unified) line has an empty controller list; otherwise use the memory controller's
+    cgroup_paths = {controllers: path for _, controllers, path in cgroup_lines}
+    return cgroup_paths.get("") if os.path.exists(f"{CGROUP_ROOT}/cgroup.controllers") else cgroup_paths["memory"]
+
+
+def get_or_nan(get_value: Callable[[], float]) -> float:
+    try:
+        return get_value()
+    except psutil.AccessDenied:
+        return np.nan
+
+
+class Target:
+    """
+    A set of processes to sample: a process and its descendants, processes with a given name, or a cgroup's members.
+    CPU time and I/O bytes are reported per interval, summed over the processes (or read from the cgroup).
+    """
+
+    def __init__(self, label: str, pid: Optional[int] = None, process_name: Optional[str] = None,
+                 cgroup: Optional[CgroupReader] = None):
+        self.label = label
+        self.pid = pid
+        self.process_name = process_name
+        self.cgroup = cgroup
+        self.processes = dict()
+        self.last_refresh = 0.0
+        self.last_counters = dict()  # pid (or 'cgroup') -> (cpu seconds, read bytes, write bytes) at the last sample
+        self.last_sample_time = None
+
+    def _refresh_processes(self):
+        if self.cgroup:
+            pids = self.cgroup.get_pids()
+        elif self.pid:
+            try:
+                root_process = self.processes.get(self.pid) or psutil.Process(self.pid)
+                pids = [self.pid] + [child.pid for child in root_process.children(recursive=True)]
+            except psutil.NoSuchProcess:
+                pids = []
+        else:
+            pids = [process.pid for process in psutil.process_iter(["name"])
+                    if process.info["name"] == self.process_name]
+        processes = dict()
+        for pid in pids:
+            try:
+                processes[pid] = self.processes.get(pid) or psutil.Process(pid)
+            except psutil.NoSuchProcess:
+                pass
+        self.processes = processes
+
+    def sample(self, sample_time: float) -> List[float]:
+        if sample_time - self.last_refresh >= PROCESS_REFRESH_INTERVAL:
+            self._refresh_processes()
+            self.last_refresh = sample_time
+        rss_bytes, num_fds = 0, 0
+        counters = dict()
+        for pid, process in list(self.processes.items()):
+            try:
+                # Anything we aren't allowed to read (e.g., another user's processes' fds or I/O) is NaN
+                with process.oneshot():
+                    rss_bytes += get_or_nan(lambda: process.memory_info().rss)
+                    num_fds += get_or_nan(process.num_fds)
+                    cpu_seconds = get_or_nan(lambda: process.cpu_times().user + process.cpu_times().system)
+                    try:
+                        io_counters = process.io_counters()
+                        read_bytes, write_bytes = io_counters.read_bytes, io_counters.write_bytes
+                    except psutil.AccessDenied:
+                        read_bytes, write_bytes = np.nan, np.nan
+                    counters[pid] = (cpu_seconds, read_bytes, write_bytes)
+            except psutil.NoSuchProcess:
+                del self.processes[pid]
+        cgroup_counters = self.cgroup.get_counters() if self.cgroup else None
+        if cgroup_counters and not np.isnan(cgroup_counters["cpu_seconds"]):
+            # The cgroup's counters include processes that came and went between samples (if it has them; under
+            # cgroup v1, the target's cpuacct/blkio cgroups may not exist, so its processes' counters are used)
+            counters = {"cgroup": (cgroup_counters["cpu_seconds"], cgroup_counters["read_bytes"],
+                                   cgroup_counters["write_bytes"])}
+
+        # Only processes present in both this sample and the last contribute to the interval's CPU time and I/O
+        deltas = np.array([np.subtract(counters[key], self.last_counters[key]) for key in counters
+                           if key in self.last_counters]).reshape(-1, 3).sum(axis=0)
+        elapsed = sample_time - self.last_sample_time if self.last_sample_time else None
+        self.last_counters, self.last_sample_time = counters, sample_time
+        return [len(self.processes), rss_bytes, deltas[0] / elapsed * 100 if elapsed else np.nan,
+                deltas[1] if elapsed else np.nan, deltas[2] if elapsed else np.nan, num_fds,
+                *([cgroup_counters["memory_bytes"], cgroup_counters["anon_bytes"], cgroup_counters["file_bytes"]]
+                  if cgroup_counters else [np.nan] * 3)]
+
+
+def write_rows(file_path: str, rows: np.ndarray, target_labels: Optional[List[str]]):
     with open(file_path, "a") as mem_file:
         writer = csv.writer(mem_file, delimiter="\t")
-        writer.writerow([timestamp, memory_used, percent_used])
+        for row in rows.tolist():
+            timestamp = datetime.utcfromtimestamp(row[0]).strftime("%Y-%m-%d %H:%M:%S.%f")
+            if target_labels:
+                writer.writerow([timestamp, target_labels[int(row[1])]] +
+                                ["" if value != value else round(value, 2) if column == "cpu_percent" else int(value)
+                                 for column, value in zip(TARGET_COLUMNS[2:], row[2:])] + [round(row[0], 6)])
+            else:
+                writer.writerow([timestamp, row[1], row[2], round(row[0], 6)])
+
+
+def flush_periodically(ring_buffer: RingBuffer, file_path: str, target_labels: Optional[List[str]],
+                       flush_interval: float, stop_event: threading.Event):
+    while not stop_event.wait(flush_interval):
+        write_rows(file_path, ring_buffer.take(), target_labels)
+    write_rows(file_path, ring_buffer.take(), target_labels)
+    if ring_buffer.num_dropped:
+        print(f"Warning: {ring_buffer.num_dropped} samples were dropped because they weren't flushed in time; try "
+              f"a bigger --buffer-size or smaller --flush-interval")
 
 
 def main():
     arg_parser = argparse.ArgumentParser()
-    arg_parser.add_argument("interval")
+    arg_parser.add_argument("interval", type=float, help="Seconds between samples (can be fractional, e.g., 0.1)")
     arg_parser.add_argument("file_name")
+    arg_parser.add_argument("--pid", type=int, nargs="+", default=[], help="Processes to sample (with descendants)")
+    arg_parser.add_argument("--process-name", nargs="+", default=[],
+                            help="Names of processes to sample (all processes with each name make up one target)")
+    arg_parser.add_argument("--cgroup", nargs="+", default=[],
+                            help="Cgroups to sample, e.g., /system.slice/docker-<id>.scope")
+    arg_parser.add_argument("--container", nargs="+", default=[], help="Names of Docker containers to sample")
+    arg_parser.add_argument("--buffer-size", type=int, default=100000, help="Number of samples the buffer holds")
+    arg_parser.add_argument("--flush-interval", type=float, default=10, help="Seconds between writes to the TSV")
     args = arg_parser.parse_args()
-    file_path = f"{SCRIPT_DIR}/{args.file_name}"
+    file_path = os.path.join(SCRIPT_DIR, args.file_name)  # Absolute paths are used as is
 
-    # Initiate the file to save data to
-    if not os.path.exists(file_path):
+    targets = [Target(f"pid:{pid}", pid=pid) for pid in args.pid] + \
+              [Target(f"name:{process_name}", process_name=process_name) for process_name in args.process_name] + \
+              [Target(f"cgroup:{cgroup}", cgroup=CgroupReader(cgroup)) for cgroup in args.cgroup] + \
+              [Target(f"container:{container}", cgroup=CgroupReader(get_container_cgroup(container)))
+               for container in args.container]
+    target_labels = [target.label for target in targets] if targets else None
+    columns = TARGET_COLUMNS if targets else SYSTEM_COLUMNS
+
+    # Initiate the file to save data to (or append to it, if it has the same columns)
+    header = columns + [EPOCH_COLUMN]
+    if os.path.exists(file_path):
+        with open(file_path, "r") as mem_file:
+            existing_header = next(csv.reader(mem_file, delimiter="\t"), None)
+        if existing_header != header:
+            arg_parser.error(f"{file_path} already exists with different columns ({existing_header}); this run "
+                             f"would write {header}. Use a new output file name.")
+    else:
         with open(file_path, "w+") as mem_file:
             writer = csv.writer(mem_file, delimiter="\t")
-            writer.writerow(["timestamp", "memory_used_gb", "percent_mem_used"])
-
-    # Record mem usage level every 5 seconds
-    while True:
-        time.sleep(int(args.interval))
-        utc_timestamp = datetime.utcnow()
-        memory_used, percent_used = get_current_memory_usage()
-        record_data(utc_timestamp, memory_used, percent_used, file_path)
+            writer.writerow(header)
+
+    # Each target's columns (with the target's index in place of its label) go in one row of the buffer
+    ring_buffer = RingBuffer(args.buffer_size, len(columns))
+    stop_event = threading.Event()
+    flusher = threading.Thread(target=flush_periodically,
+                               args=(ring_buffer, file_path, target_labels, args.flush_interval, stop_event))
+    flusher.start()
+
+    # Record usage every interval (on a fixed schedule, so time spent sampling doesn't make samples drift)
+    next_sample_time = time.time()
+    try:
+        while True:
+            next_sample_time += args.interval
+            time.sleep(max(next_sample_time - time.time(), 0))
+            sample_time = time.time()
+            if targets:
+                for target_index, target in enumerate(targets):
+                    ring_buffer.append([sample_time, target_index] + target.sample(sample_time))
+            else:
+                memory_used, percent_used = get_current_memory_usage()
+                ring_buffer.append([sample_time, memory_used, percent_used])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_event.set()
+        flusher.join()
 
 
 if __name__ == "__main__":
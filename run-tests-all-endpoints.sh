@@ -1,12 +1,14 @@
-# Usage: bash -x run-tests-all-endpoints.sh <pytest is_set flag, e.g.: --issetfalse>
+# Usage: bash -x run-tests-all-endpoints.sh <pytest is_set flag, e.g.: --issetfalse> [concurrency, default 1]
 # Run this script on whatever instance you want to send tests FROM. Requires having run setup-kg2-plater.sh
 
 is_set_flag=$1
+concurrency=${2:-1}
+run_name=run-$(date +%Y-%m-%d-%H%M%S)
 
 cd ~/plater-plover
 git pull origin main
 . ${HOME}/.pyenv/versions/plater-ploverenv/bin/activate
 
-bash -x run-tests.sh http://amyplater.rtx.ai:8080/1.4 ${is_set_flag}
-bash -x run-tests.sh http://amyplover.rtx.ai:9990 ${is_set_flag}
-bash -x run-tests.sh http://amyaraxkg2.rtx.ai:8080/api/rtxkg2/v1.4 ${is_set_flag}
\ No newline at end of file
+bash -x run-tests.sh http://amyplater.rtx.ai:8080/1.4 "${is_set_flag}" ${concurrency} ${run_name}
+bash -x run-tests.sh http://amyplover.rtx.ai:9990 "${is_set_flag}" ${concurrency} ${run_name}
+bash -x run-tests.sh http://amyaraxkg2.rtx.ai:8080/api/rtxkg2/v1.4 "${is_set_flag}" ${concurrency} ${run_name}
\ No newline at end of file
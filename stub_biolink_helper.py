@@ -0,0 +1,82 @@
+"""
+A small, offline stand-in for RTX's BiolinkHelper (which convert_kg2c_tsvs_to_jsonl.py normally downloads, and which
+in turn downloads the Biolink model), for use in benchmarks and tests. It only knows a slice of the Biolink category
+hierarchy - the categories make_synthetic_kg2c.py uses - but answers get_ancestors/get_descendants the same way.
+
+Usage: from stub_biolink_helper import BiolinkHelper
+"""
+from typing import Dict, List, Set, Union
+
+# Each category mapped to its parent categories (mixins are parents too, as in the Biolink model)
+CATEGORY_PARENTS = {
+    "biolink:NamedThing": [],
+    "biolink:BiologicalEntity": ["biolink:NamedThing", "biolink:ThingWithTaxon"],
+    "biolink:GeneOrGeneProduct": ["biolink:MacromolecularMachineMixin"],
+    "biolink:GeneProductMixin": ["biolink:GeneOrGeneProduct"],
+    "biolink:MacromolecularMachineMixin": [],
+    "biolink:ThingWithTaxon": [],
+    "biolink:PhysicalEssence": [],
+    "biolink:ChemicalEntityOrGeneOrGeneProduct": [],
+    "biolink:Gene": ["biolink:BiologicalEntity", "biolink:GeneOrGeneProduct",
+                     "biolink:ChemicalEntityOrGeneOrGeneProduct", "biolink:PhysicalEssence"],
+    "biolink:Polypeptide": ["biolink:BiologicalEntity", "biolink:ChemicalEntityOrGeneOrGeneProduct"],
+    "biolink:Protein": ["biolink:Polypeptide", "biolink:GeneProductMixin"],
+    "biolink:DiseaseOrPhenotypicFeature": ["biolink:BiologicalEntity"],
+    "biolink:Disease": ["biolink:DiseaseOrPhenotypicFeature"],
+    "biolink:PhenotypicFeature": ["biolink:DiseaseOrPhenotypicFeature"],
+    "biolink:ChemicalEntity": ["biolink:NamedThing", "biolink:PhysicalEssence",
+                               "biolink:ChemicalEntityOrGeneOrGeneProduct"],
+    "biolink:MolecularEntity": ["biolink:ChemicalEntity"],
+    "biolink:SmallMolecule": ["biolink:MolecularEntity"],
+    "biolink:ChemicalMixture": ["biolink:ChemicalEntity"],
+    "biolink:MolecularMixture": ["biolink:ChemicalMixture"],
+    "biolink:Drug": ["biolink:MolecularMixture"],
+    "biolink:BiologicalProcessOrActivity": ["biolink:BiologicalEntity"],
+    "biolink:BiologicalProcess": ["biolink:BiologicalProcessOrActivity"],
+    "biolink:Pathway": ["biolink:BiologicalProcess"],
+    "biolink:AnatomicalEntity": ["biolink:BiologicalEntity", "biolink:PhysicalEssence"],
+    "biolink:Cell": ["biolink:AnatomicalEntity"],
+    "biolink:OrganismTaxon": ["biolink:NamedThing"],
+    "biolink:InformationContentEntity": ["biolink:NamedThing"],
+    "biolink:Publication": ["biolink:InformationContentEntity"],
+}
+MIXINS = {"biolink:GeneOrGeneProduct", "biolink:GeneProductMixin", "biolink:MacromolecularMachineMixin",
+          "biolink:ThingWithTaxon", "biolink:PhysicalEssence", "biolink:ChemicalEntityOrGeneOrGeneProduct"}
+CONFLATIONS = {"biolink:Gene": {"biolink:Protein"}, "biolink:Protein": {"biolink:Gene"},
+               "biolink:Drug": {"biolink:SmallMolecule"}, "biolink:SmallMolecule": {"biolink:Drug"}}
+
+
+class BiolinkHelper:
+
+    def __init__(self, biolink_version: str = None):
+        self.biolink_version = biolink_version
+        self.ancestors = {category: self._get_ancestors_of(category) for category in CATEGORY_PARENTS}
+
+    def _get_ancestors_of(self, category: str) -> Set[str]:
+        ancestors = {category}
+        for parent in CATEGORY_PARENTS.get(category, []):
+            ancestors |= self._get_ancestors_of(parent)
+        return ancestors
+
+    def _expand(self, categories: Union[str, List[str]], relatives: Dict[str, Set[str]], include_mixins: bool,
+                include_conflations: bool) -> List[str]:
+        categories = [categories] if isinstance(categories, str) else categories
+        if include_conflations:
+            categories = set(categories).union(*[CONFLATIONS.get(category, set()) for category in categories])
+        expanded = set()
+        for category in categories:
+            expanded |= relatives.get(category, {category})
+        if not include_mixins:
+            expanded -= MIXINS
+        return list(expanded)
+
+    def get_ancestors(self, categories: Union[str, List[str]], include_mixins: bool = True,
+                      include_conflations: bool = True) -> List[str]:
+        return self._expand(categories, self.ancestors, include_mixins, include_conflations)
+
+    def get_descendants(self, categories: Union[str, List[str]], include_mixins: bool = True,
+                        include_conflations: bool = True) -> List[str]:
+        descendants = {category: {descendant for descendant, ancestors in self.ancestors.items()
+                                  if category in ancestors}
+                       for category in CATEGORY_PARENTS}
+        return self._expand(categories, descendants, include_mixins, include_conflations)
@@ -1,60 +1,319 @@
-import csv
+"""
+Collates the query executions in the results database (see results_store.py) into one table per querier and is_set
+mode, with a row per query and each run's durations/counts side by side (runs are numbered in the order they were
+made; if a query was run more than once in a run, its latest execution is used).
+
+With --report-dir, it also writes a latency report: p50/p95/p99 per query and per querier (stack), with bootstrap
+confidence intervals, split into cold (the first --cold-runs runs of each querier/is_set mode) and warm executions,
+plus plots. With --baseline-runs and --candidate-runs (run names, which may be glob patterns, e.g. to compare two
+KG2 versions), it flags statistically significant latency regressions/improvements between the two sets of runs.
+
+Usage: python collate_results.py [--db path] [--import-dir dir of results TSVs to import first, e.g. final_results] \
+                                 [--report-dir dir [--metric duration_server] [--cold-runs 1] \
+                                  [--baseline-runs name(s) --candidate-runs name(s)]]
+"""
+import argparse
+import fnmatch
 import os
-from collections import defaultdict
+import sqlite3
+from typing import List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from results_store import ResultsStore, DEFAULT_DB_PATH, import_tsv
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_COLS = ["duration_server", "duration_db", "response_status", "num_results", "num_nodes", "num_edges"]
-COLWISE = 0
-ROWWISE = 1
+COLLATE_QUERY = f"""
+WITH latest AS (
+    SELECT executions.*, ROW_NUMBER() OVER (PARTITION BY executions.run_id, executions.query_id
+                                            ORDER BY executions.execution_id DESC) AS recency
+    FROM query_executions AS executions
+    JOIN endpoints USING (endpoint_id)
+    JOIN is_set_modes USING (is_set_mode_id)
+    WHERE endpoints.querier = ? AND is_set_modes.name = ?),
+run_order AS (
+    SELECT run_id, DENSE_RANK() OVER (ORDER BY MIN(date_run), run_id) AS run_num FROM latest GROUP BY run_id)
+SELECT latest.query_id, run_order.run_num, {", ".join(f"latest.{col}" for col in BASE_COLS)}
+FROM latest JOIN run_order USING (run_id)
+WHERE latest.recency = 1
+"""
+EXECUTIONS_QUERY = """
+WITH executions AS (
+    SELECT query_executions.*, endpoints.querier, is_set_modes.name AS is_set_mode, runs.run_name
+    FROM query_executions
+    JOIN endpoints USING (endpoint_id)
+    JOIN is_set_modes USING (is_set_mode_id)
+    JOIN runs USING (run_id)
+    WHERE query_executions.response_status = 200),
+run_order AS (
+    SELECT querier, is_set_mode, run_id,
+           DENSE_RANK() OVER (PARTITION BY querier, is_set_mode ORDER BY MIN(date_run), run_id) AS run_num
+    FROM executions GROUP BY querier, is_set_mode, run_id)
+SELECT executions.*, run_order.run_num FROM executions JOIN run_order USING (querier, is_set_mode, run_id)
+"""
+PERCENTILES = [50, 95, 99]
+NUM_BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE_LEVEL = 0.95
+BOOTSTRAP_MAX_WEIGHTS = 2 ** 24  # Max resamples x executions evaluated at once for percentile CIs (64 MB each)
+MIN_EFFECT_SIZE = 0.05  # Latency changes smaller than this fraction aren't flagged, even if significant
+
+
+def collate(connection: sqlite3.Connection, querier: str, is_set_mode: str) -> pd.DataFrame:
+    executions_df = pd.read_sql_query(COLLATE_QUERY, connection, params=[querier, is_set_mode])
+    results_df = executions_df.pivot(index="query_id", columns="run_num", values=BASE_COLS)
+    run_nums = sorted(executions_df["run_num"].unique())
+    results_df = results_df[[(base_col_name, run_num) for run_num in run_nums for base_col_name in BASE_COLS]]
+    results_df.columns = [f"{base_col_name}_{run_num}" for base_col_name, run_num in results_df.columns]
+    return results_df.reset_index()
+
+
+def bootstrap_ci(samples: List[np.ndarray], rng: np.random.Generator,
+                 percentile: Optional[float] = None) -> Tuple[float, float]:
+    """
+    Returns a percentile bootstrap confidence interval for the given percentile (or the mean, if percentile is None)
+    of the pooled samples. Each element of samples is one query's executions; queries (not individual executions) are
+    resampled, since executions of the same query aren't independent of each other. Each resample is represented by
+    how many times it drew each query, so that resamples can be evaluated together: means come from per-query sums
+    and counts, and percentiles are evaluated in chunks of resamples (each chunk's per-execution weights hold at most
+    BOOTSTRAP_MAX_WEIGHTS values), so memory doesn't grow with the number of resamples times executions.
+    """
+    if len(samples) == 1:  # Just one query, so its executions are resampled
+        samples = [np.array([value]) for value in samples[0]]
+    if len(samples) < 2:
+        return np.nan, np.nan
+    draws = rng.integers(len(samples), size=(NUM_BOOTSTRAP_RESAMPLES, len(samples)))
+    draw_counts = np.zeros((NUM_BOOTSTRAP_RESAMPLES, len(samples)), dtype=np.float32)
+    np.add.at(draw_counts, (np.arange(NUM_BOOTSTRAP_RESAMPLES)[:, None], draws), 1)
+    if percentile is None:
+        query_sums = np.array([query_samples.sum() for query_samples in samples])
+        query_counts = np.array([len(query_samples) for query_samples in samples])
+        resampled_stats = (draw_counts @ query_sums) / (draw_counts @ query_counts)
+    else:  # Weighted percentile (the smallest value with at least percentile% of the weight at or below it)
+        values = np.concatenate(samples)
+        query_indexes = np.repeat(np.arange(len(samples)), [len(query_samples) for query_samples in samples])
+        order = np.argsort(values, kind="stable")
+        values, query_indexes = values[order], query_indexes[order]
+        chunk_size = max(BOOTSTRAP_MAX_WEIGHTS // len(values), 1)
+        resampled_stats = np.empty(NUM_BOOTSTRAP_RESAMPLES)
+        for chunk_start in range(0, NUM_BOOTSTRAP_RESAMPLES, chunk_size):
+            chunk_draw_counts = draw_counts[chunk_start:chunk_start + chunk_size]
+            cumulative_weights = np.cumsum(chunk_draw_counts[:, query_indexes], axis=1)
+            thresholds = cumulative_weights[:, -1:] * percentile / 100
+            resampled_stats[chunk_start:chunk_start + chunk_size] = \
+                values[np.argmax(cumulative_weights >= thresholds, axis=1)]
+    alpha = (1 - CONFIDENCE_LEVEL) / 2
+    return tuple(np.quantile(resampled_stats, [alpha, 1 - alpha]))
+
+
+def summarize_latencies(samples: List[np.ndarray], rng: np.random.Generator) -> dict:
+    pooled = np.concatenate(samples)
+    summary = {"n": len(pooled), "mean": pooled.mean()}
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}"] = np.percentile(pooled, percentile)
+    for percentile in PERCENTILES[:2]:  # p99 intervals from a few dozen executions wouldn't mean much
+        summary[f"p{percentile}_ci_low"], summary[f"p{percentile}_ci_high"] = \
+            bootstrap_ci(samples, rng, percentile)
+    return summary
+
+
+def load_executions(connection: sqlite3.Connection, metric: str, cold_runs: int) -> pd.DataFrame:
+    executions_df = pd.read_sql_query(EXECUTIONS_QUERY, connection)
+    executions_df = executions_df[executions_df[metric].notna()]
+    executions_df["phase"] = np.where(executions_df["run_num"] <= cold_runs, "cold", "warm")
+    return executions_df
+
+
+def make_latency_report(executions_df: pd.DataFrame, metric: str, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Summarizes latencies per querier (stack) and per query, for cold, warm, and all executions, in one table.
+    """
+    rows = []
+    for (querier, is_set_mode), group_df in executions_df.groupby(["querier", "is_set_mode"]):
+        for phase in ["cold", "warm", "all"]:
+            phase_df = group_df if phase == "all" else group_df[group_df["phase"] == phase]
+            if phase_df.empty:
+                continue
+            query_samples = {query_id: query_df[metric].to_numpy(dtype=float)
+                             for query_id, query_df in phase_df.groupby("query_id")}
+            rows.append({"level": "stack", "querier": querier, "is_set_mode": is_set_mode, "query_id": "",
+                         "phase": phase, "num_queries": len(query_samples),
+                         **summarize_latencies(list(query_samples.values()), rng)})
+            for query_id, samples in query_samples.items():
+                rows.append({"level": "query", "querier": querier, "is_set_mode": is_set_mode, "query_id": query_id,
+                             "phase": phase, "num_queries": 1, **summarize_latencies([samples], rng)})
+    return pd.DataFrame(rows)
+
 
+def get_matching_runs(run_names: List[str], patterns: List[str]) -> List[str]:
+    return [run_name for run_name in run_names if any(fnmatch.fnmatch(run_name, pattern) for pattern in patterns)]
 
-def convert_to_right_type(value: str):
-    if value == "":
-        return None
-    elif "." in value:
-        return float(value)
-    else:
-        return int(value)
+
+def bootstrap_ratio_ci(baseline: np.ndarray, candidate: np.ndarray,
+                       rng: np.random.Generator) -> Tuple[float, float]:
+    # Confidence interval for median(candidate) / median(baseline), resampling each side's executions
+    if len(baseline) < 2 or len(candidate) < 2:
+        return np.nan, np.nan
+    baseline_medians = np.median(rng.choice(baseline, (NUM_BOOTSTRAP_RESAMPLES, len(baseline))), axis=1)
+    candidate_medians = np.median(rng.choice(candidate, (NUM_BOOTSTRAP_RESAMPLES, len(candidate))), axis=1)
+    alpha = (1 - CONFIDENCE_LEVEL) / 2
+    return tuple(np.quantile(candidate_medians / baseline_medians, [alpha, 1 - alpha]))
+
+
+def classify_change(ci_low: float, ci_high: float) -> str:
+    if np.isnan(ci_low):
+        return "insufficient samples"
+    elif ci_low > 1 + MIN_EFFECT_SIZE:
+        return "regression"
+    elif ci_high < 1 - MIN_EFFECT_SIZE:
+        return "improvement"
+    return "no significant change"
+
+
+def detect_regressions(executions_df: pd.DataFrame, metric: str, baseline_runs: List[str],
+                       candidate_runs: List[str], rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Compares latencies in the candidate runs to those in the baseline runs, per query (ratio of medians, with a
+    bootstrap confidence interval; needs at least two executions on each side) and per querier (geometric mean of the
+    per-query ratios, bootstrapped over queries). A change is flagged only if its whole confidence interval is beyond
+    MIN_EFFECT_SIZE.
+    """
+    rows = []
+    for (querier, is_set_mode), group_df in executions_df.groupby(["querier", "is_set_mode"]):
+        baseline_df = group_df[group_df["run_name"].isin(baseline_runs)]
+        candidate_df = group_df[group_df["run_name"].isin(candidate_runs)]
+        query_ids = sorted(set(baseline_df["query_id"]) & set(candidate_df["query_id"]))
+        log_ratios = []
+        for query_id in query_ids:
+            baseline = baseline_df.loc[baseline_df["query_id"] == query_id, metric].to_numpy(dtype=float)
+            candidate = candidate_df.loc[candidate_df["query_id"] == query_id, metric].to_numpy(dtype=float)
+            ratio = np.median(candidate) / np.median(baseline) if np.median(baseline) > 0 else np.nan
+            if not np.isnan(ratio) and ratio > 0:
+                log_ratios.append(np.log(ratio))
+            ci_low, ci_high = bootstrap_ratio_ci(baseline, candidate, rng)
+            rows.append({"level": "query", "querier": querier, "is_set_mode": is_set_mode, "query_id": query_id,
+                         "num_queries": 1, "baseline_n": len(baseline), "candidate_n": len(candidate),
+                         "baseline_p50": np.median(baseline), "candidate_p50": np.median(candidate),
+                         "ratio": ratio, "ratio_ci_low": ci_low, "ratio_ci_high": ci_high,
+                         "verdict": classify_change(ci_low, ci_high)})
+        if log_ratios:
+            log_ratios = np.array(log_ratios)
+            ci_low, ci_high = np.exp(bootstrap_ci([np.array([log_ratio]) for log_ratio in log_ratios], rng))
+            rows.append({"level": "stack", "querier": querier, "is_set_mode": is_set_mode, "query_id": "",
+                         "num_queries": len(log_ratios), "baseline_n": len(baseline_df),
+                         "candidate_n": len(candidate_df), "baseline_p50": baseline_df[metric].median(),
+                         "candidate_p50": candidate_df[metric].median(), "ratio": np.exp(log_ratios.mean()),
+                         "ratio_ci_low": ci_low, "ratio_ci_high": ci_high,
+                         "verdict": classify_change(ci_low, ci_high)})
+    return pd.DataFrame(rows)
+
+
+def plot_latencies(executions_df: pd.DataFrame, metric: str, report_dir: str):
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("Skipping plots, since matplotlib is not installed (pip install matplotlib)")
+        return
+    for is_set_mode, mode_df in executions_df.groupby("is_set_mode"):
+        # Empirical CDF of each stack's latencies, split into cold and warm executions
+        figure, axes = plt.subplots(figsize=(9, 6))
+        for (querier, phase), group_df in mode_df.groupby(["querier", "phase"]):
+            values = np.sort(group_df[metric].to_numpy(dtype=float))
+            axes.step(values, np.arange(1, len(values) + 1) / len(values), where="post",
+                      linestyle="-" if phase == "warm" else "--", label=f"{querier} ({phase})")
+        axes.set_xscale("log")
+        axes.set_xlabel(f"{metric} (seconds)")
+        axes.set_ylabel("Fraction of queries")
+        axes.set_title(f"Latency distribution ({is_set_mode})")
+        axes.legend()
+        figure.savefig(f"{report_dir}/latency-ecdf-{is_set_mode}.png", dpi=150, bbox_inches="tight")
+        plt.close(figure)
+
+        # Each stack's (warm) latencies, query by query
+        figure, axes = plt.subplots(figsize=(9, 6))
+        warm_df = mode_df[mode_df["phase"] == "warm"] if (mode_df["phase"] == "warm").any() else mode_df
+        queriers = sorted(warm_df["querier"].unique())
+        axes.boxplot([warm_df.loc[warm_df["querier"] == querier, metric].to_numpy(dtype=float)
+                      for querier in queriers], whis=(5, 95))
+        axes.set_xticklabels(queriers)
+        axes.set_yscale("log")
+        axes.set_ylabel(f"{metric} (seconds)")
+        axes.set_title(f"Latency by stack ({is_set_mode}; whiskers at p5/p95)")
+        figure.savefig(f"{report_dir}/latency-by-stack-{is_set_mode}.png", dpi=150, bbox_inches="tight")
+        plt.close(figure)
+
+
+def write_report(connection: sqlite3.Connection, report_dir: str, metric: str, cold_runs: int,
+                 baseline_runs: Optional[List[str]], candidate_runs: Optional[List[str]], seed: int):
+    os.makedirs(report_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    executions_df = load_executions(connection, metric, cold_runs)
+    report_df = make_latency_report(executions_df, metric, rng)
+    report_df.to_csv(f"{report_dir}/latency-report.tsv", sep="\t", index=False)
+    print(f"\nLatency ({metric}) by stack:\n"
+          f"{report_df[report_df['level'] == 'stack'].drop(columns=['level', 'query_id']).to_string(index=False)}")
+    plot_latencies(executions_df, metric, report_dir)
+
+    if baseline_runs and candidate_runs:
+        run_names = sorted(executions_df["run_name"].unique())
+        baseline_runs, candidate_runs = (get_matching_runs(run_names, baseline_runs),
+                                         get_matching_runs(run_names, candidate_runs))
+        print(f"\nComparing candidate runs {candidate_runs} to baseline runs {baseline_runs}")
+        regressions_df = detect_regressions(executions_df, metric, baseline_runs, candidate_runs, rng)
+        regressions_df.to_csv(f"{report_dir}/latency-regressions.tsv", sep="\t", index=False)
+        if not regressions_df.empty:
+            print(regressions_df[regressions_df["level"] == "stack"].drop(columns=["level", "query_id"])
+                  .to_string(index=False))
+            flagged_df = regressions_df[(regressions_df["level"] == "query") &
+                                        (regressions_df["verdict"] == "regression")]
+            print(f"{len(flagged_df)} queries regressed significantly")
+    print(f"Wrote latency report to {report_dir}")
 
 
 def main():
-    is_set_kinds = ["asis", "issetfalse", "issettrue"]
-    stacks = ["araxkg2", "plater", "plover"]
-    runs = [1, 2, 3]
-
-    table_cols = ["query_id"] + [f"{base_col_name}_{run_num}" for run_num in runs
-                                 for base_col_name in BASE_COLS]
-    print(table_cols)
-
-    for kind in is_set_kinds:
-        print(f"\nStarting kind: {kind}")
-
-        for stack in stacks:
-            print(f"  Starting stack: {stack}")
-            results = defaultdict(list)  # Maps query IDs for this platform to its merged data for all 3 runs
-
-            for run in runs:
-                print(f"    Starting run: {run}")
-                results_tsv_path = f"{SCRIPT_DIR}/results/final_results/{kind}_results/{stack}--{kind}--{run}.tsv"
-
-                results_dict = dict()
-                with open(results_tsv_path, "r") as results_file:
-                    reader = csv.reader(results_file, delimiter="\t")
-                    next(reader)  # Skip the header row
-                    for row in reader:
-                        # Add the results for this run to the entry for this query ID (in this platform's results)
-                        query_id = row[0]
-                        row_relevant = row[3:-1]
-                        row_preprocessed = [convert_to_right_type(value) for value in row_relevant]
-                        results[query_id] += row_preprocessed
-
-            results_table = [[query_id] + results for query_id, results in results.items()]
-
-            results_df = pd.DataFrame(results_table, columns=table_cols)
-            print(results_df)
-            results_df.to_csv(f"results_{stack}_{kind}.tsv", sep="\t")
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the results database")
+    arg_parser.add_argument("--import-dir", help="Directory of <querier>--<is_set mode>--<run number>.tsv results "
+                                                 "files to import into the database before collating (files already "
+                                                 "imported are skipped)")
+    arg_parser.add_argument("--report-dir", help="Directory to write the latency report (tables and plots) to")
+    arg_parser.add_argument("--metric", default="duration_server", choices=["duration_server", "duration_db",
+                                                                            "duration_client", "time_to_first_byte"])
+    arg_parser.add_argument("--cold-runs", type=int, default=1,
+                            help="Number of initial runs (per querier/is_set mode) whose executions count as cold")
+    arg_parser.add_argument("--baseline-runs", nargs="+", help="Names (or glob patterns) of the runs to compare to")
+    arg_parser.add_argument("--candidate-runs", nargs="+", help="Names (or glob patterns) of the runs to check for "
+                                                                "regressions")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Seed for bootstrap resampling")
+    args = arg_parser.parse_args()
+
+    if args.import_dir:
+        store = ResultsStore(args.db, flush_threshold=10000)
+        for dir_path, _, file_names in os.walk(args.import_dir):
+            for file_name in sorted(file_names):
+                if file_name.count("--") == 2 and file_name.endswith(".tsv"):
+                    num_imported = import_tsv(store, os.path.join(dir_path, file_name))
+                    if num_imported is None:
+                        print(f"Skipped {file_name} (already imported)")
+                    else:
+                        print(f"Imported {num_imported} query executions from {file_name}")
+        store.close()
+
+    connection = sqlite3.connect(args.db)
+    groups = connection.execute("SELECT DISTINCT endpoints.querier, is_set_modes.name FROM query_executions "
+                                "JOIN endpoints USING (endpoint_id) JOIN is_set_modes USING (is_set_mode_id) "
+                                "ORDER BY 2, 1").fetchall()
+    for querier, is_set_mode in groups:
+        results_df = collate(connection, querier, is_set_mode)
+        print(f"\n{querier}, {is_set_mode}:\n{results_df}")
+        results_df.to_csv(f"results_{querier}_{is_set_mode}.tsv", sep="\t")
+    if args.report_dir:
+        write_report(connection, args.report_dir, args.metric, args.cold_runs, args.baseline_runs,
+                     args.candidate_runs, args.seed)
+    connection.close()
 
 
 if __name__ == "__main__":
@@ -1,92 +1,215 @@
 """
+Compares the responses different KG2 stacks (Plater, Plover, ARAX KG2) returned for the same queries, as saved by
+test.py (with --saveresponse) in test/responses/<querier>_<query id>. Each response is indexed once (node -> qnode
+bindings, edge -> results that use it), so comparisons work for any query graph shape without rescanning results.
+
+Given a query name, prints a detailed comparison of the Plater and Plover responses for that query (as before). With
+--all, compares every pair of saved responses to the same query in the responses directory (in parallel) and writes a
+summary table of node, edge, and result overlap per query and pair of queriers.
+
 Usage: python compare_responses.py <query_name, as specified in pytest suite; e.g., 'test_1'>
+       python compare_responses.py --all [--responses-dir dir] [--output compare_summary.tsv] [--processes N]
 """
 import argparse
+import csv
+import glob
+import itertools
 import json
 import os
-
-
-def main():
-    arg_parser = argparse.ArgumentParser()
-    arg_parser.add_argument("query_name", help="Name/id of the query as specified in the pytest suite; e.g., 'test_1'")
-    args = arg_parser.parse_args()
-
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+QUERIERS = ["plater", "plover", "araxkg2"]
+SUMMARY_COLUMNS = ["query_id", "querier_a", "querier_b",
+                   "nodes_a", "nodes_b", "nodes_shared", "nodes_jaccard",
+                   "edges_a", "edges_b", "edges_shared", "edges_jaccard",
+                   "results_a", "results_b", "results_shared", "results_jaccard"]
+
+
+class ResponseIndex:
+    """
+    Indexes a TRAPI response for comparison with other KPs' responses. Edges are identified by their
+    subject/predicate/object (edge keys aren't comparable across KPs) and results by the nodes bound to each qnode.
+    """
+
+    def __init__(self, response: dict):
+        message = response["message"]
+        self.query_graph = message.get("query_graph") or {"nodes": dict(), "edges": dict()}
+        knowledge_graph = message.get("knowledge_graph") or {"nodes": dict(), "edges": dict()}
+        self.nodes = knowledge_graph["nodes"]
+        self.edges = knowledge_graph["edges"]
+        self.results = message.get("results") or []
+        self.edge_signatures = {edge_key: (edge["subject"], edge["predicate"], edge["object"])
+                                for edge_key, edge in self.edges.items()}
+        self.edges_by_node = defaultdict(list)
+        for edge_key, edge in self.edges.items():
+            self.edges_by_node[edge["subject"]].append(edge_key)
+            if edge["object"] != edge["subject"]:
+                self.edges_by_node[edge["object"]].append(edge_key)
+
+        self.node_ids_by_qnode = defaultdict(set)
+        self.results_by_edge = defaultdict(list)
+        self.result_signatures = []
+        for result_index, result in enumerate(self.results):
+            for qnode_key, node_bindings in result["node_bindings"].items():
+                self.node_ids_by_qnode[qnode_key].update(node_binding["id"] for node_binding in node_bindings)
+            for analysis in result.get("analyses", []):
+                for edge_bindings in analysis.get("edge_bindings", dict()).values():
+                    for edge_binding in edge_bindings:
+                        self.results_by_edge[edge_binding["id"]].append(result_index)
+            self.result_signatures.append(
+                tuple(sorted((qnode_key, tuple(sorted(node_binding["id"] for node_binding in node_bindings)))
+                             for qnode_key, node_bindings in result["node_bindings"].items())))
+
+    @property
+    def node_id_set(self) -> Set[str]:
+        return set(self.nodes)
+
+    @property
+    def edge_signature_set(self) -> Set[Tuple[str, str, str]]:
+        return set(self.edge_signatures.values())
+
+    @property
+    def result_signature_set(self) -> Set[tuple]:
+        return set(self.result_signatures)
+
+    def get_results_using_edge(self, edge_key: str) -> List[dict]:
+        return [self.results[result_index] for result_index in sorted(set(self.results_by_edge.get(edge_key, [])))]
+
+
+def load_response_index(response_path: str) -> ResponseIndex:
+    with open(response_path, "r") as response_file:
+        return ResponseIndex(json.load(response_file))
+
+
+def get_overlap(set_a: set, set_b: set) -> Tuple[int, int, int, Optional[float]]:
+    num_shared = len(set_a & set_b)
+    num_either = len(set_a | set_b)
+    return len(set_a), len(set_b), num_shared, round(num_shared / num_either, 4) if num_either else None
+
+
+def find_response_paths(responses_dir: str) -> Dict[str, Dict[str, str]]:
+    # Returns a map of query id to querier to the path of the querier's saved response to that query
+    response_paths = defaultdict(dict)
+    for response_path in sorted(glob.glob(f"{responses_dir}/*_*")):
+        querier, query_id = os.path.basename(response_path).split("_", 1)
+        if querier in QUERIERS:
+            response_paths[query_id][querier] = response_path
+    return response_paths
+
+
+def compare_query(query_id: str, response_paths: Dict[str, str]) -> List[dict]:
+    """
+    Returns a summary row for each pair of queriers with a saved response to the query.
+    """
+    indexes = {querier: load_response_index(response_path) for querier, response_path in response_paths.items()}
+    rows = []
+    for querier_a, querier_b in itertools.combinations([querier for querier in QUERIERS if querier in indexes], 2):
+        index_a, index_b = indexes[querier_a], indexes[querier_b]
+        row = {"query_id": query_id, "querier_a": querier_a, "querier_b": querier_b}
+        for kind, set_a, set_b in [("nodes", index_a.node_id_set, index_b.node_id_set),
+                                   ("edges", index_a.edge_signature_set, index_b.edge_signature_set),
+                                   ("results", index_a.result_signature_set, index_b.result_signature_set)]:
+            row[f"{kind}_a"], row[f"{kind}_b"], row[f"{kind}_shared"], row[f"{kind}_jaccard"] = \
+                get_overlap(set_a, set_b)
+        rows.append(row)
+    return rows
+
+
+def compare_all(responses_dir: str, output_path: str, num_processes: Optional[int]):
+    response_paths = {query_id: paths for query_id, paths in find_response_paths(responses_dir).items()
+                      if len(paths) > 1}
+    print(f"Comparing responses to {len(response_paths)} queries with responses from more than one querier..")
+    with ProcessPoolExecutor(max_workers=num_processes) as executor:
+        rows = [row for query_rows in executor.map(compare_query, response_paths, response_paths.values())
+                for row in query_rows]
+    with open(output_path, "w") as output_file:
+        writer = csv.DictWriter(output_file, fieldnames=SUMMARY_COLUMNS, delimiter="\t")
+        writer.writeheader()
+        writer.writerows(rows)
+    for (querier_a, querier_b), pair_rows in itertools.groupby(sorted(rows, key=lambda row: (row["querier_a"],
+                                                                                            row["querier_b"])),
+                                                               key=lambda row: (row["querier_a"], row["querier_b"])):
+        pair_rows = list(pair_rows)
+        num_identical = sum(1 for row in pair_rows if row["results_shared"] == row["results_a"] == row["results_b"])
+        print(f"{querier_a} vs. {querier_b}: {len(pair_rows)} queries, {num_identical} with identical results")
+    print(f"Saved summary of {len(rows)} comparisons to {output_path}")
+
+
+def print_nodes(node_ids: Set[str], nodes: dict):
+    for node_id in node_ids:
+        print(f"{node_id} {nodes[node_id].get('categories')} {nodes[node_id].get('name')}")
+
+
+def compare_one(responses_dir: str, query_name: str):
     # Load the Plover and Plater responses for the specified query
-    responses_dir = f"{os.path.dirname(os.path.abspath(__file__))}/responses"
-    with open(f"{responses_dir}/plover_{args.query_name}.json") as plover_file:
-        plover_response = json.load(plover_file)
-    with open(f"{responses_dir}/plater_{args.query_name}.json") as plater_file:
-        plater_response = json.load(plater_file)
-
-
-    plover_kg = plover_response["message"]["knowledge_graph"]
-    plater_kg = plater_response["message"]["knowledge_graph"]
-    plover_nodes = plover_kg["nodes"]
-    plater_nodes = plater_kg["nodes"]
-    plover_node_ids = set(plover_nodes)
-    plater_node_ids = set(plater_nodes)
+    response_paths = find_response_paths(responses_dir)
+    query_id = query_name if query_name in response_paths else f"{query_name}.json"
+    plover = load_response_index(response_paths[query_id]["plover"])
+    plater = load_response_index(response_paths[query_id]["plater"])
 
     # Analyze the overlap or lack thereof of the nodes they returned
-
-    plater_only_nodes = plater_node_ids.difference(plover_node_ids)
+    plater_only_nodes = plater.node_id_set - plover.node_id_set
     print(f"\n\nPlater returned {len(plater_only_nodes)} nodes that Plover did not:\n")
-    for node_id in plater_only_nodes:
-        print(f"{node_id} {plater_nodes[node_id]['categories']} {plater_nodes[node_id].get('name')} ")
-
-    plover_only_nodes = plover_node_ids.difference(plater_node_ids)
+    print_nodes(plater_only_nodes, plater.nodes)
+    plover_only_nodes = plover.node_id_set - plater.node_id_set
     print(f"\n\nPlover returned {len(plover_only_nodes)} nodes that Plater did not:\n")
-    for node_id in plover_only_nodes:
-        print(f"{node_id} {plover_nodes[node_id]['categories']} {plover_nodes[node_id].get('name')}")
-
-    nodes_shared = plover_node_ids.intersection(plater_node_ids)
+    print_nodes(plover_only_nodes, plover.nodes)
+    nodes_shared = plover.node_id_set & plater.node_id_set
     print(f"\n\nThey returned {len(nodes_shared)} nodes in common:\n")
-    for node_id in nodes_shared:
-        print(f"{node_id} {plover_nodes[node_id]['categories']} {plover_nodes[node_id].get('name')}")
-
-    # Look at some plater-only nodes to see what edges they came from
-    plater_only_node_id = plater_node_ids.pop()
-    print(f"\n\nLooking at randomly selected Plater-only node {plater_only_node_id} "
-          f"({plater_nodes[plater_only_node_id].get('name')}):\n")
-    for edge_key, edge in plater_kg["edges"].items():
-        if edge["subject"] == plater_only_node_id or edge["object"] == plater_only_node_id:
+    print_nodes(nodes_shared, plover.nodes)
+
+    # Look at a Plater-only node to see what edges (and results) it came from
+    if plater_only_nodes:
+        plater_only_node_id = next(iter(plater_only_nodes))
+        print(f"\n\nLooking at randomly selected Plater-only node {plater_only_node_id} "
+              f"({plater.nodes[plater_only_node_id].get('name')}):\n")
+        for edge_key in plater.edges_by_node[plater_only_node_id]:
+            edge = plater.edges[edge_key]
             print(f"\n\n{edge['subject']}--{edge['predicate']}--{edge['object']}\n")
-            plater_subject_node = plater_nodes[edge["subject"]]
-            plater_object_node = plater_nodes[edge["object"]]
-            print(f"Subject is {plater_subject_node.get('name')}, {plater_subject_node['categories']}\n")
-            print(f"Object is {plater_object_node.get('name')}, {plater_object_node['categories']}\n")
+            for role in ["subject", "object"]:
+                plater_node = plater.nodes[edge[role]]
+                print(f"{role.capitalize()} is {plater_node.get('name')}, {plater_node.get('categories')}\n")
             print(f"Full edge is {edge}")
-
-            # Find results that use this edge
-            for result in plater_response["message"]["results"]:
-                result_edge_ids = {edge_binding["id"] for analysis in result["analyses"]
-                                   for edge_binding in analysis["edge_bindings"]["e00"]}
-                if edge_key in result_edge_ids:
-                    print(f"\nFound result that includes this edge:")
-                    print(result)
-
-    # Compare what descendants of the input curie(s) the tools used
-    input_curies = set(plater_response['message']['query_graph']['nodes']['n00']['ids'])
-    print(f"\n\nInput curies in the QG (for n00) were: {input_curies}")
-
-    plater_n00_node_ids = {node_binding["id"]
-                           for result in plater_response["message"]["results"]
-                           for node_binding in result["node_bindings"]["n00"]}
-    print(f"\n\nPlater returned {len(plater_n00_node_ids)} nodes to fulfill n00:")
-    for n00_node_id in plater_n00_node_ids:
-        plater_node = plater_nodes[n00_node_id]
-        print(f"{n00_node_id} {plater_node.get('name')}")
-
-    plover_n00_node_ids = {node_binding["id"]
-                           for result in plover_response["message"]["results"]
-                           for node_binding in result["node_bindings"]["n00"]}
-    print(f"\n\nPlover returned {len(plover_n00_node_ids)} nodes to fulfill n00:")
-    for n00_node_id in plover_n00_node_ids:
-        plover_node = plover_nodes[n00_node_id]
-        print(f"{n00_node_id} {plover_node.get('name')}")
+            for result in plater.get_results_using_edge(edge_key):
+                print(f"\nFound result that includes this edge:")
+                print(result)
+
+    # Compare what descendants of the input curie(s) the tools used, for each pinned qnode
+    for qnode_key, qnode in plater.query_graph["nodes"].items():
+        if not qnode.get("ids"):
+            continue
+        print(f"\n\nInput curies in the QG (for {qnode_key}) were: {set(qnode['ids'])}")
+        for querier, index in [("Plater", plater), ("Plover", plover)]:
+            bound_node_ids = index.node_ids_by_qnode[qnode_key]
+            print(f"\n\n{querier} returned {len(bound_node_ids)} nodes to fulfill {qnode_key}:")
+            for node_id in bound_node_ids:
+                print(f"{node_id} {index.nodes[node_id].get('name')}")
+
+    for row in compare_query(query_id, {"plater": response_paths[query_id]["plater"],
+                                        "plover": response_paths[query_id]["plover"]}):
+        print(f"\n\nOverlap: {row}")
 
 
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("query_name", nargs="?",
+                            help="Name/id of the query as specified in the pytest suite; e.g., 'test_1'")
+    arg_parser.add_argument("--all", action="store_true", help="Compare the responses to every query")
+    arg_parser.add_argument("--responses-dir", default=f"{SCRIPT_DIR}/responses")
+    arg_parser.add_argument("--output", default="compare_summary.tsv", help="Path to write the --all summary to")
+    arg_parser.add_argument("--processes", type=int, help="Number of processes to use for --all (default: # CPUs)")
+    args = arg_parser.parse_args()
 
+    if args.all:
+        compare_all(args.responses_dir, args.output, args.processes)
+    elif args.query_name:
+        compare_one(args.responses_dir, args.query_name)
+    else:
+        arg_parser.error("Specify a query name or --all")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,5 +1,9 @@
+from datetime import datetime
+
 import pytest
 
+from results_store import ResultsStore, DEFAULT_DB_PATH
+
 
 def pytest_addoption(parser):
     parser.addoption("--endpoint", action="store", default="")
@@ -9,6 +13,11 @@ def pytest_addoption(parser):
     parser.addoption("--issetunpinned", action="store_true", default=False)
     parser.addoption("--saveresponse", action="store_true", default=False)
     parser.addoption("--batchsize", action="store", default="1000")
+    parser.addoption("--batchsizes", action="store", default="100,250,500,1000,2500")  # test_batching_adaptive
+    parser.addoption("--parallelisms", action="store", default="1,2,4,8")  # test_batching_adaptive
+    parser.addoption("--concurrency", action="store", default="1")  # Number of queries test_specified sends at once
+    parser.addoption("--resultsdb", action="store", default=DEFAULT_DB_PATH)
+    parser.addoption("--runname", action="store", default="")  # Groups executions (e.g., from several pytest calls)
 
 
 def pytest_configure(config):
@@ -19,3 +28,12 @@ def pytest_configure(config):
     pytest.issetunpinned = config.getoption("--issetunpinned")
     pytest.saveresponse = config.getoption("--saveresponse")
     pytest.batchsize = config.getoption("--batchsize")
+    pytest.batchsizes = [int(batch_size) for batch_size in config.getoption("--batchsizes").split(",")]
+    pytest.parallelisms = [int(parallelism) for parallelism in config.getoption("--parallelisms").split(",")]
+    pytest.concurrency = int(config.getoption("--concurrency"))
+    pytest.runname = config.getoption("--runname") or f"run-{datetime.now().strftime('%Y-%m-%d-%H%M%S')}"
+    pytest.results_store = ResultsStore(config.getoption("--resultsdb"))
+
+
+def pytest_unconfigure(config):
+    pytest.results_store.close()  # Writes any buffered query executions
@@ -0,0 +1,157 @@
+"""
+Attributes resource usage to queries by lining up the query executions in the results database (each has a start and
+end time; see test.py) with resource timelines recorded by monitor_mem.py. For each execution and monitored target
+(e.g., Neo4j's container, the Plover process), it reports the peak memory during the query, the change in memory
+from just before the query to its peak and to its end, and the CPU-seconds and bytes read/written during the query.
+When several queries were in flight at once, each sampled interval's CPU-seconds and I/O are split among them in
+proportion to how much of the interval each covered (max_queries_sharing_sample says how many executions overlapped
+its busiest interval). Queries are then ranked by resource cost per backend.
+
+Usage: python correlate_resources.py <monitor_mem.py TSV path(s)> [--db path] [--run-name name ...] \
+                                    [--rank-by cpu_seconds] [--top 10] [--output query_resources.tsv]
+"""
+import argparse
+import sqlite3
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from results_store import DEFAULT_DB_PATH
+
+EXECUTIONS_QUERY = """
+SELECT query_executions.query_id, query_executions.start_time, query_executions.end_time,
+       query_executions.response_status, endpoints.querier, runs.run_name
+FROM query_executions
+JOIN endpoints USING (endpoint_id)
+JOIN runs USING (run_id)
+WHERE query_executions.start_time IS NOT NULL AND query_executions.end_time IS NOT NULL
+"""
+RANK_COLUMNS = ["cpu_seconds", "peak_memory_bytes", "memory_delta_bytes", "read_bytes", "write_bytes"]
+
+
+def load_executions(connection: sqlite3.Connection, run_names: Optional[List[str]]) -> pd.DataFrame:
+    executions_df = pd.read_sql_query(EXECUTIONS_QUERY, connection)
+    if run_names:
+        executions_df = executions_df[executions_df["run_name"].isin(run_names)]
+    return executions_df.sort_values("start_time").reset_index(drop=True)
+
+
+def load_timeline(timeline_paths: List[str]) -> pd.DataFrame:
+    """
+    Loads monitor_mem.py TSVs into one timeline with a memory_bytes column per sample (cgroup memory if sampled,
+    else RSS; or system-wide memory use, for TSVs recorded without targets) and epoch-second times.
+    """
+    timeline_dfs = []
+    for timeline_path in timeline_paths:
+        timeline_df = pd.read_csv(timeline_path, sep="\t")
+        if "target" not in timeline_df:  # System-wide memory
+            timeline_df["target"] = "system"
+            timeline_df["memory_bytes"] = timeline_df["memory_used_gb"] * 10 ** 9
+        else:
+            timeline_df["memory_bytes"] = timeline_df["cgroup_memory_bytes"].fillna(timeline_df["rss_bytes"])
+        timeline_dfs.append(timeline_df)
+    timeline_df = pd.concat(timeline_dfs, ignore_index=True)
+    # Older monitor_mem.py TSVs only have UTC timestamps (without fractional seconds when those were 0)
+    utc_seconds = (pd.to_datetime(timeline_df["timestamp"], format="ISO8601") - pd.Timestamp(0)).dt.total_seconds()
+    timeline_df["time"] = timeline_df["epoch_seconds"].fillna(utc_seconds) if "epoch_seconds" in timeline_df \
+        else utc_seconds
+    for column in ["cpu_percent", "read_bytes", "write_bytes"]:
+        if column not in timeline_df:
+            timeline_df[column] = np.nan
+    return timeline_df.sort_values(["target", "time"]).reset_index(drop=True)
+
+
+def attribute_resources(executions_df: pd.DataFrame, target_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the resource usage attributable to each execution, from one target's timeline. Each sample's CPU% and
+    I/O bytes describe the interval since the previous sample.
+    """
+    times = target_df["time"].to_numpy()
+    memory = target_df["memory_bytes"].to_numpy(dtype=float)
+    interval_starts = np.concatenate([[times[0]], times[:-1]]) if len(times) else times
+    interval_lengths = times - interval_starts
+    interval_amounts = {"cpu_seconds": target_df["cpu_percent"].to_numpy(dtype=float) / 100 * interval_lengths,
+                        "read_bytes": target_df["read_bytes"].to_numpy(dtype=float),
+                        "write_bytes": target_df["write_bytes"].to_numpy(dtype=float)}
+    starts = executions_df["start_time"].to_numpy()
+    ends = executions_df["end_time"].to_numpy()
+
+    # How much of each sampled interval each execution covered (only intervals overlapping an execution matter)
+    first_intervals = np.searchsorted(times, starts, side="right")  # First interval ending after the start
+    last_intervals = np.minimum(np.searchsorted(times, ends, side="left"), len(times) - 1)
+    overlaps = []
+    total_overlaps = np.zeros(len(times))
+    for execution_index in range(len(executions_df)):
+        interval_indexes = np.arange(first_intervals[execution_index], last_intervals[execution_index] + 1)
+        overlap = np.clip(np.minimum(times[interval_indexes], ends[execution_index]) -
+                          np.maximum(interval_starts[interval_indexes], starts[execution_index]), 0, None)
+        overlaps.append((interval_indexes, overlap))
+        np.add.at(total_overlaps, interval_indexes, overlap)
+    # Executions share an interval's usage in proportion to their overlaps (all of it, if they covered it fully)
+    shares_denominators = np.maximum(total_overlaps, interval_lengths)
+    num_sharing_queries = np.zeros(len(times))
+    for interval_indexes, overlap in overlaps:
+        np.add.at(num_sharing_queries, interval_indexes[overlap > 0], 1)
+
+    rows = []
+    for execution_index, (interval_indexes, overlap) in enumerate(overlaps):
+        row = {"num_samples": int(np.count_nonzero(overlap))}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shares = np.where(shares_denominators[interval_indexes] > 0,
+                              overlap / shares_denominators[interval_indexes], 0)
+        for amount_name, amounts in interval_amounts.items():
+            row[amount_name] = float(np.nansum(amounts[interval_indexes] * shares)) if row["num_samples"] else np.nan
+        baseline_index = first_intervals[execution_index] - 1  # The last sample at or before the start
+        in_query = interval_indexes[overlap > 0]
+        if baseline_index >= 0 and len(in_query):
+            baseline = memory[baseline_index]
+            row["peak_memory_bytes"] = np.nanmax(memory[in_query])
+            row["memory_delta_bytes"] = row["peak_memory_bytes"] - baseline
+            row["memory_end_delta_bytes"] = memory[in_query[-1]] - baseline
+        else:
+            row["peak_memory_bytes"] = row["memory_delta_bytes"] = row["memory_end_delta_bytes"] = np.nan
+        row["max_queries_sharing_sample"] = int(num_sharing_queries[in_query].max()) if len(in_query) else 0
+        rows.append(row)
+    return pd.DataFrame(rows, index=executions_df.index)
+
+
+def correlate(executions_df: pd.DataFrame, timeline_df: pd.DataFrame) -> pd.DataFrame:
+    resources_dfs = []
+    for target, target_df in timeline_df.groupby("target"):
+        resources_df = attribute_resources(executions_df, target_df.reset_index(drop=True))
+        resources_df.insert(0, "target", target)
+        resources_dfs.append(executions_df.join(resources_df))
+    return pd.concat(resources_dfs, ignore_index=True)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("timeline_paths", nargs="+", help="TSV(s) written by monitor_mem.py")
+    arg_parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the results database")
+    arg_parser.add_argument("--run-name", nargs="+", help="Only consider query executions from these run(s)")
+    arg_parser.add_argument("--rank-by", default="cpu_seconds", choices=RANK_COLUMNS)
+    arg_parser.add_argument("--top", type=int, default=10, help="Number of queries to list per backend and target")
+    arg_parser.add_argument("--output", default="query_resources.tsv")
+    args = arg_parser.parse_args()
+
+    connection = sqlite3.connect(args.db)
+    executions_df = load_executions(connection, args.run_name)
+    connection.close()
+    timeline_df = load_timeline(args.timeline_paths)
+    print(f"Correlating {len(executions_df)} query executions with {len(timeline_df)} resource samples "
+          f"({timeline_df['target'].nunique()} targets)")
+    resources_df = correlate(executions_df, timeline_df)
+    resources_df = resources_df[resources_df["num_samples"] > 0]
+    resources_df = resources_df.sort_values(["querier", "target", args.rank_by], ascending=[True, True, False])
+    resources_df.to_csv(args.output, sep="\t", index=False)
+
+    display_columns = ["query_id", "run_name", "num_samples", "max_queries_sharing_sample"] + RANK_COLUMNS
+    for (querier, target), group_df in resources_df.groupby(["querier", "target"]):
+        print(f"\nTop queries by {args.rank_by} on {querier} ({target}):")
+        print(group_df[display_columns].head(args.top).to_string(index=False))
+    print(f"\nSaved resource usage of {len(resources_df)} query executions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
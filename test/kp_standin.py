@@ -0,0 +1,355 @@
+"""
+Local stand-in for the KG2 KPs (Plater, Plover, and ARAX's KG2 API), for developing/tuning the test harness (test.py,
+locustfile.py, compare_responses.py) without network access. It answers TRAPI /query requests by replaying the
+responses test.py saved (pytest ... --saveresponse) in test/responses/, after a delay sampled from the duration_server
+values recorded in test/final_results for that query (or, for queries without recorded durations, from a log-normal
+distribution fit to all of that querier's durations). Concurrency limits and error injection are configurable.
+
+The querier a request is for is determined like test.py does it: paths ending in /1.4/query are Plater's, paths
+containing rtxkg2 are ARAX KG2's, and anything else is Plover's. So, e.g., with the default ports, use
+--endpoint http://localhost:8080/1.4 (Plater) or --endpoint http://localhost:9990 (Plover) with test.py.
+
+Requests are matched to saved responses by their query graph: the query files in the test/sample_* directories are
+loaded the way test.py loads them (in each is_set mode), and the query graphs of saved responses that don't belong to
+any query file (e.g., test_batching's) are read from the responses themselves.
+
+Usage: python kp_standin.py [--port 8080 9990] [--responses-dir dir] [--results-dir dir] [--latency-scale 1.0] \
+                            [--max-concurrency N [--max-queued N]] [--error-rate 0.0 [--error-status 500]] \
+                            [--drop-rate 0.0] [--seed 0]
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(f"{SCRIPT_DIR}/..")
+from filter_kg2c_lite_json import StreamingJsonReader
+IS_SET_MODES = ["asis", "issetfalse", "issettrue", "issetunpinned"]
+QUERIERS = ["plater", "plover", "araxkg2"]
+RESPONSE_CHUNK_SIZE = 1024 * 1024
+DEFAULT_LATENCY = 1.0  # Seconds; used for queriers that have no recorded durations at all
+
+
+# ----------------------------------- Matching requests to responses ----------------------------------------- #
+
+
+def get_query_graph_key(trapi_qg: dict) -> str:
+    """
+    Returns a key identifying the query graph, ignoring properties (and orderings) that don't affect the answer, so
+    that the query graphs KPs echo back in their responses match the ones that were sent.
+    """
+    def sorted_list(value: Optional[any]) -> list:
+        return sorted(value if isinstance(value, list) else [value]) if value else []
+
+    nodes = {qnode_key: {"ids": sorted_list(qnode.get("ids")), "categories": sorted_list(qnode.get("categories")),
+                         "is_set": bool(qnode.get("is_set"))}
+             for qnode_key, qnode in trapi_qg.get("nodes", dict()).items()}
+    edges = {qedge_key: {"subject": qedge.get("subject"), "object": qedge.get("object"),
+                         "predicates": sorted_list(qedge.get("predicates")),
+                         "qualifier_constraints": qedge.get("qualifier_constraints") or []}
+             for qedge_key, qedge in trapi_qg.get("edges", dict()).items()}
+    return hashlib.sha1(json.dumps({"nodes": nodes, "edges": edges}, sort_keys=True).encode()).hexdigest()
+
+
+def load_query_graph(file_path: str, is_set_mode: str) -> dict:
+    # Mirrors test.py's _load_query_json_file
+    with open(file_path, "r") as query_file:
+        query_obj = json.load(query_file)
+    if "input_query_canonicalized" in query_obj:
+        trapi_qg = query_obj["input_query_canonicalized"]["message"]["query_graph"]
+    elif "nodes" in query_obj:
+        trapi_qg = query_obj
+    else:
+        trapi_qg = query_obj["message"]["query_graph"]
+    for qnode in trapi_qg["nodes"].values():
+        if is_set_mode == "issettrue":
+            qnode["is_set"] = True
+        elif is_set_mode == "issetfalse":
+            qnode["is_set"] = False
+        elif is_set_mode == "issetunpinned" and not qnode.get("ids"):
+            qnode["is_set"] = True
+    return trapi_qg
+
+
+def read_response_query_graph(response_path: str) -> Optional[dict]:
+    # Streams through the saved response until its message's query graph is found
+    with open(response_path, "r", encoding="utf-8") as response_file:
+        reader = StreamingJsonReader(response_file)
+        for key in reader.iterate_object():
+            if key != "message":
+                reader.read_value()
+                continue
+            for message_key in reader.iterate_object():
+                if message_key == "query_graph":
+                    return reader.read_value()
+                reader.read_value()
+    return None
+
+
+def index_responses(responses_dir: str, query_dirs: List[str]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Returns a map of querier to query graph key to the paths of the saved responses to that query graph. Saved
+    responses are named <querier>_<query id>, where query ids are like [<is_set mode>--]<query dir>:<query file>.
+    """
+    response_paths = dict()
+    for response_path in sorted(glob.glob(f"{responses_dir}/*_*")):
+        querier, query_id = os.path.basename(response_path).split("_", 1)
+        if querier in QUERIERS:
+            response_paths[(querier, query_id)] = response_path
+
+    index = defaultdict(lambda: defaultdict(list))
+    indexed_paths = set()
+    for query_dir in query_dirs:
+        for query_path in sorted(glob.glob(f"{query_dir}/*.json")):
+            query_name = ":".join(query_path.strip("/").split("/")[-2:])
+            query_graphs = {is_set_mode: load_query_graph(query_path, is_set_mode) for is_set_mode in IS_SET_MODES}
+            for querier in QUERIERS:
+                for is_set_mode, trapi_qg in query_graphs.items():
+                    query_id = query_name if is_set_mode == "asis" else f"{is_set_mode}--{query_name}"
+                    if (querier, query_id) in response_paths:
+                        index[querier][get_query_graph_key(trapi_qg)].append(response_paths[(querier, query_id)])
+                        indexed_paths.add(response_paths[(querier, query_id)])
+    for (querier, query_id), response_path in response_paths.items():
+        if response_path not in indexed_paths:
+            trapi_qg = read_response_query_graph(response_path)
+            if trapi_qg:
+                index[querier][get_query_graph_key(trapi_qg)].append(response_path)
+    return index
+
+
+# ----------------------------------- Latency model ----------------------------------------- #
+
+
+class LatencyModel:
+    """
+    Samples server-side durations for queries from those recorded in results TSVs (status 200 only). Queries without
+    recorded durations get a duration drawn from a log-normal distribution fit to all of the querier's durations.
+    """
+
+    def __init__(self, results_dir: str, scale: float = 1.0, seed: int = 0):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.durations = defaultdict(list)  # (querier, query id without any is_set prefix) -> durations
+        querier_durations = defaultdict(list)
+        results_paths = [os.path.join(dir_path, file_name) for dir_path, _, file_names in os.walk(results_dir)
+                         for file_name in file_names if re.fullmatch(r"\w+--\w+--\d+\.tsv", file_name)]
+        for results_path in sorted(results_paths):
+            querier = os.path.basename(results_path).split("--")[0]
+            with open(results_path, "r") as results_file:
+                for row in csv.DictReader(results_file, delimiter="\t"):
+                    if row["response_status"] == "200" and row["duration_server"]:
+                        duration = float(row["duration_server"])
+                        self.durations[(querier, self._strip_is_set_mode(row["query_id"]))].append(duration)
+                        querier_durations[querier].append(duration)
+        self.log_normal_params = {querier: (np.mean(np.log(durations)), np.std(np.log(durations)))
+                                  for querier, durations in querier_durations.items()}
+        print(f"Loaded {sum(map(len, self.durations.values()))} recorded durations for {len(self.durations)} "
+              f"querier/query combinations from {results_dir}")
+
+    @staticmethod
+    def _strip_is_set_mode(query_id: str) -> str:
+        prefix, _, rest = query_id.partition("--")
+        return rest if prefix in IS_SET_MODES else query_id
+
+    def sample(self, querier: str, query_id: Optional[str]) -> float:
+        with self.lock:
+            recorded_durations = self.durations.get((querier, self._strip_is_set_mode(query_id or "")))
+            if recorded_durations:
+                duration = self.rng.choice(recorded_durations)
+            elif querier in self.log_normal_params:
+                duration = self.rng.lognormvariate(*self.log_normal_params[querier])
+            else:
+                duration = DEFAULT_LATENCY
+        return duration * self.scale
+
+
+# ----------------------------------- Server ----------------------------------------- #
+
+
+class ConcurrencyLimiter:
+    """
+    Lets up to max_concurrency requests be processed at once (0 means no limit); others wait their turn, unless
+    max_queued requests are already waiting, in which case they're rejected.
+    """
+
+    def __init__(self, max_concurrency: int, max_queued: Optional[int]):
+        self.semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self.max_queued = max_queued
+        self.num_queued = 0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        if not self.semaphore:
+            return True
+        if self.semaphore.acquire(blocking=False):
+            return True
+        with self.lock:
+            if self.max_queued is not None and self.num_queued >= self.max_queued:
+                return False
+            self.num_queued += 1
+        self.semaphore.acquire()
+        with self.lock:
+            self.num_queued -= 1
+        return True
+
+    def release(self):
+        if self.semaphore:
+            self.semaphore.release()
+
+
+def get_querier(path: str) -> str:
+    # Same as test.py's _get_querier, but for request paths (rather than endpoints)
+    if path.rstrip("/").endswith("/1.4/query"):
+        return "plater"
+    elif "rtxkg2" in path:
+        return "araxkg2"
+    else:
+        return "plover"
+
+
+class StandinRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real KPs
+    server_version = "KPStandin"
+    # Set by main()
+    index = dict()
+    latency_model = None
+    limiters = dict()
+    error_rate = 0.0
+    error_status = 500
+    drop_rate = 0.0
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+
+    def _send_json(self, status: int, body: dict):
+        encoded_body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded_body)))
+        self.end_headers()
+        self.wfile.write(encoded_body)
+
+    def _send_file(self, file_path: str):
+        # Streams the saved response (gzipped on the fly if the client accepts it) using chunked transfer encoding
+        compressor = zlib.compressobj(wbits=31) if "gzip" in self.headers.get("Accept-Encoding", "") else None
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        if compressor:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        with open(file_path, "rb") as response_file:
+            while True:
+                chunk = response_file.read(RESPONSE_CHUNK_SIZE)
+                data = (compressor.compress(chunk) if chunk else compressor.flush()) if compressor else chunk
+                if data:
+                    self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                if not chunk:
+                    break
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        self._send_json(200, {"status": "ok", "queriers": {querier: sum(map(len, query_graphs.values()))
+                                                           for querier, query_graphs in self.index.items()}})
+
+    def do_POST(self):
+        request_body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.rstrip("/").endswith("/query"):
+            self._send_json(404, {"detail": "Not Found"})
+            return
+        querier = get_querier(self.path)
+        try:
+            trapi_query = json.loads(request_body)
+            trapi_qg = trapi_query["message"]["query_graph"]
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"detail": "Request body must be a TRAPI query"})
+            return
+        response_paths = self.index.get(querier, dict()).get(get_query_graph_key(trapi_qg))
+        with self.rng_lock:
+            response_path = self.rng.choice(response_paths) if response_paths else None
+            error_draw, drop_draw = self.rng.random(), self.rng.random()
+        query_id = os.path.basename(response_path).split("_", 1)[1] if response_path else None
+
+        limiter = self.limiters[querier]
+        if not limiter.acquire():
+            self._send_json(503, {"detail": f"Too many queued requests for {querier}"})
+            return
+        try:
+            time.sleep(self.latency_model.sample(querier, query_id))
+            if drop_draw < self.drop_rate:
+                self.close_connection = True  # The client sees the connection close without a response
+                return
+            if error_draw < self.error_rate:
+                self._send_json(self.error_status, {"detail": "Injected error"})
+            elif not response_path:
+                self._send_json(404, {"detail": f"No saved {querier} response matches this query graph"})
+            else:
+                self._send_file(response_path)
+        finally:
+            limiter.release()
+
+    def log_message(self, format: str, *args):
+        print(f"{self.address_string()} {format % args}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--port", type=int, nargs="+", default=[8080, 9990], help="Port(s) to listen on")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--responses-dir", default=f"{SCRIPT_DIR}/responses",
+                            help="Directory of responses saved by test.py (with --saveresponse)")
+    arg_parser.add_argument("--query-dirs", nargs="+", default=sorted(glob.glob(f"{SCRIPT_DIR}/sample_*")),
+                            help="Directories of the query files the saved responses are for")
+    arg_parser.add_argument("--results-dir", default=f"{SCRIPT_DIR}/final_results",
+                            help="Directory of results TSVs to take recorded query durations from")
+    arg_parser.add_argument("--latency-scale", type=float, default=1.0,
+                            help="Multiplier for the sampled latencies (0 means respond right away)")
+    arg_parser.add_argument("--max-concurrency", type=int, default=0,
+                            help="Max number of requests processed at once per querier (0 means no limit)")
+    arg_parser.add_argument("--max-queued", type=int,
+                            help="Max number of requests waiting per querier, beyond which they get a 503")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    arg_parser.add_argument("--error-status", type=int, default=500, help="Status code of injected errors")
+    arg_parser.add_argument("--drop-rate", type=float, default=0.0,
+                            help="Fraction of requests whose connection is closed without a response")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    StandinRequestHandler.index = index_responses(args.responses_dir, args.query_dirs)
+    for querier, query_graphs in StandinRequestHandler.index.items():
+        print(f"Indexed {sum(map(len, query_graphs.values()))} saved {querier} responses "
+              f"({len(query_graphs)} distinct query graphs)")
+    StandinRequestHandler.latency_model = LatencyModel(args.results_dir, args.latency_scale, args.seed)
+    StandinRequestHandler.limiters = {querier: ConcurrencyLimiter(args.max_concurrency, args.max_queued)
+                                      for querier in QUERIERS}
+    StandinRequestHandler.error_rate = args.error_rate
+    StandinRequestHandler.error_status = args.error_status
+    StandinRequestHandler.drop_rate = args.drop_rate
+    StandinRequestHandler.rng = random.Random(args.seed)
+
+    servers = [ThreadingHTTPServer((args.host, port), StandinRequestHandler) for port in args.port]
+    for server in servers[1:]:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving on {', '.join(f'http://{args.host}:{port}' for port in args.port)}")
+    try:
+        servers[0].serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
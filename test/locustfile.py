@@ -1,9 +1,34 @@
+"""
+Locust load test for the KG2 stacks. The query corpus (ITRB_PROD_MATCHING_OK_QUERY_IDS) is loaded and serialized once
+at startup, and queries are drawn from it according to --query-mix: uniformly, in proportion to their cost (median
+duration_server recorded in final_results for the stack under test), or by weights (e.g., observed production
+frequencies) from a --query-weights TSV with query_id and weight columns.
+
+By default each user waits 5-20 seconds after each response before sending its next query (closed loop). With
+--arrival-mode poisson, each user instead sends queries as a Poisson process with rate --arrival-rate (queries per
+second), without waiting for outstanding responses (open loop), so that a slow server doesn't slow down the arrivals.
+
+Besides the usual POST /query stats, the DB time of each response (Plater's query_duration.neo4j or Plover's
+ploverdb duration) is recorded as a 'DB' request and the rest of the response time as a 'SERVICE' request, so that
+tail latency can be split into time spent in the database and time spent in the service.
+
+Usage: locust -f locustfile.py --host <KG2 stack endpoint, e.g.: http://amyplover.rtx.ai:9990> \
+              [--query-mix uniform|cost|weights [--query-weights path]] [--arrival-mode closed|poisson \
+              [--arrival-rate 0.08] [--max-outstanding 100]]
+"""
+import csv
+import glob
 import json
+import math
 import os
-from collections import namedtuple
 import random
+import re
+import time
+from typing import List, Optional
 
-from locust import HttpUser, task, between
+from gevent.pool import Pool
+from locust import HttpUser, events, task, between
+from requests.adapters import HTTPAdapter
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -39,15 +64,148 @@ ITRB_PROD_MATCHING_OK_QUERY_IDS = ["query_5908480.json", "query_5909705.json", "
                                    "query_6024677.json", "query_6050807.json", "query_6356405.json",
                                    "query_6609700.json"]
 
+NEO4J_DURATION_REGEX = re.compile(rb'"query_duration"\s*:\s*\{[^{}]*"neo4j"\s*:\s*([-+.\deE]+)')
+PLOVERDB_DURATION_REGEX = re.compile(rb"\*\*\*ploverdbduration:\s*([-+.\deE]+)")
+closed_loop_wait_time = between(5, 20)
+query_corpus = []  # (query id, serialized TRAPI query) for each query, loaded once at startup (see on_init)
+query_weights = []
+
+
+@events.init_command_line_parser.add_listener
+def add_arguments(parser):
+    parser.add_argument("--query-mix", choices=["uniform", "cost", "weights"], default="uniform",
+                        help="How to weight queries: equally, by their recorded median server duration, or by the "
+                             "weights in --query-weights")
+    parser.add_argument("--query-weights", default="", help="TSV with query_id and weight columns")
+    parser.add_argument("--arrival-mode", choices=["closed", "poisson"], default="closed",
+                        help="closed: users wait 5-20s after each response; poisson: open-loop Poisson arrivals")
+    parser.add_argument("--arrival-rate", type=float, default=0.08,
+                        help="Queries per second per user, in poisson arrival mode")
+    parser.add_argument("--max-outstanding", type=int, default=100,
+                        help="Max outstanding queries per user in poisson arrival mode; arrivals beyond it are "
+                             "recorded as failures")
+
+
+@events.init.add_listener
+def on_init(environment, **kwargs):
+    options = environment.parsed_options
+    query_corpus.clear()
+    for query_id in ITRB_PROD_MATCHING_OK_QUERY_IDS:
+        trapi_query = load_query_json_file(f"{SCRIPT_DIR}/sample_kg2_queries_ITRBPROD/{query_id}")
+        query_corpus.append((query_id, json.dumps(trapi_query)))
+    query_ids = [query_id for query_id, _ in query_corpus]
+    if options is None or options.query_mix == "uniform":
+        weights = [1.0] * len(query_ids)
+    elif options.query_mix == "cost":
+        weights = load_query_costs(query_ids, get_querier(options.host or ""))
+    else:
+        weights = load_query_weights(query_ids, options.query_weights)
+    # Checked here, since random.choices would otherwise raise inside every user
+    error_message = get_query_weights_error(weights)
+    if error_message:
+        raise SystemExit(f"Invalid query weights for --query-mix {options.query_mix}: {error_message}")
+    query_weights[:] = weights
+    print(f"Loaded {len(query_corpus)} queries (query mix: {options.query_mix if options else 'uniform'})")
+
+
+def get_querier(endpoint: str) -> str:
+    # Same as test.py's _get_querier
+    if "8080/1.4" in endpoint:
+        return "plater"
+    elif "api/rtxkg2" in endpoint:
+        return "araxkg2"
+    else:
+        return "plover"
+
+
+def load_query_costs(query_ids: List[str], querier: str) -> List[float]:
+    """
+    Returns the median duration_server recorded in final_results for each query on the given querier; queries
+    without any recorded durations get the median of the others.
+    """
+    durations = {query_id: [] for query_id in query_ids}
+    for results_path in glob.glob(f"{SCRIPT_DIR}/final_results/*/{querier}--*--*.tsv"):
+        with open(results_path, "r") as results_file:
+            for row in csv.DictReader(results_file, delimiter="\t"):
+                query_id = row["query_id"].split(":")[-1]
+                if query_id in durations and row["response_status"] == "200" and row["duration_server"]:
+                    durations[query_id].append(float(row["duration_server"]))
+    costs = {query_id: sorted(query_durations)[len(query_durations) // 2]
+             for query_id, query_durations in durations.items() if query_durations}
+    default_cost = sorted(costs.values())[len(costs) // 2] if costs else 1.0
+    return [costs.get(query_id, default_cost) for query_id in query_ids]
+
+
+def load_query_weights(query_ids: List[str], weights_path: str) -> List[float]:
+    with open(weights_path, "r") as weights_file:
+        weights = {row["query_id"]: float(row["weight"]) for row in csv.DictReader(weights_file, delimiter="\t")}
+    return [weights.get(query_id, 0.0) for query_id in query_ids]
+
+
+def get_query_weights_error(weights: List[float]) -> Optional[str]:
+    bad_weights = [weight for weight in weights if not math.isfinite(weight) or weight < 0]
+    if bad_weights:
+        return f"weights must be finite and non-negative (got {bad_weights[:5]})"
+    elif not sum(weights):
+        return "every query's weight is 0 (for --query-weights, are the query ids right?)"
+    return None
+
+
+def get_db_duration(response_body: bytes) -> Optional[float]:
+    # Searches the raw body (top-level keys like query_duration/logs usually come after the message), so responses
+    # don't need to be parsed
+    start = max(response_body.rfind(b'"query_duration"'), 0)
+    match = NEO4J_DURATION_REGEX.search(response_body, start)
+    if not match:
+        match = PLOVERDB_DURATION_REGEX.search(response_body, max(response_body.rfind(b"***ploverdbduration"), 0))
+    return float(match.group(1)) if match else None
+
 
 class KG2User(HttpUser):
+
+    def on_start(self):
+        options = self.environment.parsed_options
+        self.open_loop = options is not None and options.arrival_mode == "poisson"
+        if self.open_loop:
+            self.outstanding_queries = Pool(options.max_outstanding)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=options.max_outstanding)
+            self.client.mount("http://", adapter)
+            self.client.mount("https://", adapter)
+
+    def wait_time(self):
+        if self.open_loop:  # Exponential inter-arrival times make for Poisson arrivals
+            return random.expovariate(self.environment.parsed_options.arrival_rate)
+        return closed_loop_wait_time(self)
+
     @task
     def run_random_query(self):
-        random_query_id = random.choice(ITRB_PROD_MATCHING_OK_QUERY_IDS)
-        trapi_query = load_query_json_file(f"{SCRIPT_DIR}/sample_kg2_queries_ITRBPROD/{random_query_id}")
-        self.client.post("/query", data=json.dumps(trapi_query), headers={'content-type': 'application/json'})
+        query_id, query_body = random.choices(query_corpus, weights=query_weights)[0]
+        if not self.open_loop:
+            self.send_query(query_id, query_body)
+        elif self.outstanding_queries.full():
+            # Recorded under its own name, so it doesn't skew /query's response times
+            self.environment.events.request.fire(request_type="POST", name="/query (dropped)", response_time=0,
+                                                 response_length=0, context={"query_id": query_id},
+                                                 exception=Exception("Too many outstanding queries; arrival dropped"))
+        else:
+            self.outstanding_queries.spawn(self.send_query, query_id, query_body)
 
-    wait_time = between(5, 20)
+    def send_query(self, query_id: str, query_body: str):
+        start = time.perf_counter()
+        with self.client.post("/query", data=query_body, name="/query", context={"query_id": query_id},
+                              headers={"content-type": "application/json", "accept-encoding": "gzip, deflate"},
+                              catch_response=True) as response:
+            response_time = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                response.failure(f"Status {response.status_code}")
+                return
+            db_duration = get_db_duration(response.content)
+        if db_duration is not None:
+            db_time = db_duration * 1000
+            for request_type, request_time in [("DB", db_time), ("SERVICE", max(response_time - db_time, 0))]:
+                self.environment.events.request.fire(request_type=request_type, name="/query",
+                                                     response_time=request_time, response_length=0,
+                                                     context={"query_id": query_id}, exception=None)
 
 
 def load_query_json_file(file_path: str) -> dict:
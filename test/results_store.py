@@ -0,0 +1,188 @@
+"""
+SQLite-backed store for query results (one row per query execution), used by test.py in place of per-querier TSVs.
+Executions are linked to the run they were part of (see test.py's --runname), the endpoint they were sent to, and the
+is_set mode the query was run in. Rows are buffered and written in batches. This script can also import existing
+results TSVs (e.g., those in final_results/, named like <querier>--<is_set mode>--<run number>.tsv, or the
+<querier>.tsv files test.py used to write). Imported files are recorded, so re-importing one into the same run is a
+no-op.
+
+Usage: python results_store.py <results TSV path(s) or dir(s) of TSVs> [--db path] [--run-name name]
+"""
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = f"{SCRIPT_DIR}/results.sqlite"
+DEFAULT_FLUSH_THRESHOLD = 100  # Number of executions buffered before they're written to the database
+IS_SET_MODES = ["asis", "issetfalse", "issettrue", "issetunpinned"]
+EXECUTION_COLUMNS = ["query_id", "date_run", "duration_client", "duration_server", "duration_db", "response_status",
+                     "num_results", "num_nodes", "num_edges", "response_size", "concurrency", "num_in_flight",
+                     "time_to_first_byte", "response_bytes_wire", "response_bytes_decompressed", "start_time",
+                     "end_time"]
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (run_id INTEGER PRIMARY KEY, run_name TEXT NOT NULL UNIQUE, created_at TEXT);
+CREATE TABLE IF NOT EXISTS endpoints (endpoint_id INTEGER PRIMARY KEY, querier TEXT NOT NULL, url TEXT NOT NULL,
+                                      UNIQUE (querier, url));
+CREATE TABLE IF NOT EXISTS is_set_modes (is_set_mode_id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS query_executions (
+    execution_id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    endpoint_id INTEGER NOT NULL REFERENCES endpoints (endpoint_id),
+    is_set_mode_id INTEGER NOT NULL REFERENCES is_set_modes (is_set_mode_id),
+    query_id TEXT NOT NULL, date_run TEXT, duration_client REAL, duration_server REAL, duration_db REAL,
+    response_status INTEGER, num_results INTEGER, num_nodes INTEGER, num_edges INTEGER, response_size INTEGER,
+    concurrency INTEGER, num_in_flight INTEGER, time_to_first_byte REAL, response_bytes_wire INTEGER,
+    response_bytes_decompressed INTEGER, start_time REAL, end_time REAL);
+CREATE TABLE IF NOT EXISTS imported_files (run_id INTEGER NOT NULL REFERENCES runs (run_id),
+                                           file_name TEXT NOT NULL, num_executions INTEGER, imported_at TEXT,
+                                           UNIQUE (run_id, file_name));
+CREATE INDEX IF NOT EXISTS query_executions_query_id ON query_executions (query_id);
+CREATE INDEX IF NOT EXISTS query_executions_run ON query_executions (run_id, endpoint_id, is_set_mode_id);
+"""
+
+
+class ResultsStore:
+    """
+    Thread-safe writer of query executions to the results database; call close() (or flush()) to make sure
+    buffered executions are written. The database is only opened (and created, if need be) once something is added.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, flush_threshold: int = DEFAULT_FLUSH_THRESHOLD):
+        self.db_path = db_path
+        self.flush_threshold = flush_threshold
+        self.connection = None
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.ids = dict()  # Caches the ids of runs, endpoints, and is_set modes
+
+    def _connect(self):
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        self.connection.executemany("INSERT OR IGNORE INTO is_set_modes (name) VALUES (?)",
+                                    [(mode,) for mode in IS_SET_MODES])
+        self.connection.commit()
+
+    def _get_id(self, table: str, id_column: str, key_values: dict, other_values: Optional[dict] = None) -> int:
+        cache_key = (table, *key_values.values())
+        if cache_key not in self.ids:
+            values = {**key_values, **(other_values or dict())}
+            self.connection.execute(f"INSERT OR IGNORE INTO {table} ({', '.join(values)}) "
+                                    f"VALUES ({', '.join('?' * len(values))})", list(values.values()))
+            conditions = " AND ".join(f"{column_name} = ?" for column_name in key_values)
+            self.ids[cache_key] = self.connection.execute(f"SELECT {id_column} FROM {table} WHERE {conditions}",
+                                                          list(key_values.values())).fetchone()[0]
+        return self.ids[cache_key]
+
+    def add_execution(self, run_name: str, querier: str, endpoint: str, is_set_mode: Optional[str], row: dict):
+        with self.lock:
+            if not self.connection:
+                self._connect()
+            run_id = self._get_id("runs", "run_id", {"run_name": run_name}, {"created_at": str(datetime.now())})
+            endpoint_id = self._get_id("endpoints", "endpoint_id", {"querier": querier, "url": endpoint})
+            is_set_mode_id = self._get_id("is_set_modes", "is_set_mode_id", {"name": is_set_mode or "asis"})
+            self.buffer.append([run_id, endpoint_id, is_set_mode_id] +
+                               [None if row.get(column) in ("", None) else str(row[column]) if column == "date_run"
+                                else row[column] for column in EXECUTION_COLUMNS])
+            if len(self.buffer) >= self.flush_threshold:
+                self._flush()
+
+    def is_imported(self, run_name: str, file_name: str) -> bool:
+        with self.lock:
+            if not self.connection:
+                self._connect()
+            return self.connection.execute("SELECT 1 FROM imported_files JOIN runs USING (run_id) "
+                                           "WHERE run_name = ? AND file_name = ?",
+                                           (run_name, file_name)).fetchone() is not None
+
+    def record_import(self, run_name: str, file_name: str, num_executions: int):
+        # Flushes first, so a file is only recorded as imported once all of its executions are in the database
+        with self.lock:
+            self._flush()
+            run_id = self._get_id("runs", "run_id", {"run_name": run_name}, {"created_at": str(datetime.now())})
+            self.connection.execute("INSERT OR IGNORE INTO imported_files (run_id, file_name, num_executions, "
+                                    "imported_at) VALUES (?, ?, ?, ?)",
+                                    (run_id, file_name, num_executions, str(datetime.now())))
+            self.connection.commit()
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        self.connection.executemany(f"INSERT INTO query_executions (run_id, endpoint_id, is_set_mode_id, "
+                                    f"{', '.join(EXECUTION_COLUMNS)}) "
+                                    f"VALUES ({', '.join('?' * (len(EXECUTION_COLUMNS) + 3))})", self.buffer)
+        self.connection.commit()
+        self.buffer = []
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def close(self):
+        self.flush()
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+
+def get_is_set_mode(query_id: str) -> str:
+    # test.py prefixes query ids with the is_set mode they were run in (if any), e.g., 'issettrue--<query name>'
+    prefix = query_id.split("--")[0] if "--" in query_id else ""
+    return prefix if prefix in IS_SET_MODES else "asis"
+
+
+def import_tsv(store: ResultsStore, tsv_path: str, run_name: Optional[str] = None) -> Optional[int]:
+    """
+    Imports a results TSV written by test.py (or kg2c_snapshot.py), returning the number of executions imported (or
+    None if the file had already been imported into the run, in which case it's skipped).
+    Files named like <querier>--<is_set mode>--<run number>.tsv are imported into run '<is_set mode>--<run number>';
+    others into a run named after the file (unless run_name is given), with is_set modes taken from query ids.
+    """
+    file_name = os.path.basename(tsv_path)[:-len(".tsv")]
+    name_match = re.fullmatch(r"(\w+)--(\w+)--(\d+)", file_name)
+    querier = name_match.group(1) if name_match else file_name
+    if not run_name:
+        run_name = f"{name_match.group(2)}--{name_match.group(3)}" if name_match else file_name
+    if store.is_imported(run_name, os.path.basename(tsv_path)):
+        return None
+    num_imported = 0
+    with open(tsv_path, "r") as results_file:
+        for row in csv.DictReader(results_file, delimiter="\t"):
+            is_set_mode = name_match.group(2) if name_match else get_is_set_mode(row["query_id"])
+            store.add_execution(run_name, querier, "", is_set_mode, row)
+            num_imported += 1
+    store.record_import(run_name, os.path.basename(tsv_path), num_imported)
+    return num_imported
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("tsv_paths", nargs="+", help="Results TSVs (or directories to search for them)")
+    arg_parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the results database")
+    arg_parser.add_argument("--run-name", help="Run to import the TSVs into (by default, derived from file names)")
+    args = arg_parser.parse_args()
+
+    tsv_paths = []
+    for path in args.tsv_paths:
+        if os.path.isdir(path):
+            tsv_paths += sorted(os.path.join(dir_path, file_name) for dir_path, _, file_names in os.walk(path)
+                                for file_name in file_names if re.fullmatch(r"\w+--\w+--\d+\.tsv", file_name))
+        else:
+            tsv_paths.append(path)
+    store = ResultsStore(args.db, flush_threshold=10000)
+    for tsv_path in tsv_paths:
+        num_imported = import_tsv(store, tsv_path, args.run_name)
+        if num_imported is None:
+            print(f"Skipped {tsv_path} (already imported)")
+        else:
+            print(f"Imported {num_imported} query executions from {tsv_path}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
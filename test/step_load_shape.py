@@ -0,0 +1,185 @@
+"""
+Step-load shape for the locust load test (locustfile.py), for finding the maximum sustainable throughput of a KG2
+stack. Offered load is ramped up in steps of --step-users users; each step is held until its p95 latency stabilizes
+(consecutive --step-check-interval windows within --stability-tolerance of each other, or --step-max-time at most),
+and the test stops by itself at the knee: the first step whose p95 exceeds --slo-p95 or whose error rate exceeds
+--max-error-rate (or at --max-users). Dropped open-loop arrivals (see --max-outstanding) count as errors.
+
+After each step, the throughput-vs-latency curve so far is saved to --load-results-dir as
+throughput-latency-<querier>.tsv (plus a .png plot if matplotlib is installed), along with a JSON summary of the knee.
+
+Best used with open-loop arrivals (--arrival-mode poisson), so that offered load is --arrival-rate per user. To keep
+the client's CPU from being the bottleneck, run it distributed (the shape runs on the master, using the stats the
+workers report):
+    locust -f step_load_shape.py --master --headless --expect-workers 4 --host <endpoint> --arrival-mode poisson ...
+    locust -f step_load_shape.py --worker --master-host <master host>   (on each worker, e.g., one per client CPU)
+
+Usage: locust -f step_load_shape.py --headless --host <KG2 stack endpoint, e.g.: http://amyplover.rtx.ai:9990> \
+              [--arrival-mode poisson --arrival-rate 0.5] [--step-users 2] [--slo-p95 5000] [--max-error-rate 0.01]
+"""
+import csv
+import json
+import os
+from typing import List, Optional, Tuple
+
+from locust import LoadTestShape, events
+from locust.stats import calculate_response_time_percentile
+
+from locustfile import KG2User, get_querier  # KG2User is the user class locust runs with this shape
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STEP_COLUMNS = ["step", "users", "offered_qps", "throughput_qps", "p50_ms", "p95_ms", "p99_ms", "db_p95_ms",
+                "error_rate", "num_requests", "duration_s", "stable", "slo_broken"]
+
+
+@events.init_command_line_parser.add_listener
+def add_arguments(parser):
+    parser.add_argument("--step-users", type=int, default=2, help="Number of users added per step")
+    parser.add_argument("--max-users", type=int, default=200, help="Stop after the step with this many users")
+    parser.add_argument("--step-check-interval", type=float, default=15,
+                        help="Length (seconds) of the windows whose p95s are compared to decide if a step is stable")
+    parser.add_argument("--step-max-time", type=float, default=180,
+                        help="Max seconds to hold a step for if its latency doesn't stabilize")
+    parser.add_argument("--stability-tolerance", type=float, default=0.1,
+                        help="Max relative change in p95 between consecutive windows for a step to count as stable")
+    parser.add_argument("--slo-p95", type=float, default=10000, help="p95 latency SLO (milliseconds)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Max acceptable fraction of failures")
+    parser.add_argument("--load-results-dir", default=f"{SCRIPT_DIR}/load_results",
+                        help="Directory to save the throughput-vs-latency curve to")
+
+
+class _StatsSnapshot:
+    # Cumulative /query stats at a point in time; the difference between two snapshots describes a window
+
+    def __init__(self, runner, time: float):
+        self.time = time
+        query_stats = runner.stats.get("/query", "POST")
+        db_stats = runner.stats.get("/query", "DB")
+        self.num_requests = query_stats.num_requests
+        self.num_failures = query_stats.num_failures
+        self.num_dropped = runner.stats.get("/query (dropped)", "POST").num_requests
+        self.response_times = dict(query_stats.response_times)
+        self.db_response_times = dict(db_stats.response_times)
+
+
+def _get_window_percentile(start_times: dict, end_times: dict, percent: float) -> Optional[int]:
+    window_times = {response_time: count - start_times.get(response_time, 0)
+                    for response_time, count in end_times.items() if count > start_times.get(response_time, 0)}
+    num_requests = sum(window_times.values())
+    return calculate_response_time_percentile(window_times, num_requests, percent) if num_requests else None
+
+
+class StepLoadShape(LoadTestShape):
+
+    def __init__(self):
+        super().__init__()
+        self.steps = []
+        self.users = 0
+        self.step_start = None
+        self.snapshots = []  # Taken every --step-check-interval during the current step; the first is post-ramp-up
+        self.finished = False
+
+    def tick(self) -> Optional[Tuple[int, float]]:
+        if self.finished:
+            return None
+        options = self.runner.environment.parsed_options
+        run_time = self.get_run_time()
+        if not self.users:
+            self._start_step(options.step_users, run_time)
+        elif run_time - self.snapshots[-1].time >= options.step_check_interval:
+            self.snapshots.append(_StatsSnapshot(self.runner, run_time))
+            stable = self._is_stable(options)
+            if stable or run_time - self.step_start >= options.step_max_time:
+                step = self._record_step(options, stable)
+                self._save_curve(options)
+                if step["slo_broken"] or self.users + options.step_users > options.max_users:
+                    self._finish(options)
+                    return None
+                self._start_step(self.users + options.step_users, run_time)
+        return self.users, max(options.step_users, 1)
+
+    def _start_step(self, users: int, run_time: float):
+        self.users = users
+        self.step_start = run_time
+        # The first window of each step (during which users are spawned and queues build up) isn't measured
+        self.snapshots = [_StatsSnapshot(self.runner, run_time)]
+        print(f"Step {len(self.steps) + 1}: {users} users")
+
+    def _get_window_p95s(self) -> List[Optional[int]]:
+        return [_get_window_percentile(start.response_times, end.response_times, 0.95)
+                for start, end in zip(self.snapshots, self.snapshots[1:])]
+
+    def _is_stable(self, options) -> bool:
+        window_p95s = self._get_window_p95s()[1:]  # Skips the ramp-up window
+        if len(window_p95s) < 2 or None in window_p95s[-2:]:
+            return False
+        previous_p95, last_p95 = window_p95s[-2:]
+        return abs(last_p95 - previous_p95) <= options.stability_tolerance * max(previous_p95, 1)
+
+    def _record_step(self, options, stable: bool) -> dict:
+        start, end = self.snapshots[1] if len(self.snapshots) > 2 else self.snapshots[0], self.snapshots[-1]
+        num_requests = end.num_requests - start.num_requests
+        num_dropped = end.num_dropped - start.num_dropped
+        num_failures = end.num_failures - start.num_failures + num_dropped
+        num_attempts = num_requests + num_dropped
+        duration = end.time - start.time
+        percentiles = {percent: _get_window_percentile(start.response_times, end.response_times, percent)
+                       for percent in [0.5, 0.95, 0.99]}
+        error_rate = num_failures / num_attempts if num_attempts else 0.0
+        open_loop = options.arrival_mode == "poisson"
+        step = {"step": len(self.steps) + 1, "users": self.users,
+                "offered_qps": round(self.users * options.arrival_rate, 3) if open_loop else None,
+                "throughput_qps": round((num_attempts - num_failures) / duration, 3) if duration else 0.0,
+                "p50_ms": percentiles[0.5], "p95_ms": percentiles[0.95], "p99_ms": percentiles[0.99],
+                "db_p95_ms": _get_window_percentile(start.db_response_times, end.db_response_times, 0.95),
+                "error_rate": round(error_rate, 4), "num_requests": num_requests, "duration_s": round(duration, 1),
+                "stable": stable}
+        step["slo_broken"] = (percentiles[0.95] is not None and percentiles[0.95] > options.slo_p95) or \
+            error_rate > options.max_error_rate
+        self.steps.append(step)
+        print(f"Step {step['step']} ({self.users} users): {step['throughput_qps']} queries/s, p95 "
+              f"{step['p95_ms']} ms, error rate {step['error_rate']}{'' if stable else ' (did not stabilize)'}")
+        return step
+
+    def _get_output_path(self, options, extension: str) -> str:
+        os.makedirs(options.load_results_dir, exist_ok=True)
+        return f"{options.load_results_dir}/throughput-latency-{get_querier(options.host or '')}.{extension}"
+
+    def _save_curve(self, options):
+        with open(self._get_output_path(options, "tsv"), "w") as curve_file:
+            writer = csv.DictWriter(curve_file, fieldnames=STEP_COLUMNS, delimiter="\t")
+            writer.writeheader()
+            writer.writerows(self.steps)
+        try:
+            import matplotlib
+            matplotlib.use("Agg")
+            import matplotlib.pyplot as plt
+        except ImportError:
+            return
+        figure, axes = plt.subplots(figsize=(8, 5))
+        throughputs = [step["throughput_qps"] for step in self.steps]
+        for percentile in ["p50", "p95", "p99"]:
+            axes.plot(throughputs, [step[f"{percentile}_ms"] for step in self.steps], marker="o", label=percentile)
+        axes.axhline(options.slo_p95, color="gray", linestyle="--", label="p95 SLO")
+        axes.set_xlabel("Throughput (queries/s)")
+        axes.set_ylabel("Latency (ms)")
+        axes.set_title(f"Throughput vs. latency: {options.host}")
+        axes.legend()
+        figure.savefig(self._get_output_path(options, "png"), dpi=150, bbox_inches="tight")
+        plt.close(figure)
+
+    def _finish(self, options):
+        self.finished = True
+        good_steps = [step for step in self.steps if not step["slo_broken"]]
+        knee_step = self.steps[-1] if self.steps[-1]["slo_broken"] else None
+        summary = {"endpoint": options.host, "querier": get_querier(options.host or ""),
+                   "arrival_mode": options.arrival_mode, "slo_p95_ms": options.slo_p95,
+                   "max_error_rate": options.max_error_rate,
+                   "max_sustainable_qps": max((step["throughput_qps"] for step in good_steps), default=None),
+                   "max_sustainable_users": good_steps[-1]["users"] if good_steps else None,
+                   "knee_users": knee_step["users"] if knee_step else None, "steps": self.steps}
+        with open(self._get_output_path(options, "json"), "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+        print(f"{'Reached the knee' if knee_step else 'Reached --max-users'}; max sustainable throughput was "
+              f"{summary['max_sustainable_qps']} queries/s ({summary['max_sustainable_users']} users). Saved the "
+              f"throughput-vs-latency curve to {self._get_output_path(options, 'tsv')}")
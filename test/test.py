@@ -1,101 +1,270 @@
-import csv
+import copy
+import io
+import itertools
 import json
 import os
 import random
+import sys
+import tempfile
+import threading
 import time
 import traceback
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, ExitStack
 from datetime import datetime
 
+import numpy as np
 import pytest
 import requests
-from typing import Dict, Union, List, Optional, Tuple
+from typing import Dict, Union, List, Optional, Tuple, IO, Iterator, TextIO
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(f"{SCRIPT_DIR}/..")
+from filter_kg2c_lite_json import StreamingJsonReader
+IN_FLIGHT_LOCK = threading.Lock()
+SESSION_LOCK = threading.Lock()
+RESPONSE_CHUNK_SIZE = 1024 * 1024
+SPOOL_MAX_MEMORY = 64 * 1024 * 1024  # Response bodies bigger than this are spooled to disk before being parsed
+BATCHING_QUERY_ID = "query_5909943.json"
+BATCHING_ENDPOINTS = ["http://amyplater.rtx.ai:8080/1.4", "http://amyplover.rtx.ai:9990"]
+PROBES_PER_BATCH_SIZE = 2  # Number of batches timed for each candidate batch size when measuring the cost curve
+num_in_flight = 0
+session = None
 
 
 # ----------------------------------- Helper functions ----------------------------------------- #
 
 
+@contextmanager
+def _track_in_flight():
+    # Yields the number of requests in flight (including this one) at the time this request is sent
+    global num_in_flight
+    with IN_FLIGHT_LOCK:
+        num_in_flight += 1
+        num_in_flight_at_send = num_in_flight
+    try:
+        yield num_in_flight_at_send
+    finally:
+        with IN_FLIGHT_LOCK:
+            num_in_flight -= 1
+
+
+def _get_session() -> requests.Session:
+    # One pooled keep-alive session is shared by all queries, so each query doesn't pay for a new TCP connection
+    global session
+    with SESSION_LOCK:
+        if session is None:
+            session = requests.Session()
+            pool_size = max(getattr(pytest, "concurrency", 1), 10)
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        return session
+
+
+class _StreamedBody(io.RawIOBase):
+    """
+    A file-like view of a streamed (and decompressed) response body that notes when its first byte arrived, counts
+    its bytes over the wire and decompressed, and copies it to the given files (if any) as it's read. The body is
+    read raw and decompressed here, since urllib3 can't say how many compressed bytes a chunked response had.
+    """
+
+    def __init__(self, response: requests.Response, request_start: float, copy_files: List[IO[bytes]]):
+        self.response = response
+        self.request_start = request_start
+        self.copy_files = copy_files
+        content_encoding = response.headers.get("Content-Encoding", "identity").strip().lower()
+        if content_encoding in ("gzip", "deflate", "identity"):
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if content_encoding == "gzip" else \
+                zlib.decompressobj() if content_encoding == "deflate" else None
+            self.chunks = self._iter_decompressed(decompressor)
+            self.num_bytes_wire = 0
+        else:  # Left to urllib3 to decode; its compressed size isn't known
+            self.chunks = response.iter_content(chunk_size=RESPONSE_CHUNK_SIZE)
+            self.num_bytes_wire = None
+        self.chunk = memoryview(b"")
+        self.time_to_first_byte = None
+        self.num_bytes_decompressed = 0
+
+    def _iter_decompressed(self, decompressor: Optional[any]) -> Iterator[bytes]:
+        for wire_chunk in self.response.raw.stream(RESPONSE_CHUNK_SIZE, decode_content=False):
+            self.num_bytes_wire += len(wire_chunk)
+            yield decompressor.decompress(wire_chunk) if decompressor else wire_chunk
+        if decompressor:
+            yield decompressor.flush()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.chunk:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            if self.time_to_first_byte is None:
+                self.time_to_first_byte = time.time() - self.request_start
+            self.num_bytes_decompressed += len(chunk)
+            for copy_file in self.copy_files:
+                copy_file.write(chunk)
+            self.chunk = memoryview(chunk)
+        num_bytes = min(len(buffer), len(self.chunk))
+        buffer[:num_bytes] = self.chunk[:num_bytes]
+        self.chunk = self.chunk[num_bytes:]
+        return num_bytes
+
+    def read_to_end(self):
+        while self.readinto(bytearray(RESPONSE_CHUNK_SIZE)):
+            pass
+        if self.time_to_first_byte is None:  # Empty body
+            self.time_to_first_byte = time.time() - self.request_start
+
+
+def _extract_response_metrics(body_file: TextIO) -> dict:
+    """
+    Counts the nodes, edges, and results in a TRAPI response and grabs its query_duration and db timing (from
+    Plover's '***ploverdbduration' log), in one incremental pass over the body. Only one node/edge/result/log is held
+    in memory at a time, so huge responses don't need to be loaded into a dictionary.
+    """
+    metrics = {"num_nodes": 0, "num_edges": 0, "num_results": 0, "query_duration": None, "ploverdb_duration": None}
+    reader = StreamingJsonReader(body_file, chunk_size=RESPONSE_CHUNK_SIZE)
+    for key in reader.iterate_object():
+        if key == "message" and reader.peek() == "{":
+            for message_key in reader.iterate_object():
+                if message_key == "knowledge_graph" and reader.peek() == "{":
+                    for kg_key in reader.iterate_object():
+                        if kg_key in ("nodes", "edges") and reader.peek() == "{":
+                            for _ in reader.iterate_object():
+                                reader.read_value()
+                                metrics[f"num_{kg_key}"] += 1
+                        else:
+                            reader.read_value()
+                elif message_key == "results" and reader.peek() == "[":
+                    metrics["num_results"] = sum(1 for _ in reader.iterate_array())
+                else:
+                    reader.read_value()
+        elif key == "logs" and reader.peek() == "[":
+            for log_message_obj in reader.iterate_array():
+                log_message = log_message_obj.get("message") or ""
+                if log_message.startswith("***ploverdbduration"):
+                    metrics["ploverdb_duration"] = float(log_message.split(":")[-1])
+        elif key == "query_duration":
+            metrics["query_duration"] = reader.read_value()
+        else:
+            reader.read_value()
+    return metrics
+
+
+def _get_is_set_mode() -> str:
+    return "issettrue" if pytest.issettrue else "issetfalse" if pytest.issetfalse else \
+        "issetunpinned" if pytest.issetunpinned else "asis"
+
+
+def _get_querier(endpoint: str) -> str:
+    if "8080/1.4" in endpoint:
+        return "plater"
+    elif "api/rtxkg2" in endpoint:
+        return "araxkg2"
+    else:
+        return "plover"
+
+
 def _send_query(trapi_query: Dict[str, Dict[str, Dict[str, Union[List[str], str, None]]]],
-                query_id: str, endpoint_override: Optional[str] = None):
+                query_id: str, endpoint_override: Optional[str] = None, concurrency: int = 1,
+                keep_response: bool = False) -> dict:
+    """
+    Sends the query and records its timings/counts in the querier's results TSV. The response is only loaded into a
+    dictionary (and returned) if keep_response is True; otherwise an empty dictionary is returned.
+    """
     # Grab the query graph (might be nested under 'message')
     trapi_qg = trapi_query if "nodes" in trapi_query else trapi_query["message"]["query_graph"]
     # Override conf endpoint with input endpoint, if provided
     endpoint = endpoint_override if endpoint_override else pytest.endpoint
 
-    # Get set up to store query results
-    if "8080/1.4" in endpoint:
-        querier = "plater"
-    elif "api/rtxkg2" in endpoint:
-        querier = "araxkg2"
-    else:
-        querier = "plover"
-    results_file_path = f"{SCRIPT_DIR}/{querier}.tsv"
-    if not os.path.exists(results_file_path):
-        with open(results_file_path, "w+") as results_file:
-            tsv_writer = csv.writer(results_file, delimiter="\t")
-            tsv_writer.writerow(["query_id", "date_run", "duration_client", "duration_server", "duration_db",
-                                 "response_status", "num_results", "num_nodes", "num_edges", "response_size"])
+    querier = _get_querier(endpoint)
 
     # Run the query
     print(f"Sending query {query_id} to {endpoint}..")
     client_start = time.time()
+    num_in_flight_at_send = 1
+    time_to_first_byte, response_bytes_wire, response_bytes_decompressed = None, None, None
+    download_end = None
+    response_path = f"{SCRIPT_DIR}/responses/{querier}_{query_id}"
+    json_response = dict()
     try:
-        response = requests.post(f"{endpoint}/query",
-                                 json={"message": {"query_graph": trapi_qg}, "submitter": "amy-test"},
-                                 timeout=(600, 600),  # Important to up the read timeout due to large response
-                                 headers={'accept': 'application/json',
-                                          'Cache-Control': 'no-cache'})
-        client_duration = time.time() - client_start
-        request_duration = response.elapsed.total_seconds()
-        response_status = response.status_code
-        print(f"Request took {request_duration} seconds, status {response_status}")
-
-        # Process/save results
-        if response.status_code == 200:
-            json_response = response.json()
-            num_nodes = len(json_response["message"]["knowledge_graph"]["nodes"])
-            num_edges = len(json_response["message"]["knowledge_graph"]["edges"])
-            num_results = len(json_response["message"]["results"])
-
-            # Save the response locally
-            if pytest.saveresponse:
-                print(f"Saving response for query {query_id}")
-                os.system(f"mkdir -p {SCRIPT_DIR}/responses")
-                response_path = f"{SCRIPT_DIR}/responses/{querier}_{query_id}"
-                with open(response_path, "w+") as response_file:
-                    json.dump(json_response, response_file)
-                # Grab the size of the response
-                response_size = os.path.getsize(response_path)
-            else:
-                response_size = None
-
-            # Save results/data for this query run
-            db_duration = None
-            if querier == "plater":
-                db_duration = json_response["query_duration"]["neo4j"]
+        with _track_in_flight() as num_in_flight_at_send, ExitStack() as exit_stack:
+            # The body is streamed (and decompressed) in chunks into a spool file (in memory unless it's large), and
+            # copied straight to disk if it's being saved. It's only parsed once it's all downloaded, so the parsing
+            # isn't counted in the client-side duration.
+            response = exit_stack.enter_context(
+                _get_session().post(f"{endpoint}/query",
+                                    json={"message": {"query_graph": trapi_qg}, "submitter": "amy-test"},
+                                    timeout=(600, 600),  # Important to up the read timeout due to large response
+                                    headers={'accept': 'application/json',
+                                             'Accept-Encoding': 'gzip, deflate',
+                                             'Cache-Control': 'no-cache'},
+                                    stream=True))
+            spool_file = exit_stack.enter_context(tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY))
+            copy_files = [spool_file]
+            if pytest.saveresponse and response.status_code == 200:
+                os.makedirs(f"{SCRIPT_DIR}/responses", exist_ok=True)
+                copy_files.append(exit_stack.enter_context(open(response_path, "wb")))
+            body = _StreamedBody(response, client_start, copy_files)
+            body.read_to_end()
+            download_end = time.time()
+            client_duration = download_end - client_start
+            time_to_first_byte, response_bytes_wire = body.time_to_first_byte, body.num_bytes_wire
+            response_bytes_decompressed = body.num_bytes_decompressed
+            request_duration = response.elapsed.total_seconds()
+            response_status = response.status_code
+            print(f"Request took {request_duration} seconds, status {response_status} (first byte after "
+                  f"{round(time_to_first_byte, 3)} seconds; {response_bytes_wire} bytes over the wire, "
+                  f"{response_bytes_decompressed} decompressed)")
+
+            # Process/save results
+            spool_file.seek(0)
+            if response.status_code == 200:
+                body_text = io.TextIOWrapper(spool_file, encoding="utf-8")
+                metrics = _extract_response_metrics(body_text)
+                body_text.detach()  # So the spool file isn't closed along with the wrapper
+                num_nodes, num_edges, num_results = metrics["num_nodes"], metrics["num_edges"], metrics["num_results"]
+                if keep_response:
+                    spool_file.seek(0)
+                    json_response = json.load(spool_file)
+
+                # Grab the size of the saved response
+                if pytest.saveresponse:
+                    print(f"Saved response for query {query_id}")
+                    response_size = os.path.getsize(response_path)
+                else:
+                    response_size = None
+
+                # Save results/data for this query run
+                if querier == "plater":
+                    db_duration = metrics["query_duration"]["neo4j"]
+                else:
+                    db_duration = metrics["ploverdb_duration"]
             else:
-                for log_message_obj in json_response.get("logs", []):
-                    log_message = log_message_obj["message"]
-                    if log_message.startswith("***ploverdbduration"):
-                        db_duration = float(log_message.split(":")[-1])
-        else:
-            print(f"Response status code was {response.status_code}. Response was: {response.text}")
-            num_nodes, num_edges, num_results, response_size, db_duration = 0, 0, 0, None, None
-            json_response = dict()
+                print(f"Response status code was {response.status_code}. Response was: "
+                      f"{spool_file.read().decode('utf-8', errors='replace')}")
+                num_nodes, num_edges, num_results, response_size, db_duration = 0, 0, 0, None, None
     except Exception:
-        client_duration = time.time() - client_start
+        client_duration = (download_end if download_end else time.time()) - client_start
         request_duration = client_duration
         print(f"Request to KP threw an exception! Traceback: {traceback.format_exc()}")
         num_nodes, num_edges, num_results, response_size, db_duration, response_status = 0, 0, 0, None, None, 599
         json_response = dict()
 
-    row = [query_id, datetime.now(),
-           client_duration, request_duration, db_duration, response_status,
-           num_results, num_nodes, num_edges, response_size]
-    with open(results_file_path, "a") as results_file_append:
-        tsv_appender = csv.writer(results_file_append, delimiter="\t")
-        tsv_appender.writerow(row)
+    # Record this query execution in the results database (see results_store.py); start_time/end_time are epoch
+    # seconds, for lining queries up with resource timelines (see correlate_resources.py)
+    row = {"query_id": query_id, "date_run": datetime.now(), "duration_client": client_duration,
+           "duration_server": request_duration, "duration_db": db_duration, "response_status": response_status,
+           "num_results": num_results, "num_nodes": num_nodes, "num_edges": num_edges,
+           "response_size": response_size, "concurrency": concurrency, "num_in_flight": num_in_flight_at_send,
+           "time_to_first_byte": time_to_first_byte, "response_bytes_wire": response_bytes_wire,
+           "response_bytes_decompressed": response_bytes_decompressed, "start_time": client_start,
+           "end_time": client_start + client_duration}
+    pytest.results_store.add_execution(pytest.runname, querier, endpoint, _get_is_set_mode(), row)
 
     return json_response
 
@@ -140,9 +309,9 @@ def _load_query_json_file(file_path: str) -> Tuple[str, dict]:
     return query_identifier, trapi_qg
 
 
-def _run_query_json_file(file_path: str):
+def _run_query_json_file(file_path: str, concurrency: int = 1):
     query_identifier, trapi_qg = _load_query_json_file(file_path)
-    response = _send_query(trapi_qg, query_id=query_identifier)
+    response = _send_query(trapi_qg, query_id=query_identifier, concurrency=concurrency)
 
 
 def _divide_list_into_chunks(input_list: List[any], chunk_size: int) -> List[List[any]]:
@@ -158,6 +327,88 @@ def _divide_list_into_chunks(input_list: List[any], chunk_size: int) -> List[Lis
     return all_chunks
 
 
+def _send_batches(qg: dict, pinned_qnode_key: str, batches: List[List[str]], query_name: str, endpoint: str,
+                  parallelism: int) -> Tuple[List[dict], float]:
+    # Sends the batches (up to parallelism at a time) and returns their responses and the total wall time
+    def send_batch(batch_num_and_batch: Tuple[int, List[str]]) -> dict:
+        batch_num, batch = batch_num_and_batch
+        batch_qg = copy.deepcopy(qg)
+        batch_qg["nodes"][pinned_qnode_key]["ids"] = batch
+        return _send_query(batch_qg, f"{query_name}__{len(batch)}__{parallelism}__{batch_num}",
+                           endpoint_override=endpoint, concurrency=parallelism, keep_response=True)
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        responses = list(executor.map(send_batch, enumerate(batches, start=1)))
+    return responses, time.time() - start
+
+
+def _get_result_key(result: dict) -> Tuple:
+    return tuple(sorted((qnode_key, tuple(sorted(binding["id"] for binding in bindings)))
+                        for qnode_key, bindings in result["node_bindings"].items()))
+
+
+def _merge_responses(responses: List[dict]) -> dict:
+    """
+    Merges the knowledge graphs and results of the given (batch) responses into one response. Nodes and edges are
+    deduplicated by their keys, and results by their node bindings (duplicates' edge bindings are combined).
+    """
+    nodes, edges, results = dict(), dict(), dict()
+    for response in responses:
+        message = response.get("message") or dict()
+        knowledge_graph = message.get("knowledge_graph") or dict()
+        nodes.update(knowledge_graph.get("nodes") or dict())
+        edges.update(knowledge_graph.get("edges") or dict())
+        for result in message.get("results") or []:
+            result_key = _get_result_key(result)
+            if result_key not in results:
+                results[result_key] = copy.deepcopy(result)
+            else:
+                merged_analyses = results[result_key].setdefault("analyses", [])
+                if not merged_analyses:  # An empty analyses list is valid TRAPI
+                    merged_analyses.append({"edge_bindings": dict()})
+                merged_analysis = merged_analyses[0]
+                for analysis in result.get("analyses", []):
+                    for qedge_key, edge_bindings in analysis.get("edge_bindings", dict()).items():
+                        merged_edge_bindings = merged_analysis["edge_bindings"].setdefault(qedge_key, [])
+                        merged_edge_ids = {edge_binding["id"] for edge_binding in merged_edge_bindings}
+                        merged_edge_bindings += [edge_binding for edge_binding in edge_bindings
+                                                 if edge_binding["id"] not in merged_edge_ids]
+    return {"message": {"knowledge_graph": {"nodes": nodes, "edges": edges}, "results": list(results.values())}}
+
+
+def _measure_cost_curve(qg: dict, pinned_qnode_key: str, id_cycle: Iterator[str], batch_sizes: List[int],
+                        endpoint: str) -> List[dict]:
+    """
+    Times a few (sequentially sent) full batches at each candidate batch size. Candidates are probed in random order,
+    and each probe batch takes the next ids from id_cycle, so batches don't reuse ids (and thus the KP's caches)
+    until all of them have been used.
+    """
+    cost_curve = []
+    for batch_size in random.sample(batch_sizes, len(batch_sizes)):
+        probe_batches = [list(itertools.islice(id_cycle, batch_size)) for _ in range(PROBES_PER_BATCH_SIZE)]
+        _, seconds = _send_batches(qg, pinned_qnode_key, probe_batches, f"{BATCHING_QUERY_ID}__probe", endpoint, 1)
+        seconds_per_batch = seconds / len(probe_batches)
+        cost_curve.append({"batch_size": batch_size, "seconds_per_batch": seconds_per_batch,
+                           "ids_per_second": batch_size / seconds_per_batch})
+        print(f"Batches of {batch_size} ids took {round(seconds_per_batch, 3)} seconds each")
+    return sorted(cost_curve, key=lambda point: point["batch_size"])
+
+
+def _measure_parallelism(qg: dict, pinned_qnode_key: str, id_cycle: Iterator[str], batch_size: int,
+                         parallelisms: List[int], endpoint: str) -> List[dict]:
+    # Times sending one round of full batches (one per parallel caller) at each candidate parallelism, in random order
+    parallelism_curve = []
+    for parallelism in random.sample(parallelisms, len(parallelisms)):
+        round_batches = [list(itertools.islice(id_cycle, batch_size)) for _ in range(parallelism)]
+        _, seconds = _send_batches(qg, pinned_qnode_key, round_batches, f"{BATCHING_QUERY_ID}__probe", endpoint,
+                                   parallelism)
+        parallelism_curve.append({"parallelism": parallelism, "seconds": seconds,
+                                  "ids_per_second": batch_size * parallelism / seconds})
+        print(f"{parallelism} parallel batches of {batch_size} ids took {round(seconds, 3)} seconds")
+    return sorted(parallelism_curve, key=lambda point: point["parallelism"])
+
+
 # ------------------------ Actual pytests that can be run via command line ------------------------ #
 
 def test_batching():
@@ -188,6 +439,84 @@ def test_batching():
         counter += 1
 
 
+def test_batching_adaptive():
+    """
+    For each backend, measures how batch size and parallelism affect throughput for the long pinned-ID query, sends
+    the query in batches of the best size/parallelism, merges the batch responses, and compares the total wall time
+    (and results) to sending the query unbatched. A report is saved to batching-<querier>.json.
+    """
+    _, qg = _load_query_json_file(f"{SCRIPT_DIR}/sample_kg2_queries_LONG/{BATCHING_QUERY_ID}")
+    pinned_qnode_key = "i"
+    pinned_ids = list(qg["nodes"][pinned_qnode_key]["ids"])
+    random.shuffle(pinned_ids)
+    batch_sizes = [batch_size for batch_size in pytest.batchsizes if batch_size < len(pinned_ids)]
+    print(f"Query has {len(pinned_ids)} pinned IDs; candidate batch sizes are {batch_sizes} and candidate "
+          f"parallelisms are {pytest.parallelisms}")
+    assert batch_sizes
+
+    for endpoint in [pytest.endpoint] if pytest.endpoint else BATCHING_ENDPOINTS:
+        # Warm the KP up first (connections, query plans, caches for all of the ids), so that whichever probe or
+        # comparison runs first isn't the only cold one
+        print(f"Warming up {endpoint} with the unbatched query")
+        _send_query(qg, f"{BATCHING_QUERY_ID}__warmup", endpoint_override=endpoint)
+
+        # Then pick the batch size with the best throughput, then the best parallelism for that size
+        id_cycle = itertools.cycle(pinned_ids)
+        cost_curve = _measure_cost_curve(qg, pinned_qnode_key, id_cycle, batch_sizes, endpoint)
+        best_batch_size = max(cost_curve, key=lambda point: point["ids_per_second"])["batch_size"]
+        # Fitting seconds = overhead + per_id_cost * batch_size separates fixed per-request cost from per-id cost
+        per_id_cost, overhead = np.polyfit([point["batch_size"] for point in cost_curve],
+                                           [point["seconds_per_batch"] for point in cost_curve], 1) \
+            if len(cost_curve) > 1 else (None, None)
+        num_batches = len(_divide_list_into_chunks(pinned_ids, best_batch_size))
+        parallelisms = [parallelism for parallelism in pytest.parallelisms if parallelism <= num_batches] or [1]
+        parallelism_curve = _measure_parallelism(qg, pinned_qnode_key, id_cycle, best_batch_size, parallelisms,
+                                                 endpoint)
+        best_parallelism = max(parallelism_curve, key=lambda point: point["ids_per_second"])["parallelism"]
+
+        # Then send the whole query batched (using the chosen settings) and unbatched, in ABBA order so neither
+        # always goes first; each's time is the mean of its two sends
+        batches = _divide_list_into_chunks(pinned_ids, best_batch_size)
+        print(f"Sending {len(batches)} batches of {best_batch_size} ids, {best_parallelism} at a time, and the "
+              f"unbatched query, to {endpoint}")
+        batched_times, unbatched_times = [], []
+        for send_batched in [True, False, False, True]:
+            if send_batched:
+                batch_responses, seconds = _send_batches(qg, pinned_qnode_key, batches, BATCHING_QUERY_ID, endpoint,
+                                                         best_parallelism)
+                batched_times.append(seconds)
+            else:
+                start = time.time()
+                unbatched_response = _send_query(qg, f"{BATCHING_QUERY_ID}__unbatched", endpoint_override=endpoint,
+                                                 keep_response=True)
+                unbatched_times.append(time.time() - start)
+        batched_seconds, unbatched_seconds = float(np.mean(batched_times)), float(np.mean(unbatched_times))
+        merged_response = _merge_responses(batch_responses)
+
+        merged_message = merged_response["message"]
+        unbatched_message = unbatched_response.get("message") or dict()
+        report = {"endpoint": endpoint, "query_id": BATCHING_QUERY_ID, "num_pinned_ids": len(pinned_ids),
+                  "cost_curve": cost_curve, "fixed_seconds_per_batch": overhead, "seconds_per_id": per_id_cost,
+                  "parallelism_curve": parallelism_curve, "best_batch_size": best_batch_size,
+                  "best_parallelism": best_parallelism, "num_batches": len(batches),
+                  "batched_seconds": batched_seconds, "unbatched_seconds": unbatched_seconds,
+                  "batched_times": batched_times, "unbatched_times": unbatched_times,
+                  "speedup": unbatched_seconds / batched_seconds if batched_seconds else None,
+                  "num_failed_batches": sum(1 for response in batch_responses if not response),
+                  "batched_counts": {"num_results": len(merged_message["results"]),
+                                     "num_nodes": len(merged_message["knowledge_graph"]["nodes"]),
+                                     "num_edges": len(merged_message["knowledge_graph"]["edges"])},
+                  "unbatched_counts": {"num_results": len(unbatched_message.get("results") or []),
+                                       "num_nodes": len((unbatched_message.get("knowledge_graph") or
+                                                         dict()).get("nodes") or dict()),
+                                       "num_edges": len((unbatched_message.get("knowledge_graph") or
+                                                         dict()).get("edges") or dict())}}
+        print(f"Batched: {round(batched_seconds, 2)} seconds, {report['batched_counts']}; unbatched: "
+              f"{round(unbatched_seconds, 2)} seconds, {report['unbatched_counts']}")
+        with open(f"{SCRIPT_DIR}/batching-{_get_querier(endpoint)}.json", "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
+
 def test_specified():
     # Need to use the '--querypath <path to query or directory of queries>' command line option when running this test
     assert pytest.querypath
@@ -200,12 +529,20 @@ def test_specified():
         # Run the specified query
         _run_query_json_file(pytest.querypath)
     elif os.path.isdir(pytest.querypath):
-        # Run each query in the specified directory (random order)
+        # Run each query in the specified directory (random order), up to --concurrency of them at a time
         query_file_names = list(os.listdir(pytest.querypath))
         random.shuffle(query_file_names)
-        for file_name in query_file_names:
-            if file_name.endswith(".json"):
-                _run_query_json_file(f"{pytest.querypath}/{file_name}")
+        query_file_paths = [f"{pytest.querypath}/{file_name}" for file_name in query_file_names
+                            if file_name.endswith(".json")]
+        if pytest.concurrency > 1:
+            print(f"Sending queries with a concurrency of {pytest.concurrency}")
+            with ThreadPoolExecutor(max_workers=pytest.concurrency) as executor:
+                # Consuming the results re-raises any exception that occurred in a worker thread
+                list(executor.map(lambda file_path: _run_query_json_file(file_path, pytest.concurrency),
+                                  query_file_paths))
+        else:
+            for query_file_path in query_file_paths:
+                _run_query_json_file(query_file_path)
     else:
         print(f"Invalid query path. Needs to be a path to a JSON query file or a directory of JSON queries.")
         assert False
@@ -230,7 +567,7 @@ def test_simple_1():
           }
        }
     }
-    response = _send_query(query, "test_simple_1")
+    response = _send_query(query, "test_simple_1", keep_response=True)
     assert response["message"]["results"]
 
 
@@ -253,7 +590,7 @@ def test_simple_2():
           }
        }
     }
-    response = _send_query(query, "test_simple_2")
+    response = _send_query(query, "test_simple_2", keep_response=True)
     assert response["message"]["results"]
 
 
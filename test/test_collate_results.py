@@ -0,0 +1,57 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from collate_results import bootstrap_ci, detect_regressions, load_executions, make_latency_report
+from results_store import ResultsStore, import_tsv
+
+
+def test_bootstrap_ci_brackets_statistic():
+    rng = np.random.default_rng(0)
+    samples = [rng.lognormal(mean, 0.1, size=3) for mean in rng.normal(0, 1, size=200)]
+    pooled = np.concatenate(samples)
+    for percentile in [None, 50, 95]:
+        statistic = pooled.mean() if percentile is None else np.percentile(pooled, percentile)
+        ci_low, ci_high = bootstrap_ci(samples, rng, percentile)
+        assert ci_low <= statistic <= ci_high
+    assert np.isnan(bootstrap_ci([np.array([1.0])], rng)[0])
+
+
+def test_detect_regressions_flags_slowdown():
+    rng = np.random.default_rng(1)
+    rows = []
+    for querier, slowdown in [("fast", 1), ("slow", 2)]:
+        for query_num in range(30):
+            base_latency = rng.lognormal(0, 1)
+            for run_name, factor in [("v1--1", 1), ("v1--2", 1), ("v2--1", slowdown), ("v2--2", slowdown)]:
+                rows.append({"querier": querier, "is_set_mode": "asis", "query_id": f"query_{query_num}",
+                             "run_name": run_name, "duration_server": base_latency * factor * rng.uniform(0.97, 1.03)})
+    regressions_df = detect_regressions(pd.DataFrame(rows), "duration_server", ["v1--1", "v1--2"],
+                                        ["v2--1", "v2--2"], rng)
+    verdicts = regressions_df[regressions_df["level"] == "stack"].set_index("querier")["verdict"]
+    assert verdicts["fast"] == "no significant change"
+    assert verdicts["slow"] == "regression"
+
+
+def test_reimport_does_not_change_report(tmp_path):
+    tsv_paths = []
+    for run_num in [1, 2]:
+        tsv_paths.append(f"{tmp_path}/plover--asis--{run_num}.tsv")
+        with open(tsv_paths[-1], "w") as results_file:
+            results_file.write("query_id\tdate_run\tduration_server\tresponse_status\n")
+            for query_num in range(5):
+                results_file.write(f"query_{query_num}\t2024-01-0{run_num} 00:00:00\t{query_num + run_num}\t200\n")
+    db_path = f"{tmp_path}/results.sqlite"
+    stack_ns = []
+    for _ in range(2):
+        store = ResultsStore(db_path)
+        num_imported = [import_tsv(store, tsv_path) for tsv_path in tsv_paths]
+        store.close()
+        connection = sqlite3.connect(db_path)
+        report_df = make_latency_report(load_executions(connection, "duration_server", cold_runs=1),
+                                        "duration_server", np.random.default_rng(0))
+        connection.close()
+        stack_ns.append(report_df[report_df["level"] == "stack"].set_index("phase")["n"].to_dict())
+    assert num_imported == [None, None]  # The second import skips both files
+    assert stack_ns[0] == stack_ns[1] == {"cold": 5, "warm": 5, "all": 10}
@@ -0,0 +1,37 @@
+import json
+
+from compare_responses import compare_query, ResponseIndex
+
+
+def _make_response(edges: list, results: list) -> dict:
+    nodes = {node_id: {"name": node_id, "categories": ["biolink:NamedThing"]}
+             for edge in edges for node_id in edge[1:]}
+    return {"message": {"query_graph": {"nodes": {"a": {"ids": ["X:1"]}, "b": {}}, "edges": {"ab": {}}},
+                        "knowledge_graph": {"nodes": nodes,
+                                            "edges": {edge_key: {"subject": subject, "predicate": "biolink:treats",
+                                                                 "object": object_}
+                                                      for edge_key, subject, object_ in edges}},
+                        "results": [{"node_bindings": {"a": [{"id": "X:1"}], "b": [{"id": node_id}]},
+                                     "analyses": [{"edge_bindings": {"ab": [{"id": edge_key}]}}]}
+                                    for edge_key, node_id in results]}}
+
+
+def test_compare_query(tmp_path):
+    # Edge keys differ between the KPs, but edges with the same subject/predicate/object are the same edge
+    plater_response = _make_response([("1", "X:1", "Y:1"), ("2", "X:1", "Y:2")], [("1", "Y:1"), ("2", "Y:2")])
+    plover_response = _make_response([("e7", "X:1", "Y:1"), ("e8", "X:1", "Y:3")], [("e7", "Y:1"), ("e8", "Y:3")])
+    response_paths = dict()
+    for querier, response in [("plater", plater_response), ("plover", plover_response)]:
+        response_paths[querier] = f"{tmp_path}/{querier}_q.json"
+        with open(response_paths[querier], "w") as response_file:
+            json.dump(response, response_file)
+
+    row = compare_query("q.json", response_paths)[0]
+    assert (row["querier_a"], row["querier_b"]) == ("plater", "plover")
+    assert (row["nodes_a"], row["nodes_b"], row["nodes_shared"], row["nodes_jaccard"]) == (3, 3, 2, 0.5)
+    assert (row["edges_shared"], row["results_shared"], row["results_jaccard"]) == (1, 1, round(1 / 3, 4))
+
+    index = ResponseIndex(plater_response)
+    assert index.node_ids_by_qnode["b"] == {"Y:1", "Y:2"}
+    assert index.get_results_using_edge("2") == [plater_response["message"]["results"][1]]
+    assert sorted(index.edges_by_node["X:1"]) == ["1", "2"]
@@ -0,0 +1,365 @@
+import json
+import os
+import sys
+from typing import Callable, List
+
+import numpy as np
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(f"{SCRIPT_DIR}/..")
+from convert_kg2c_tsvs_to_jsonl import convert_tsv_to_jsonl, get_output_file_paths, get_removed_ids_file_paths, \
+    get_edge_ids_file_path, get_neo4j_header_file_path, CategoryAncestorCache, NEO4J_ARRAY_DELIMITER
+from make_synthetic_kg2c import make_synthetic_kg2c
+from stub_biolink_helper import BiolinkHelper
+
+# Edge cases for Plater filtering/remapping, in make_synthetic_kg2c's edge column order (subject, predicate, object,
+# primary_knowledge_source, publications, publications_info, kg2_ids, domain_range_exclusion, qualified_predicate,
+# qualified_object_aspect, qualified_object_direction, id, :TYPE); edge case N has id 900000N
+EDGE_CASE_ROWS = [
+    ["CHEBI:1", "biolink:treats", "MONDO:2", "infores:semmeddb", "[]", "", "", "False", "", "", "", "9000001", ""],
+    ["CHEBI:1", "biolink:treats", "MONDO:2", "infores:semmeddb", "PMID:1ǂPMID:2ǂPMID:3", "", "", "", "", "", "",
+     "9000002", ""],
+    ["CHEBI:1", "biolink:treats", "MONDO:2", "infores:semmeddb", "PMID:1ǂPMID:2ǂPMID:3ǂPMID:4", "", "", "False", "",
+     "", "", "9000003", ""],
+    ["CHEBI:1", "biolink:treats", "MONDO:2", "infores:chembl", "PMID:1", "", "", "true", "", "", "", "9000004", ""],
+    ["CHEBI:1", "biolink:subclass_of", "CHEBI:2", "{}", "", "", "", "False", "", "", "", "9000005", ""],
+    ["CHEBI:1", "biolink:subclass_of", "CHEBI:2", "infores:chebi", "", "", "", "False", "", "", "", "9000006", ""],
+    ["CHEBI:1", "", "CHEBI:2", "infores:semmeddb", "{}", "", "", "", "", "", "", "9000007", ""],
+]
+OUTPUT_FORMATS = ["neo4j", "parquet", "plover_lite"]
+CONVERSION_OPTIONS = {"neo4j_csv": True, "parquet": True, "plover_lite": True}
+
+
+def _convert_synthetic_kg2c(output_dir: str, **conversion_options) -> dict:
+    file_paths = make_synthetic_kg2c(output_dir, 3000, seed=1)
+    with open(file_paths["edges_tsv"], "a") as edges_file:
+        for row in EDGE_CASE_ROWS:
+            edges_file.write("\t".join(row) + "\n")
+    bh = CategoryAncestorCache(BiolinkHelper())
+    output_contents = dict()
+    for kind in ["nodes", "edges"]:
+        tsv_path = file_paths[f"{kind}_tsv"]
+        convert_tsv_to_jsonl(tsv_path, file_paths[f"{kind}_header_tsv"], bh, **conversion_options,
+                             **CONVERSION_OPTIONS)
+        extra_formats = OUTPUT_FORMATS if kind == "edges" else ["neo4j", "parquet"]
+        for output_kind, output_bytes in _read_output_bytes(tsv_path, extra_formats).items():
+            output_contents[f"{kind}_{output_kind}"] = output_bytes
+    return output_contents
+
+
+def test_plater_edge_filtering(tmp_path):
+    outputs = _convert_synthetic_kg2c(f"{tmp_path}")
+    for output_name, output in outputs.items():
+        assert output, f"{output_name} output is empty"
+    # Only edge cases 3, 5, and 6 should make it into Plater
+    plater_edges = {edge_line.split('"id": "')[1].split('"')[0]: edge_line
+                    for edge_line in outputs["edges_plater"].decode("utf-8").splitlines()}
+    assert not {"9000001", "9000002", "9000004", "9000007"} & set(plater_edges)
+    assert "biolink:treats" in plater_edges["9000003"]
+    assert "biolink:related_to_at_concept_level" in plater_edges["9000005"]
+    assert "biolink:subclass_of" in plater_edges["9000006"]
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_vectorized_conversion_matches_row_wise(tmp_path, num_workers):
+    row_wise_outputs = _convert_synthetic_kg2c(f"{tmp_path}/row_wise")
+    vectorized_outputs = _convert_synthetic_kg2c(f"{tmp_path}/vectorized", vectorized=True, num_workers=num_workers)
+    assert len(row_wise_outputs) == 15
+    assert row_wise_outputs.keys() == vectorized_outputs.keys()
+    for output_name, row_wise_output in row_wise_outputs.items():
+        assert vectorized_outputs[output_name] == row_wise_output, f"{output_name} outputs differ"
+
+
+def test_parquet_category_types(tmp_path):
+    import pyarrow.parquet as pq
+    file_paths = make_synthetic_kg2c(f"{tmp_path}", 200, seed=1)
+    tsv_path = file_paths["nodes_tsv"]
+    convert_tsv_to_jsonl(tsv_path, file_paths["nodes_header_tsv"], CategoryAncestorCache(BiolinkHelper()),
+                         parquet=True)
+    output_file_paths = get_output_file_paths(tsv_path, extra_formats=["parquet"])
+    # 'category' is a plain string in the full and lite outputs; only Plater's materialized category is a list
+    for output_kind in ["full_parquet", "lite_parquet"]:
+        nodes = pq.read_table(output_file_paths[output_kind]).to_pylist()
+        assert nodes and all(isinstance(node["category"], str) for node in nodes)
+        assert all(node["category"].startswith("biolink:") for node in nodes)
+    plater_nodes = pq.read_table(output_file_paths["plater_parquet"]).to_pylist()
+    assert plater_nodes and all(isinstance(node["category"], list) for node in plater_nodes)
+
+
+def test_neo4j_csv_refuses_zstd(tmp_path):
+    file_paths = make_synthetic_kg2c(f"{tmp_path}", 10, seed=1)
+    with pytest.raises(ValueError, match="zstd"):
+        convert_tsv_to_jsonl(file_paths["edges_tsv"], file_paths["edges_header_tsv"],
+                             CategoryAncestorCache(BiolinkHelper()), neo4j_csv=True, compression="zstd")
+    assert not os.path.exists(get_output_file_paths(file_paths["edges_tsv"])["full"])
+
+
+def test_plover_lite_graph_matches_filter_script(tmp_path, monkeypatch):
+    import filter_kg2c_lite_json
+    from convert_kg2c_tsvs_to_jsonl import write_plover_lite_graph, get_plover_lite_graph_file_path
+    file_paths = make_synthetic_kg2c(f"{tmp_path}", 300, seed=2)
+    bh = CategoryAncestorCache(BiolinkHelper())
+    for kind in ["nodes", "edges"]:
+        convert_tsv_to_jsonl(file_paths[f"{kind}_tsv"], file_paths[f"{kind}_header_tsv"], bh, plover_lite=True)
+
+    # Stand in for the release's kg2c_lite JSON: all of the lite rows (with integer edge ids), plus build info
+    kg2c_lite_json = {"build": {"version": "2.10.0", "biolink_version": "4.2.0"}}
+    for kind in ["nodes", "edges"]:
+        with open(get_output_file_paths(file_paths[f"{kind}_tsv"])["lite"]) as lite_file:
+            kg2c_lite_json[kind] = [json.loads(line) for line in lite_file]
+    for edge in kg2c_lite_json["edges"]:
+        edge["id"] = int(edge["id"])
+    kg2c_lite_json_path = f"{tmp_path}/kg2c_lite.json"
+    with open(kg2c_lite_json_path, "w") as kg2c_lite_json_file:
+        json.dump(kg2c_lite_json, kg2c_lite_json_file)
+
+    write_plover_lite_graph(file_paths["nodes_tsv"], file_paths["edges_tsv"], kg2c_lite_json_path=kg2c_lite_json_path)
+    plater_edges_path = get_output_file_paths(file_paths["edges_tsv"])["plater"]
+    monkeypatch.setattr(sys, "argv", ["filter_kg2c_lite_json.py", kg2c_lite_json_path, plater_edges_path])
+    filter_kg2c_lite_json.main()
+    with open(get_plover_lite_graph_file_path(file_paths["edges_tsv"])) as graph_file:
+        plover_lite_graph = json.load(graph_file)
+    with open(f"{kg2c_lite_json_path}_filtered") as filtered_json_file:
+        filtered_graph = json.load(filtered_json_file)
+    assert 0 < len(filtered_graph["edges"]) < len(kg2c_lite_json["edges"])
+    assert list(plover_lite_graph) == list(filtered_graph) == ["build", "nodes", "edges"]
+    assert plover_lite_graph == filtered_graph
+
+
+def _modify_tsv_rows(tsv_path: str, change_row: Callable[[List[str]], None], make_new_row: Callable[[int], List[str]]):
+    # Changes every 7th row, removes every 11th, and inserts a new row after every 13th
+    with open(tsv_path) as tsv_file:
+        rows = [line.rstrip("\n").split("\t") for line in tsv_file]
+    new_rows = []
+    for row_num, row in enumerate(rows):
+        if row_num % 7 == 0:
+            change_row(row)
+        if row_num % 11 != 0:
+            new_rows.append(row)
+        if row_num % 13 == 0:
+            new_rows.append(make_new_row(row_num))
+    with open(tsv_path, "w") as tsv_file:
+        tsv_file.writelines("\t".join(row) + "\n" for row in new_rows)
+
+
+def _change_edge_row(row: List[str]):
+    # Moves edges in and out of Plater (by way of their source, publications, and domain_range_exclusion)
+    if row[3] == "infores:semmeddb":
+        row[4] = "ǂ".join(f"PMID:{pmid}" for pmid in range(5))
+        row[7] = "True" if row[7] == "False" else "False"
+    else:
+        row[3], row[4] = "infores:semmeddb", ""
+
+
+def _read_outputs_as_multisets(tsv_path: str, extra_formats: List[str]) -> dict:
+    import pyarrow.parquet as pq
+    outputs = dict()
+    for output_kind, output_file_path in get_output_file_paths(tsv_path, extra_formats=extra_formats).items():
+        if output_kind.endswith("_parquet"):
+            rows = [json.dumps(row, sort_keys=True) for row in pq.read_table(output_file_path).to_pylist()]
+        else:
+            with open(output_file_path) as output_file:
+                rows = output_file.readlines()
+        outputs[output_kind] = sorted(rows)
+    return outputs
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_incremental_conversion_matches_full_conversion(tmp_path, num_workers):
+    bh = CategoryAncestorCache(BiolinkHelper())
+    previous_file_paths = make_synthetic_kg2c(f"{tmp_path}/previous", 1000, seed=3)
+    for kind in ["nodes", "edges"]:
+        convert_tsv_to_jsonl(previous_file_paths[f"{kind}_tsv"], previous_file_paths[f"{kind}_header_tsv"], bh,
+                             num_workers=num_workers, **CONVERSION_OPTIONS)
+
+    # Make the next version by adding, removing, and changing some rows of the previous one
+    for output_dir in ["incremental", "full"]:
+        make_synthetic_kg2c(f"{tmp_path}/{output_dir}", 1000, seed=3)
+        _modify_tsv_rows(f"{tmp_path}/{output_dir}/nodes_c.tsv",
+                         change_row=lambda row: row.__setitem__(1, f"{row[1]} (renamed)"),
+                         make_new_row=lambda row_num: [f"NEW:{row_num}", f"new node {row_num}", "", "biolink:Gene",
+                                                       "biolink:Gene", "", "", "", "", "biolink:Gene"])
+        _modify_tsv_rows(f"{tmp_path}/{output_dir}/edges_c.tsv", change_row=_change_edge_row,
+                         make_new_row=lambda row_num: ["NEW:0", "biolink:related_to", f"NEW:{row_num}",
+                                                       "infores:chembl", "", "", "", "False", "", "", "",
+                                                       str(1000000 + row_num), "biolink:related_to"])
+
+    for kind in ["nodes", "edges"]:
+        tsv_path = f"{tmp_path}/incremental/{kind}_c.tsv"
+        report = convert_tsv_to_jsonl(tsv_path, f"{tmp_path}/incremental/{kind}_c_header.tsv", bh,
+                                      num_workers=num_workers, previous_dir=f"{tmp_path}/previous",
+                                      **CONVERSION_OPTIONS)
+        assert 0 < report["num_rows_converted"] < report["num_rows"]
+        full_tsv_path = f"{tmp_path}/full/{kind}_c.tsv"
+        convert_tsv_to_jsonl(full_tsv_path, f"{tmp_path}/full/{kind}_c_header.tsv", bh, **CONVERSION_OPTIONS)
+
+        # Unchanged rows come first in the incrementally built outputs, so only their contents can be compared
+        extra_formats = OUTPUT_FORMATS if kind == "edges" else ["neo4j", "parquet"]  # Only edges are filtered
+        incremental_outputs = _read_outputs_as_multisets(tsv_path, extra_formats)
+        full_outputs = _read_outputs_as_multisets(full_tsv_path, extra_formats)
+        assert len(incremental_outputs) == (8 if kind == "edges" else 7)
+        for output_kind, full_output in full_outputs.items():
+            assert incremental_outputs[output_kind] == full_output, f"{kind} {output_kind} outputs differ"
+
+        # Applying the deltas to the previous outputs (as a loader would) gives the same rows, too
+        previous_file_paths = get_output_file_paths(f"{tmp_path}/previous/{kind}_c.tsv")
+        delta_file_paths = get_output_file_paths(tsv_path, delta=True)
+        for output_kind, removed_ids_file_path in get_removed_ids_file_paths(tsv_path).items():
+            with open(removed_ids_file_path) as removed_ids_file:
+                removed_ids = {line.rstrip("\n") for line in removed_ids_file}
+            with open(previous_file_paths[output_kind]) as previous_file, \
+                    open(delta_file_paths[output_kind]) as delta_file:
+                patched_rows = [line for line in previous_file if json.loads(line)["id"] not in removed_ids]
+                patched_rows += delta_file.readlines()
+            assert sorted(patched_rows) == full_outputs[output_kind], f"Patched {kind} {output_kind} outputs differ"
+
+    with np.load(get_edge_ids_file_path(f"{tmp_path}/incremental/edges_c.tsv")) as incremental_edge_ids, \
+            np.load(get_edge_ids_file_path(f"{tmp_path}/full/edges_c.tsv")) as full_edge_ids:
+        for ids_kind in ["kept", "excluded"]:
+            assert sorted(incremental_edge_ids[ids_kind]) == sorted(full_edge_ids[ids_kind])
+
+
+def _read_output_bytes(tsv_path: str, extra_formats: List[str]) -> dict:
+    output_bytes = dict()
+    for output_kind, output_file_path in get_output_file_paths(tsv_path, extra_formats=extra_formats).items():
+        with open(output_file_path, "rb") as output_file:
+            output_bytes[output_kind] = output_file.read()
+    return output_bytes
+
+
+@pytest.mark.parametrize("kind", ["nodes", "edges"])
+def test_parallel_conversion_matches_serial_conversion(tmp_path, kind):
+    bh = CategoryAncestorCache(BiolinkHelper())
+    extra_formats = OUTPUT_FORMATS if kind == "edges" else ["neo4j", "parquet"]
+    outputs = dict()
+    for num_workers in [1, 4]:
+        file_paths = make_synthetic_kg2c(f"{tmp_path}/{num_workers}", 2000, seed=4)
+        convert_tsv_to_jsonl(file_paths[f"{kind}_tsv"], file_paths[f"{kind}_header_tsv"], bh,
+                             num_workers=num_workers, parquet_row_group_size=150, **CONVERSION_OPTIONS)
+        outputs[num_workers] = _read_output_bytes(file_paths[f"{kind}_tsv"], extra_formats)
+    assert len(outputs[1]) == (8 if kind == "edges" else 7)
+    for output_kind, serial_output in outputs[1].items():
+        assert serial_output, f"{output_kind} output is empty"
+        assert outputs[4][output_kind] == serial_output, f"Parallel {output_kind} output differs from serial"
+
+
+def test_flush_threshold_does_not_change_outputs(tmp_path):
+    bh = CategoryAncestorCache(BiolinkHelper())
+    outputs = dict()
+    for flush_threshold in [1, 64 * 1024 * 1024]:  # Flushing after every row vs. never flushing before closing
+        file_paths = make_synthetic_kg2c(f"{tmp_path}/{flush_threshold}", 500, seed=5)
+        convert_tsv_to_jsonl(file_paths["edges_tsv"], file_paths["edges_header_tsv"], bh,
+                             flush_threshold=flush_threshold, **CONVERSION_OPTIONS)
+        outputs[flush_threshold] = _read_output_bytes(file_paths["edges_tsv"], OUTPUT_FORMATS)
+    assert outputs[1] == outputs[64 * 1024 * 1024]
+    assert all(outputs[1].values())
+
+
+def test_ancestor_cache_matches_biolink_helper(tmp_path):
+    # A tiny cache, so that evictions happen too
+    ancestor_cache = CategoryAncestorCache(BiolinkHelper(), max_size=2)
+    plater_nodes = dict()
+    for name, bh in [("uncached", BiolinkHelper()), ("cached", ancestor_cache)]:
+        file_paths = make_synthetic_kg2c(f"{tmp_path}/{name}", 500, seed=6)
+        convert_tsv_to_jsonl(file_paths["nodes_tsv"], file_paths["nodes_header_tsv"], bh)
+        with open(get_output_file_paths(file_paths["nodes_tsv"])["plater"]) as plater_file:
+            plater_nodes[name] = [json.loads(line) for line in plater_file]
+    for node in plater_nodes["uncached"]:  # BiolinkHelper doesn't return ancestors in any particular order
+        node["category"] = sorted(node["category"])
+    assert plater_nodes["cached"] == plater_nodes["uncached"]
+    assert len(ancestor_cache.cache) <= 2
+
+
+@pytest.mark.parametrize("kind", ["nodes", "edges"])
+def test_neo4j_csv_round_trip(tmp_path, kind):
+    import csv
+    file_paths = make_synthetic_kg2c(f"{tmp_path}", 300, seed=7)
+    tsv_path = file_paths[f"{kind}_tsv"]
+    convert_tsv_to_jsonl(tsv_path, file_paths[f"{kind}_header_tsv"], CategoryAncestorCache(BiolinkHelper()),
+                         neo4j_csv=True)
+    output_file_paths = get_output_file_paths(tsv_path, extra_formats=["neo4j"])
+    with open(get_neo4j_header_file_path(tsv_path), newline="") as header_file:
+        header = next(csv.reader(header_file))
+    with open(output_file_paths["plater"]) as plater_file:
+        plater_rows = [json.loads(line) for line in plater_file]
+    with open(output_file_paths["neo4j"], newline="", encoding="utf-8") as neo4j_file:
+        neo4j_rows = list(csv.reader(neo4j_file))
+    assert len(neo4j_rows) == len(plater_rows) > 0
+    # Each CSV field should hold the value of the plater property its (typed) header field names
+    for neo4j_row, plater_row in zip(neo4j_rows, plater_rows):
+        assert len(neo4j_row) == len(header)
+        for header_field, value in zip(header, neo4j_row):
+            property_name, _, field_type = header_field.partition(":")
+            if not property_name:  # :LABEL, :TYPE, :START_ID, or :END_ID
+                property_name = {"LABEL": "category", "TYPE": "predicate", "START_ID": "subject",
+                                 "END_ID": "object"}[field_type]
+                field_type = "string[]" if field_type == "LABEL" else ""
+            expected_value = plater_row.get(property_name)
+            if field_type == "string[]":
+                assert (value.split(NEO4J_ARRAY_DELIMITER) if value else []) == (expected_value or [])
+            else:
+                assert value == (expected_value if expected_value is not None else "")
+
+
+@pytest.mark.parametrize("tarball_name", ["kg2c.tar.gz", "kg2c.tar"])
+def test_tarball_conversion_matches_file_conversion(tmp_path, tarball_name):
+    import tarfile
+    from convert_kg2c_tsvs_to_jsonl import convert_tarball_tsvs
+    bh = CategoryAncestorCache(BiolinkHelper())
+    file_paths = make_synthetic_kg2c(f"{tmp_path}/files", 500, seed=8)
+    with tarfile.open(f"{tmp_path}/{tarball_name}", "w:gz" if tarball_name.endswith(".gz") else "w") as tar:
+        tar.add(f"{tmp_path}/files/nodes_c_header.tsv", arcname="kg2c/nodes_c_header.tsv")
+        tar.add(f"{tmp_path}/files/nodes_c.tsv", arcname="kg2c/nodes_c.tsv")
+        tar.add(f"{tmp_path}/files/edges_c.tsv", arcname="kg2c/edges_c.tsv")  # Comes before its header
+        tar.add(f"{tmp_path}/files/edges_c_header.tsv", arcname="kg2c/edges_c_header.tsv")
+
+    os.makedirs(f"{tmp_path}/streamed")
+    tsv_and_header_paths = [(f"{tmp_path}/streamed/{kind}_c.tsv", f"{tmp_path}/streamed/{kind}_c_header.tsv")
+                            for kind in ["nodes", "edges"]]
+    file_reports = convert_tarball_tsvs(f"{tmp_path}/{tarball_name}", tsv_and_header_paths, bh,
+                                        {"num_workers": 2, **CONVERSION_OPTIONS})
+    tsv_paths = [tsv_path for tsv_path, _ in tsv_and_header_paths]
+    assert [file_report["tsv_path"] for file_report in file_reports] == tsv_paths
+    assert not any(os.path.exists(tsv_path) for tsv_path in tsv_paths)  # The TSVs themselves are never written to disk
+    for kind in ["nodes", "edges"]:
+        convert_tsv_to_jsonl(file_paths[f"{kind}_tsv"], file_paths[f"{kind}_header_tsv"], bh, **CONVERSION_OPTIONS)
+        extra_formats = OUTPUT_FORMATS if kind == "edges" else ["neo4j", "parquet"]
+        assert _read_output_bytes(f"{tmp_path}/streamed/{kind}_c.tsv", extra_formats) == \
+            _read_output_bytes(file_paths[f"{kind}_tsv"], extra_formats)
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_conversion_report(tmp_path, num_workers):
+    file_paths = make_synthetic_kg2c(f"{tmp_path}", 500, seed=9)
+    for kind in ["nodes", "edges"]:
+        tsv_path = file_paths[f"{kind}_tsv"]
+        bh = CategoryAncestorCache(BiolinkHelper())
+        report = convert_tsv_to_jsonl(tsv_path, file_paths[f"{kind}_header_tsv"], bh, num_workers=num_workers,
+                                      neo4j_csv=True)
+        with open(tsv_path) as tsv_file:
+            num_tsv_rows = sum(1 for _ in tsv_file)
+        with open(report["output_file_paths"]["plater"][0]) as plater_file:
+            num_plater_rows = sum(1 for _ in plater_file)
+        assert report["num_rows"] == report["num_rows_converted"] == num_tsv_rows
+        assert report["num_rows_excluded_from_plater"] == num_tsv_rows - num_plater_rows
+        for output_kind, output_file_paths in report["output_file_paths"].items():
+            assert report["output_bytes"][output_kind] == sum(map(os.path.getsize, output_file_paths)) > 0
+        assert {"json_conversion", "plater_conversion", "write_full", "write_plater"} <= set(report["stage_seconds"])
+        assert all(seconds >= 0 for seconds in report["stage_seconds"].values())
+        assert report["peak_rss_bytes"] > 0
+        # Only nodes' categories are expanded, and the cache's stats include those gathered in any workers
+        num_lookups = report["ancestor_cache_hits"] + report["ancestor_cache_misses"]
+        assert num_lookups == (num_plater_rows if kind == "nodes" else 0)
+
+
+def test_stack_sampler_top_functions(tmp_path):
+    from convert_kg2c_tsvs_to_jsonl import StackSampler
+    stack_sampler = StackSampler()
+    stack_sampler.add_stack_counts({"main;convert_lines;write": 3, "main;convert_lines": 1})
+    stack_sampler.add_stack_counts({"main;convert_lines;write": 1})  # E.g., from a worker
+    assert stack_sampler.get_top_functions() == [{"function": "write", "samples": 4, "percent": 80.0},
+                                                 {"function": "convert_lines", "samples": 1, "percent": 20.0}]
+    stack_sampler.write_collapsed_stacks(f"{tmp_path}/stacks.txt")
+    with open(f"{tmp_path}/stacks.txt") as collapsed_stacks_file:
+        assert collapsed_stacks_file.read() == "main;convert_lines;write 4\nmain;convert_lines 1\n"
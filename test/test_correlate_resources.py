@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from correlate_resources import attribute_resources, load_timeline
+
+
+def test_attribute_resources_splits_overlapping_usage():
+    # One sample per second; 100% CPU throughout, and memory rising by 1 MB a second
+    times = np.arange(0.0, 11.0)
+    target_df = pd.DataFrame({"time": times, "memory_bytes": times * 10 ** 6, "cpu_percent": 100.0,
+                              "read_bytes": 10.0, "write_bytes": np.nan})
+    # The first query runs alone for 2 seconds, then overlaps the second query for 2 seconds
+    executions_df = pd.DataFrame({"start_time": [1.0, 3.0], "end_time": [5.0, 5.0]})
+    resources_df = attribute_resources(executions_df, target_df)
+
+    assert resources_df["cpu_seconds"].tolist() == [3.0, 1.0]
+    assert resources_df["read_bytes"].tolist() == [30.0, 10.0]
+    assert resources_df["max_queries_sharing_sample"].tolist() == [2, 2]
+    assert resources_df["peak_memory_bytes"].tolist() == [5 * 10 ** 6] * 2
+    assert resources_df["memory_delta_bytes"].tolist() == [4 * 10 ** 6, 2 * 10 ** 6]
+
+
+def test_load_timeline_parses_whole_second_timestamps(tmp_path):
+    # Timestamps written without microseconds (when they were 0), as older monitor_mem.py TSVs have
+    timeline_path = f"{tmp_path}/mem.tsv"
+    with open(timeline_path, "w") as timeline_file:
+        timeline_file.write("timestamp\tmemory_used_gb\tpercent_mem_used\n"
+                            "1970-01-01 00:00:10\t1.0\t10\n1970-01-01 00:00:10.500000\t1.5\t15\n")
+    assert load_timeline([timeline_path])["time"].tolist() == [10.0, 10.5]
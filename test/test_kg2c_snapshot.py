@@ -0,0 +1,99 @@
+import json
+import os
+import random
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(f"{SCRIPT_DIR}/..")
+from convert_kg2c_tsvs_to_jsonl import convert_tsv_to_jsonl, get_output_file_paths, CategoryAncestorCache
+from kg2c_snapshot import build_snapshot, Kg2cSnapshot
+from make_synthetic_kg2c import make_synthetic_kg2c
+from stub_biolink_helper import BiolinkHelper
+
+
+def _answer_by_brute_force(trapi_qg: dict, nodes: dict, edges: list) -> set:
+    # Returns the (edge id, subject qnode's node, object qnode's node) bindings fulfilling the one-hop query
+    qedge = next(iter(trapi_qg["edges"].values()))
+    qnodes = [trapi_qg["nodes"][qedge["subject"]], trapi_qg["nodes"][qedge["object"]]]
+    predicates = qedge.get("predicates")
+    any_predicate = not predicates or "biolink:related_to" in predicates
+    qualifier_sets = [constraint["qualifier_set"] for constraint in qedge.get("qualifier_constraints", [])]
+    qualifier_properties = {"biolink:qualified_predicate": "qualified_predicate",
+                            "biolink:object_aspect_qualifier": "qualified_object_aspect",
+                            "biolink:object_direction_qualifier": "qualified_object_direction"}
+
+    def node_matches(node_id: str, qnode: dict) -> bool:
+        categories = qnode.get("categories")
+        return ((not qnode.get("ids") or node_id in qnode["ids"]) and
+                (not categories or bool(set(categories) & set(nodes[node_id]["category"]))))
+
+    bindings = set()
+    for edge in edges:
+        if not any_predicate and edge["predicate"] not in predicates:
+            continue
+        if qualifier_sets and not any(all(edge.get(qualifier_properties[qualifier["qualifier_type_id"]]) ==
+                                          qualifier["qualifier_value"] for qualifier in qualifier_set)
+                                      for qualifier_set in qualifier_sets):
+            continue
+        directions = [(edge["subject"], edge["object"])]
+        if any_predicate:  # biolink:related_to is symmetric
+            directions.append((edge["object"], edge["subject"]))
+        for subject_id, object_id in directions:
+            if node_matches(subject_id, qnodes[0]) and node_matches(object_id, qnodes[1]):
+                bindings.add((edge["id"], subject_id, object_id))
+    return bindings
+
+
+def test_one_hop_answers_match_brute_force(tmp_path):
+    file_paths = make_synthetic_kg2c(f"{tmp_path}/kg2c", 2000, seed=2)
+    bh = CategoryAncestorCache(BiolinkHelper())
+    plater_paths = dict()
+    for kind in ["nodes", "edges"]:
+        convert_tsv_to_jsonl(file_paths[f"{kind}_tsv"], file_paths[f"{kind}_header_tsv"], bh)
+        plater_paths[kind] = get_output_file_paths(file_paths[f"{kind}_tsv"])["plater"]
+    build_snapshot(plater_paths["nodes"], plater_paths["edges"], f"{tmp_path}/snapshot")
+    snapshot = Kg2cSnapshot(f"{tmp_path}/snapshot")
+    with open(plater_paths["nodes"]) as nodes_file:
+        nodes = {node["id"]: node for node in map(json.loads, nodes_file)}
+    with open(plater_paths["edges"]) as edges_file:
+        edges = [json.loads(line) for line in edges_file]
+
+    rng = random.Random(0)
+    node_ids = sorted(nodes)
+    qualified_edge = next(edge for edge in edges if edge.get("qualified_object_aspect"))
+    query_graphs = [
+        {"nodes": {"n0": {"ids": rng.sample(node_ids, 50)}, "n1": {"categories": ["biolink:ChemicalEntity"]}},
+         "edges": {"e0": {"subject": "n0", "object": "n1", "predicates": ["biolink:related_to"]}}},
+        {"nodes": {"n0": {"categories": ["biolink:Gene", "biolink:Disease"]}, "n1": {"ids": node_ids[:20] + ["X:1"]}},
+         "edges": {"e0": {"subject": "n0", "object": "n1", "predicates": ["biolink:treats", "biolink:causes"]}}},
+        {"nodes": {"n0": {"ids": node_ids[:300]}, "n1": {"ids": node_ids[:300], "is_set": True}},
+         "edges": {"e0": {"subject": "n0", "object": "n1"}}},
+        {"nodes": {"n0": {"categories": ["biolink:NamedThing"]}, "n1": {"categories": ["biolink:Protein"]}},
+         "edges": {"e0": {"subject": "n0", "object": "n1", "predicates": ["biolink:subclass_of"]}}},
+        {"nodes": {"n0": {}, "n1": {}},
+         "edges": {"e0": {"subject": "n0", "object": "n1", "predicates": ["biolink:causes"],
+                          "qualifier_constraints": [{"qualifier_set": [
+                              {"qualifier_type_id": "biolink:object_aspect_qualifier",
+                               "qualifier_value": qualified_edge["qualified_object_aspect"]},
+                              {"qualifier_type_id": "biolink:object_direction_qualifier",
+                               "qualifier_value": qualified_edge["qualified_object_direction"]}]}]}}},
+    ]
+    for query_num, trapi_qg in enumerate(query_graphs):
+        expected_bindings = _answer_by_brute_force(trapi_qg, nodes, edges)
+        assert expected_bindings, f"Query {query_num} should have some answers"
+        message = snapshot.answer_one_hop(trapi_qg)
+        bindings = set()
+        for result in message["results"]:
+            node_ids_by_qnode = {qnode_key: [binding["id"] for binding in node_bindings]
+                                 for qnode_key, node_bindings in result["node_bindings"].items()}
+            for edge_binding in result["analyses"][0]["edge_bindings"]["e0"]:
+                edge = message["knowledge_graph"]["edges"][edge_binding["id"]]
+                for subject_id, object_id in [(edge["subject"], edge["object"]), (edge["object"], edge["subject"])]:
+                    if subject_id in node_ids_by_qnode["n0"] and object_id in node_ids_by_qnode["n1"]:
+                        bindings.add((edge_binding["id"], subject_id, object_id))
+        assert bindings == expected_bindings, f"Query {query_num} answers differ"
+        # One result per distinct pair of nodes bound to non-set qnodes
+        expected_result_keys = {tuple(node_id for qnode_key, node_id in zip(["n0", "n1"], binding[1:])
+                                      if not trapi_qg["nodes"][qnode_key].get("is_set"))
+                                for binding in expected_bindings}
+        assert len(message["results"]) == len(expected_result_keys)